@@ -4,6 +4,8 @@ from .api.custom_node import *  # noqa: F403
 from .api.io import *  # noqa: F403
 from .api.log import *  # noqa: F403
 from .api.model import *  # noqa: F403
+from .api.s3 import *  # noqa: F403
+from .api.upload import *  # noqa: F403
 from .node_index import NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
 
 print("Initializing FlowScale Nodes - 0.4.0")
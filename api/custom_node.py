@@ -8,6 +8,8 @@ import git
 from aiohttp import web
 from server import PromptServer  # type: ignore
 
+from ..nodes.io_executor import run_io
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 CUSTOM_NODES_DIR = os.path.join(os.getcwd(), "custom_nodes")
@@ -44,6 +46,87 @@ async def list_nodes(request):
         return web.json_response({"error": "Failed to list nodes", "details": str(e)}, status=500)
 
 
+def _install_repository(repo_url, repo_branch, commit_sha, pip_packages, apt_packages, repo_path):
+    """Clone a repository and install its packages; returns ``(payload, status)``"""
+    logger.info(f"Cloning repository {repo_url} into {repo_path}...")
+    repo = git.Repo.clone_from(repo_url, repo_path, branch=repo_branch)
+
+    if commit_sha and commit_sha.strip():
+        logger.info(f"Checking out to commit {commit_sha}...")
+        repo.git.checkout(commit_sha)
+        logger.info(f"Successfully checked out to commit {commit_sha}")
+
+    # Install APT packages if provided
+    if apt_packages and len(apt_packages) > 0:
+        logger.info(f"Installing APT packages: {', '.join(apt_packages)}")
+        try:
+            apt_command = ["apt-get", "install", "-y"] + apt_packages
+            try:
+                subprocess.run(
+                    ["which", "sudo"],
+                    check=True,
+                    capture_output=True,
+                )
+                logger.info("Using sudo for apt-get install")
+                subprocess.check_call(["sudo"] + apt_command)
+            except (subprocess.SubprocessError, FileNotFoundError):
+                logger.info("sudo not available, trying to install without it...")
+                subprocess.check_call(apt_command)
+
+            logger.info("APT packages installed successfully")
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Failed to install APT packages: {e}")
+
+    # Install pip packages if provided
+    if pip_packages and len(pip_packages) > 0:
+        logger.info(f"Installing pip packages: {', '.join(pip_packages)}")
+        try:
+            pip_command = [sys.executable, "-m", "pip", "install"] + pip_packages
+            subprocess.check_call(pip_command)
+            logger.info("pip packages installed successfully")
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Failed to install pip packages: {e}")
+            return {"error": "Failed to install pip packages", "details": str(e)}, 500
+
+    requirements_file = os.path.join(repo_path, "requirements.txt")
+    if os.path.exists(requirements_file):
+        logger.info(f"Found requirements.txt at {requirements_file}. Installing dependencies...")
+        try:
+            with open(requirements_file) as f:
+                requirements = [
+                    line.strip() for line in f if line.strip() and not line.startswith("#")
+                ]
+
+            # Install each package individually
+            failed_packages = []
+            logger.info(f"Installing packages from requirements.txt: {', '.join(requirements)}")
+            for package in requirements:
+                if "transformers" in package:
+                    logger.info("Skipping transformers package installation")
+                    continue  # Skip installing transformers package
+                logger.info(f"Installing package: {package}")
+                try:
+                    subprocess.check_call([sys.executable, "-m", "pip", "install", package])
+                except subprocess.CalledProcessError as e:
+                    logger.error(f"Failed to install {package}: {e}")
+                    failed_packages.append(package)
+
+            if failed_packages:
+                error_message = f"Failed to install some packages: {', '.join(failed_packages)}"
+                logger.error(error_message)
+
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Failed to install dependencies: {e}")
+            return {"error": "Failed to install dependencies", "details": str(e)}, 500
+
+    logger.info(f"Successfully cloned {repo_url} into {repo_path}")
+    return {
+        "message": "Repository installed successfully",
+        "path": repo_path,
+        "commit": commit_sha or repo.head.commit.hexsha,
+    }, 200
+
+
 @PromptServer.instance.routes.post("/flowscale/node/install")
 async def install_node(request):
     """
@@ -66,92 +149,17 @@ async def install_node(request):
         if os.path.exists(repo_path):
             return web.json_response({"error": "Repository already installed"}, status=400)
 
-        logger.info(f"Cloning repository {repo_url} into {repo_path}...")
-        repo = git.Repo.clone_from(repo_url, repo_path, branch=repo_branch)
-
-        if commit_sha and commit_sha.strip():
-            logger.info(f"Checking out to commit {commit_sha}...")
-            repo.git.checkout(commit_sha)
-            logger.info(f"Successfully checked out to commit {commit_sha}")
-
-        # Install APT packages if provided
-        if apt_packages and len(apt_packages) > 0:
-            logger.info(f"Installing APT packages: {', '.join(apt_packages)}")
-            try:
-                apt_command = ["apt-get", "install", "-y"] + apt_packages
-                try:
-                    subprocess.run(
-                        ["which", "sudo"],
-                        check=True,
-                        capture_output=True,
-                    )
-                    logger.info("Using sudo for apt-get install")
-                    subprocess.check_call(["sudo"] + apt_command)
-                except (subprocess.SubprocessError, FileNotFoundError):
-                    logger.info("sudo not available, trying to install without it...")
-                    subprocess.check_call(apt_command)
-
-                logger.info("APT packages installed successfully")
-            except subprocess.CalledProcessError as e:
-                logger.error(f"Failed to install APT packages: {e}")
-
-        # Install pip packages if provided
-        if pip_packages and len(pip_packages) > 0:
-            logger.info(f"Installing pip packages: {', '.join(pip_packages)}")
-            try:
-                pip_command = [sys.executable, "-m", "pip", "install"] + pip_packages
-                subprocess.check_call(pip_command)
-                logger.info("pip packages installed successfully")
-            except subprocess.CalledProcessError as e:
-                logger.error(f"Failed to install pip packages: {e}")
-                return web.json_response(
-                    {"error": "Failed to install pip packages", "details": str(e)}, status=500
-                )
-
-        requirements_file = os.path.join(repo_path, "requirements.txt")
-        if os.path.exists(requirements_file):
-            logger.info(
-                f"Found requirements.txt at {requirements_file}. Installing dependencies..."
-            )
-            try:
-                with open(requirements_file) as f:
-                    requirements = [
-                        line.strip() for line in f if line.strip() and not line.startswith("#")
-                    ]
-
-                # Install each package individually
-                failed_packages = []
-                logger.info(f"Installing packages from requirements.txt: {', '.join(requirements)}")
-                for package in requirements:
-                    if "transformers" in package:
-                        logger.info("Skipping transformers package installation")
-                        continue  # Skip installing transformers package
-                    logger.info(f"Installing package: {package}")
-                    try:
-                        subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-                    except subprocess.CalledProcessError as e:
-                        logger.error(f"Failed to install {package}: {e}")
-                        failed_packages.append(package)
-
-                if failed_packages:
-                    error_message = f"Failed to install some packages: {', '.join(failed_packages)}"
-                    logger.error(error_message)
-
-            except subprocess.CalledProcessError as e:
-                logger.error(f"Failed to install dependencies: {e}")
-                return web.json_response(
-                    {"error": "Failed to install dependencies", "details": str(e)}, status=500
-                )
-
-        logger.info(f"Successfully cloned {repo_url} into {repo_path}")
-        return web.json_response(
-            {
-                "message": "Repository installed successfully",
-                "path": repo_path,
-                "commit": commit_sha or repo.head.commit.hexsha,
-            },
-            status=200,
+        # git and pip can run for minutes, so keep them off the event loop
+        payload, status = await run_io(
+            _install_repository,
+            repo_url,
+            repo_branch,
+            commit_sha,
+            pip_packages,
+            apt_packages,
+            repo_path,
         )
+        return web.json_response(payload, status=status)
 
     except Exception as e:
         logger.error(f"Error installing repository: {str(e)}")
@@ -160,6 +168,26 @@ async def install_node(request):
         )
 
 
+def _uninstall_repository(repo_path):
+    """Run a repository's uninstall script, if any, and delete it"""
+    uninstall_script_path = os.path.join(repo_path, "uninstall.py")
+    if os.path.exists(uninstall_script_path):
+        logger.info(f"Found uninstall script at {uninstall_script_path}. Executing...")
+        try:
+            subprocess.check_call([sys.executable, uninstall_script_path])
+            logger.info(f"Uninstall script {uninstall_script_path} executed successfully.")
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Failed to execute uninstall script: {e}")
+
+    # Delete the repository folder
+    for root, dirs, files in os.walk(repo_path, topdown=False):
+        for file in files:
+            os.remove(os.path.join(root, file))
+        for dir in dirs:
+            os.rmdir(os.path.join(root, dir))
+    os.rmdir(repo_path)
+
+
 @PromptServer.instance.routes.post("/flowscale/node/uninstall")
 async def uninstall_node(request):
     """
@@ -180,23 +208,8 @@ async def uninstall_node(request):
         if not os.path.exists(repo_path):
             return web.json_response({"error": "Repository not found"}, status=404)
 
-        uninstall_script_path = os.path.join(repo_path, "uninstall.py")
-        if os.path.exists(uninstall_script_path):
-            logger.info(f"Found uninstall script at {uninstall_script_path}. Executing...")
-            try:
-                subprocess.check_call([sys.executable, uninstall_script_path])
-                logger.info(f"Uninstall script {uninstall_script_path} executed successfully.")
-            except subprocess.CalledProcessError as e:
-                logger.error(f"Failed to execute uninstall script: {e}")
-
-        # Delete the repository folder
         logger.info(f"Uninstalling repository: {repo_name} at path {repo_path}")
-        for root, dirs, files in os.walk(repo_path, topdown=False):
-            for file in files:
-                os.remove(os.path.join(root, file))
-            for dir in dirs:
-                os.rmdir(os.path.join(root, dir))
-        os.rmdir(repo_path)
+        await run_io(_uninstall_repository, repo_path)
 
         logger.info(f"Successfully uninstalled repository: {repo_name}")
         return web.json_response(
@@ -0,0 +1,234 @@
+import asyncio
+import email.utils
+import logging
+import os
+import uuid
+
+from aiohttp import web
+
+from ..nodes.file_metadata import get_file_metadata_cache
+from ..nodes.io_executor import run_io
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_RANGES = 16  # requests asking for more parts get the whole file instead
+FALLBACK_CHUNK_SIZE = 256 * 1024  # reads per executor call where sendfile is unavailable
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range_header(range_header, file_size):
+    """
+    Parse a ``Range`` header into sorted, coalesced ``(start, end)`` pairs.
+
+    Returns ``None`` when the header should be ignored (not a byte range, bad
+    syntax or too many parts) and raises ``RangeNotSatisfiable`` when it is
+    valid but no part overlaps the file. Suffix ranges (``bytes=-500``) and
+    open ranges (``bytes=500-``) are supported.
+    """
+    unit, _, specs = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs:
+        return None
+
+    ranges = []
+    for spec in specs.split(","):
+        spec = spec.strip()
+        if not spec:
+            continue
+        first, dash, last = spec.partition("-")
+        if not dash or not (first or last):
+            return None
+        if (first and not first.isdigit()) or (last and not last.isdigit()):
+            return None
+        if not first:
+            suffix = int(last)
+            if suffix and file_size:
+                ranges.append((max(0, file_size - suffix), file_size - 1))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start < file_size:
+            end = int(last) if last else file_size - 1
+            ranges.append((start, min(end, file_size - 1)))
+
+    if not ranges:
+        raise RangeNotSatisfiable()
+
+    ranges.sort()
+    coalesced = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = coalesced[-1]
+        if start <= last_end + 1:
+            coalesced[-1] = (last_start, max(last_end, end))
+        else:
+            coalesced.append((start, end))
+    if len(coalesced) > MAX_RANGES:
+        return None
+    return coalesced
+
+
+def _etag_values(header):
+    return [value.strip() for value in header.split(",") if value.strip()]
+
+
+def if_none_match(request, etag):
+    """
+    Whether ``If-None-Match`` lists ``etag`` (or ``*``), comparing whole tags.
+    Returns ``None`` when the request has no such header.
+    """
+    header = request.headers.get("If-None-Match")
+    if header is None:
+        return None
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = [value.removeprefix("W/") for value in _etag_values(header)]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def _not_modified(request, etag, mtime):
+    matched = if_none_match(request, etag)
+    if matched is not None:
+        return matched
+
+    if_modified_since = request.if_modified_since
+    return if_modified_since is not None and int(mtime) <= if_modified_since.timestamp()
+
+
+def _if_range_matches(request, etag, mtime):
+    if_range = request.headers.get("If-Range")
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith(('"', "W/")):
+        # Strong comparison only; a weak validator never matches
+        return if_range == etag
+    try:
+        date = email.utils.parsedate_to_datetime(if_range)
+    except (TypeError, ValueError):
+        return False
+    return date is not None and int(mtime) == int(date.timestamp())
+
+
+def _read_at(fobj, offset, size):
+    fobj.seek(offset)
+    return fobj.read(size)
+
+
+async def _send_range(request, response, fobj, offset, count):
+    """Send ``count`` bytes of ``fobj`` from ``offset``, zero-copy when the transport allows"""
+    loop = asyncio.get_running_loop()
+    if count <= 0:
+        return
+    transport = request.transport
+    if transport is None:
+        raise ConnectionResetError("Connection lost")
+    try:
+        await loop.sendfile(transport, fobj, offset, count)
+        return
+    except NotImplementedError:
+        # TLS transports and some event loops cannot sendfile
+        pass
+
+    end = offset + count
+    while offset < end:
+        chunk = await run_io(_read_at, fobj, offset, min(FALLBACK_CHUNK_SIZE, end - offset))
+        if not chunk:
+            raise ConnectionResetError(f"{fobj.name} shrank while it was being sent")
+        await response.write(chunk)
+        offset += len(chunk)
+
+
+async def _send_part(request, fobj, status, headers, offset, count):
+    response = web.StreamResponse(status=status, headers=headers)
+    response.content_length = count
+    await response.prepare(request)
+    if request.method != "HEAD":
+        await _send_range(request, response, fobj, offset, count)
+    await response.write_eof()
+    return response
+
+
+async def send_file(request, file_path, mime_type=None, headers=None):
+    """
+    Serve ``file_path`` with ``sendfile``, range and conditional GET support.
+
+    Handles single, suffix and multi-part byte ranges (``multipart/byteranges``),
+    ``If-Range``, ``If-None-Match`` and ``If-Modified-Since``, using a strong
+    ETag derived from the file's inode, mtime and size. The ETag and, when
+    ``mime_type`` is not given, the content type come from the file metadata
+    cache. The event loop never reads file data itself; that happens in the
+    kernel or, where sendfile is unavailable, on the shared I/O executor.
+    """
+    fobj = await run_io(open, file_path, "rb")
+    try:
+        stat = os.fstat(fobj.fileno())
+        metadata = get_file_metadata_cache().get(file_path, stat)
+        mime_type = mime_type or metadata.mime_type or "application/octet-stream"
+        file_size = stat.st_size
+        etag = metadata.etag
+        base_headers = {
+            **(headers or {}),
+            "ETag": etag,
+            "Last-Modified": email.utils.formatdate(stat.st_mtime, usegmt=True),
+            "Accept-Ranges": "bytes",
+        }
+
+        if _not_modified(request, etag, stat.st_mtime):
+            return web.Response(status=304, headers=base_headers)
+
+        ranges = None
+        range_header = request.headers.get("Range")
+        if range_header and _if_range_matches(request, etag, stat.st_mtime):
+            try:
+                ranges = parse_range_header(range_header, file_size)
+            except RangeNotSatisfiable:
+                return web.Response(
+                    status=416, headers={**base_headers, "Content-Range": f"bytes */{file_size}"}
+                )
+
+        if not ranges:
+            headers = {**base_headers, "Content-Type": mime_type}
+            return await _send_part(request, fobj, 200, headers, 0, file_size)
+
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            headers = {
+                **base_headers,
+                "Content-Type": mime_type,
+                "Content-Range": f"bytes {start}-{end}/{file_size}",
+            }
+            return await _send_part(request, fobj, 206, headers, start, end - start + 1)
+
+        boundary = uuid.uuid4().hex
+        preambles = [
+            (
+                f"--{boundary}\r\nContent-Type: {mime_type}\r\n"
+                f"Content-Range: bytes {start}-{end}/{file_size}\r\n\r\n"
+            ).encode()
+            for start, end in ranges
+        ]
+        closing = f"--{boundary}--\r\n".encode()
+        response = web.StreamResponse(
+            status=206,
+            headers={
+                **base_headers,
+                "Content-Type": f"multipart/byteranges; boundary={boundary}",
+            },
+        )
+        response.content_length = sum(
+            len(preamble) + end - start + 1 + 2 for preamble, (start, end) in zip(preambles, ranges)
+        ) + len(closing)
+        await response.prepare(request)
+        if request.method != "HEAD":
+            for preamble, (start, end) in zip(preambles, ranges):
+                await response.write(preamble)
+                await _send_range(request, response, fobj, start, end - start + 1)
+                await response.write(b"\r\n")
+            await response.write(closing)
+        await response.write_eof()
+        return response
+    finally:
+        fobj.close()
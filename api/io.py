@@ -1,18 +1,27 @@
 import asyncio
-import glob
+import contextlib
+import hashlib
 import json
 import logging
 import mimetypes
 import os
 import re
 import shutil
-import time
 
 import aiofiles
 import folder_paths  # type: ignore
 from aiohttp import web
+from PIL import Image, UnidentifiedImageError
 from server import PromptServer  # type: ignore
 
+from ..nodes.content_index import store_upload
+from ..nodes.directory_index import get_directory_index, scan_prefix
+from ..nodes.directory_listing import get_directory_listings
+from ..nodes.file_metadata import get_file_metadata_cache
+from ..nodes.file_ready import atomic_output, is_file_marked_ready, partial_output_path
+from ..nodes.io_executor import get_io_executor, run_io, start_loop_lag_monitor
+from .file_response import if_none_match, send_file
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -27,59 +36,158 @@ mimetypes.add_type("model/fbx", ".fbx")
 mimetypes.add_type("model/ply", ".ply")
 mimetypes.add_type("model/vnd.usdz+zip", ".usdz")
 
-# File cache for recently accessed files
-_file_cache = {}
-_cache_max_age = 300  # 5 minutes
-
 CHUNK_SIZE = 8192  # 8KB chunks for memory efficiency
 MAX_FILE_SIZE = 500 * 1024 * 1024  # 500MB limit
+BATCH_READ_SIZE = 256 * 1024  # bytes read from a batch part at a time
+BATCH_BUFFER_MIN = 1024 * 1024  # first write of a batch part; smaller images take one write
+BATCH_BUFFER_MAX = 8 * 1024 * 1024  # write size of a batch part grows up to this
+# Batch parts being written, validated and renamed into place at the same time
+UPLOAD_BATCH_CONCURRENCY = int(os.environ.get("FLOWSCALE_UPLOAD_BATCH_CONCURRENCY", "4"))
 
+# Extensions accepted by /flowscale/io/upload, by media type
+UPLOAD_MEDIA_EXTENSIONS = {
+    "image": [".jpg", ".jpeg", ".png", ".webp", ".avif", ".heif"],
+    "video": [".mp4", ".webm", ".mkv", ".mov", ".avi", ".wmv", ".flv", ".gif"],
+    "audio": [".mp3", ".wav", ".ogg", ".flac", ".aac", ".m4a"],
+}
 
-def is_file_recently_accessed(file_path, max_age=300):
-    """Check if file was recently accessed and is likely complete."""
-    current_time = time.time()
-    if file_path in _file_cache:
-        cache_entry = _file_cache[file_path]
-        if current_time - cache_entry["timestamp"] < max_age:
-            return cache_entry["size"] == os.path.getsize(file_path)
-    return False
+# Reports how long blocking work stalls ComfyUI's event loop
+start_loop_lag_monitor(getattr(PromptServer.instance, "loop", None))
 
 
-def cache_file_access(file_path):
-    """Cache file access information."""
-    _file_cache[file_path] = {"timestamp": time.time(), "size": os.path.getsize(file_path)}
+def upload_media_type(ext):
+    """Media type of an uploadable extension, or ``None`` when uploads of it are refused"""
+    for media_type, extensions in UPLOAD_MEDIA_EXTENSIONS.items():
+        if ext in extensions:
+            return media_type
+    return None
 
-    # Clean old cache entries
-    current_time = time.time()
-    expired_keys = [
-        k for k, v in _file_cache.items() if current_time - v["timestamp"] > _cache_max_age * 2
-    ]
-    for key in expired_keys:
-        del _file_cache[key]
+
+def sanitize_upload_filename(filename):
+    filename = os.path.basename(filename)
+    return re.sub(r"[^a-zA-Z0-9_.-]", "_", filename)
 
 
 async def optimized_file_upload(field, file_path):
     """
-    Optimized file upload with memory-efficient chunked processing
+    Optimized file upload with memory-efficient chunked processing.
+
+    The file is hashed while it streams to a temporary name and then moved
+    into place by ``store_upload``, which copies an identical earlier upload
+    instead when there is one. Returns ``(size, sha256 hex digest)``.
+    """
+    size = 0
+    digest = hashlib.sha256()
+    temp_path = partial_output_path(file_path)
+    try:
+        async with aiofiles.open(temp_path, "wb", executor=get_io_executor().executor) as f:
+            while True:
+                chunk = await field.read_chunk(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+
+                # Check file size limit
+                if size > MAX_FILE_SIZE:
+                    raise ValueError(f"File size exceeds {MAX_FILE_SIZE // (1024 * 1024)}MB limit")
+
+                digest.update(chunk)
+                await f.write(chunk)
+        sha256 = digest.hexdigest()
+        await run_io(store_upload, temp_path, file_path, sha256)
+    except BaseException:
+        # Clean up partial file
+        await run_io(_remove_if_exists, temp_path)
+        raise
+
+    return size, sha256
+
+
+def _remove_if_exists(path):
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+
+def probe_image(path, validate=False):
+    """
+    Read the format and dimensions of an image from its header. With
+    ``validate`` the image is decoded completely and a corrupt or unreadable
+    file raises ``ValueError``; without it such files yield ``None``.
+    """
+    try:
+        with Image.open(path) as image:
+            info = {"width": image.width, "height": image.height, "format": image.format}
+            if validate:
+                image.load()
+    except UnidentifiedImageError as e:
+        if validate:
+            raise ValueError("Not a readable image.") from e
+        return None
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as e:
+        if validate:
+            raise ValueError(f"Invalid image: {e}") from e
+        return None
+    return info
+
+
+async def _receive_batch_part(field, temp_path):
+    """
+    Stream one batch part to ``temp_path`` while hashing it.
+
+    Data is collected in a buffer that starts at ``BATCH_BUFFER_MIN`` and
+    doubles after every write up to ``BATCH_BUFFER_MAX``, so small images are
+    written in one go by ``_finish_batch_part`` and large ones in few calls.
+    One write runs on the I/O executor while the next buffer is read from the
+    request. Returns ``(open file or None, unwritten tail, size, sha256)``.
     """
+    digest = hashlib.sha256()
     size = 0
-    async with aiofiles.open(file_path, "wb") as f:
+    limit = BATCH_BUFFER_MIN
+    buffer = bytearray()
+    f = None
+    pending = None
+    try:
         while True:
-            chunk = await field.read_chunk(CHUNK_SIZE)
+            chunk = await field.read_chunk(BATCH_READ_SIZE)
             if not chunk:
                 break
             size += len(chunk)
-
-            # Check file size limit
             if size > MAX_FILE_SIZE:
-                # Clean up partial file
-                await f.close()
-                os.remove(file_path)
                 raise ValueError(f"File size exceeds {MAX_FILE_SIZE // (1024 * 1024)}MB limit")
-
-            await f.write(chunk)
-
-    return size
+            digest.update(chunk)
+            buffer += chunk
+            if len(buffer) >= limit:
+                if f is None:
+                    f = await run_io(open, temp_path, "wb")
+                if pending is not None:
+                    await pending
+                pending = asyncio.ensure_future(run_io(f.write, buffer))
+                buffer = bytearray()
+                limit = min(limit * 2, BATCH_BUFFER_MAX)
+        if pending is not None:
+            await pending
+    except BaseException:
+        if pending is not None:
+            with contextlib.suppress(Exception):
+                await pending
+        if f is not None:
+            await run_io(f.close)
+        await run_io(_remove_if_exists, temp_path)
+        raise
+    return f, buffer, size, digest.hexdigest()
+
+
+def _finish_batch_part(f, tail, temp_path, file_path, sha256, validate):
+    """Write the tail of a batch part, probe the image and move it into place"""
+    try:
+        with f if f is not None else open(temp_path, "wb") as out:
+            out.write(tail)
+        image = probe_image(temp_path, validate)
+        store_upload(temp_path, file_path, sha256)
+    except BaseException:
+        _remove_if_exists(temp_path)
+        raise
+    return image
 
 
 @PromptServer.instance.routes.post("/flowscale/io/upload")
@@ -98,19 +206,13 @@ async def upload_media(request):
                 {"error": "No file was uploaded."}, status=400, headers=headers
             )
 
-        filename = os.path.basename(field.filename)
-        filename = re.sub(r"[^a-zA-Z0-9_.-]", "_", filename)
+        filename = sanitize_upload_filename(field.filename)
 
         # Get the file extension
         ext = os.path.splitext(filename)[1].lower()
 
-        # Define allowed extensions
-        allowed_image_exts = [".jpg", ".jpeg", ".png", ".webp", ".avif", ".heif"]
-        allowed_video_exts = [".mp4", ".webm", ".mkv", ".mov", ".avi", ".wmv", ".flv", ".gif"]
-        allowed_audio_exts = [".mp3", ".wav", ".ogg", ".flac", ".aac", ".m4a"]
-
         # Check if extension is allowed
-        if ext not in allowed_image_exts + allowed_video_exts + allowed_audio_exts:
+        if upload_media_type(ext) is None:
             return web.json_response(
                 {"error": "Invalid file type. Only images, videos, and audio files are allowed."},
                 status=400,
@@ -119,21 +221,17 @@ async def upload_media(request):
 
         # Determine target directory (input for all media types)
         media_directory = os.path.join(os.getcwd(), "input")
-        os.makedirs(media_directory, exist_ok=True)
+        await run_io(os.makedirs, media_directory, exist_ok=True)
 
         file_path = os.path.join(media_directory, filename)
 
         try:
-            size = await optimized_file_upload(field, file_path)
+            size, sha256 = await optimized_file_upload(field, file_path)
         except ValueError as e:
             return web.json_response({"error": str(e)}, status=413, headers=headers)
 
         # Determine the file type for the response
-        file_type = "image"
-        if ext in allowed_video_exts:
-            file_type = "video"
-        elif ext in allowed_audio_exts:
-            file_type = "audio"
+        file_type = upload_media_type(ext)
 
         return web.json_response(
             {
@@ -141,6 +239,7 @@ async def upload_media(request):
                 "filename": filename,
                 "size": size,
                 "type": file_type,
+                "sha256": sha256,
             },
             headers=headers,
         )
@@ -152,74 +251,129 @@ async def upload_media(request):
 
 @PromptServer.instance.routes.post("/flowscale/io/upload_batch")
 async def upload_batch(request):
+    """
+    Upload many images into the directory given by the `path` field.
+
+    Parts are read from the request one after another, but each one is
+    finished (written, probed and renamed into place) on the I/O executor
+    while the following parts arrive. Every entry of `files` carries the
+    size, SHA-256 and, for images Pillow can read, width, height and format.
+    With `?validate=true` every image is decoded first; images that fail are
+    deleted and listed under `rejected`.
+    """
     headers = {
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Methods": "POST, OPTIONS",
         "Access-Control-Allow-Headers": "Content-Type",
     }
+    validate = request.query.get("validate", "").lower() in ("1", "true")
+    slots = asyncio.Semaphore(UPLOAD_BATCH_CONCURRENCY)
+    finishing = {}  # file path -> task of its latest part
+
+    async def finish(f, tail, temp_path, file_path, sha256, previous):
+        try:
+            if previous is not None:
+                # A later part with the same name has to win, as it did when parts were serial
+                await asyncio.wait([previous])
+            return await run_io(_finish_batch_part, f, tail, temp_path, file_path, sha256, validate)
+        finally:
+            slots.release()
 
     try:
         reader = await request.multipart()
         path = None
-        file_infos = []
+        parts = []
         base_directory = os.getcwd()
 
-        while True:
-            field = await reader.next()
-            if field is None:
-                break
-
-            if field.name == "path":
-                raw_path = await field.text()
-                if raw_path.startswith("./") or raw_path.startswith("../"):
-                    raw_path = raw_path.removeprefix("./").removeprefix("../")
-                if raw_path.startswith("/") or raw_path.startswith("\\"):
-                    raw_path = raw_path.removeprefix("/").removeprefix("\\")
-
-                sanitized_path = os.path.normpath(os.path.join(base_directory, raw_path))
-
-                if not sanitized_path.startswith(base_directory):
-                    return web.json_response(
-                        {"error": "Invalid path provided."}, status=400, headers=headers
-                    )
-
-                os.makedirs(sanitized_path, exist_ok=True)
-                path = sanitized_path
+        try:
+            while True:
+                field = await reader.next()
+                if field is None:
+                    break
 
-            elif field.name == "images":
-                if not path:
-                    return web.json_response(
-                        {"error": "No path was provided."}, status=400, headers=headers
+                if field.name == "path":
+                    raw_path = await field.text()
+                    if raw_path.startswith("./") or raw_path.startswith("../"):
+                        raw_path = raw_path.removeprefix("./").removeprefix("../")
+                    if raw_path.startswith("/") or raw_path.startswith("\\"):
+                        raw_path = raw_path.removeprefix("/").removeprefix("\\")
+
+                    sanitized_path = os.path.normpath(os.path.join(base_directory, raw_path))
+
+                    if not sanitized_path.startswith(base_directory):
+                        return web.json_response(
+                            {"error": "Invalid path provided."}, status=400, headers=headers
+                        )
+
+                    await run_io(os.makedirs, sanitized_path, exist_ok=True)
+                    path = sanitized_path
+
+                elif field.name == "images":
+                    if not path:
+                        return web.json_response(
+                            {"error": "No path was provided."}, status=400, headers=headers
+                        )
+
+                    if not field.filename:
+                        continue
+
+                    filename = sanitize_upload_filename(field.filename)
+
+                    content_type = field.headers.get("Content-Type", "")
+                    if not content_type.startswith("image/"):
+                        continue
+
+                    file_path = os.path.join(path, filename)
+                    temp_path = partial_output_path(file_path)
+
+                    # Bounds the parts held in memory or waiting to be finished
+                    await slots.acquire()
+                    try:
+                        f, tail, size, sha256 = await _receive_batch_part(field, temp_path)
+                    except BaseException:
+                        slots.release()
+                        raise
+                    task = asyncio.ensure_future(
+                        finish(f, tail, temp_path, file_path, sha256, finishing.get(file_path))
                     )
+                    finishing[file_path] = task
+                    parts.append((filename, file_path, size, sha256, task))
 
-                if not field.filename:
-                    continue
-
-                filename = os.path.basename(field.filename)
-                filename = re.sub(r"[^a-zA-Z0-9_.-]", "_", filename)
-
-                content_type = field.headers.get("Content-Type", "")
-                if not content_type.startswith("image/"):
-                    continue
-
-                file_path = os.path.join(path, filename)
-                size = 0
-
-                size = await optimized_file_upload(field, file_path)
-
-                file_infos.append({"filename": filename, "size": size, "path": file_path})
+                else:
+                    pass
+        finally:
+            # Parts already received are still finished when a later one fails
+            if parts:
+                await asyncio.wait([part[-1] for part in parts])
 
-            else:
-                pass
+        file_infos = []
+        rejected = []
+        for filename, file_path, size, sha256, task in parts:
+            try:
+                image = task.result()
+            except ValueError as e:
+                rejected.append({"filename": filename, "error": str(e)})
+                continue
+            file_infos.append(
+                {
+                    "filename": filename,
+                    "size": size,
+                    "path": file_path,
+                    "sha256": sha256,
+                    **(image or {"width": None, "height": None, "format": None}),
+                }
+            )
 
         if not file_infos or not path:
-            return web.json_response(
-                {"error": "No images/path were uploaded."}, status=400, headers=headers
-            )
+            error = {"error": "No images/path were uploaded."}
+            if rejected:
+                error["rejected"] = rejected
+            return web.json_response(error, status=400, headers=headers)
 
-        return web.json_response(
-            {"message": "Files uploaded successfully.", "files": file_infos}, headers=headers
-        )
+        result = {"message": "Files uploaded successfully.", "files": file_infos}
+        if rejected:
+            result["rejected"] = rejected
+        return web.json_response(result, headers=headers)
 
     except Exception as e:
         logger.error(f"Error uploading files: {e}")
@@ -228,6 +382,15 @@ async def upload_batch(request):
 
 @PromptServer.instance.routes.get("/flowscale/io/list")
 async def fetch_path_contents(request):
+    """
+    List a directory under the ComfyUI root.
+
+    Query parameters (all optional): `sort` (name, mtime or size), `order`
+    (asc or desc), `type` (file, directory or a media type such as video),
+    `ext` (comma-separated extensions), `limit` (page size, at most 1000) and
+    `cursor` (the `next_cursor` of the previous page). Responses carry an ETag
+    and unchanged listings answer `If-None-Match` with 304.
+    """
     directory_name = request.query.get("directory", "output")
     if directory_name.startswith("./") or directory_name.startswith("../"):
         directory_name = directory_name.removeprefix("./").removeprefix("../")
@@ -257,27 +420,84 @@ async def fetch_path_contents(request):
             {"error": "Invalid directory path."}, status=400, content_type="application/json"
         )
 
-    if not os.path.exists(directory_path) or not os.path.isdir(directory_path):
+    if not await run_io(os.path.isdir, directory_path):
         return web.json_response(
             {"error": "Directory does not exist."}, status=404, content_type="application/json"
         )
 
     try:
-        directory_contents = os.listdir(directory_path)
+        limit = int(request.query["limit"]) if request.query.get("limit") else None
+    except ValueError:
+        return web.json_response(
+            {"error": "limit must be an integer."}, status=400, content_type="application/json"
+        )
+    extensions = [ext.strip() for ext in request.query.get("ext", "").split(",") if ext.strip()]
+
+    try:
+        page, etag = await run_io(
+            get_directory_listings().list,
+            directory_path,
+            sort=request.query.get("sort", "name"),
+            order=request.query.get("order"),
+            limit=limit,
+            cursor=request.query.get("cursor"),
+            entry_type=request.query.get("type"),
+            extensions=extensions,
+        )
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400, content_type="application/json")
     except Exception as e:
         logger.error(f"Error fetching directory contents: {e}")
         return web.json_response({"error": str(e)}, status=500, content_type="application/json")
 
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match(request, etag):
+        return web.Response(status=304, headers=headers)
+
     return web.json_response(
         {
             "directory": sanitized_directory_name,
             "directory_path": directory_path,
-            "directory_contents": directory_contents,
+            "directory_contents": [entry["name"] for entry in page["entries"]],
+            **page,
         },
+        headers=headers,
         content_type="application/json",
     )
 
 
+def _search_candidates(search_directory, partial_filename, extensions):
+    """
+    Blocking part of /flowscale/io/search: the files in ``search_directory``
+    starting with ``partial_filename`` that end in the earliest of
+    ``extensions`` with any match. None when the directory does not exist.
+    """
+    if not os.path.isdir(search_directory):
+        return None
+
+    # One sorted-prefix lookup in the directory index instead of a listing per extension
+    directory_index = get_directory_index()
+    if directory_index is not None:
+        matches = directory_index.lookup(
+            search_directory,
+            partial_filename,
+            accept=lambda name: name.endswith(tuple(extensions)),
+        )
+    else:
+        matches = scan_prefix(search_directory, partial_filename)
+
+    for extension in extensions:
+        candidates = [match for match in matches if match[0].endswith(extension)]
+        if candidates:
+            return candidates
+    return []
+
+
+def _read_text(path):
+    with open(path) as f:
+        return f.read()
+
+
 @PromptServer.instance.routes.get("/flowscale/io/search")
 async def search_file(request):
     filepath = request.query.get("filepath")
@@ -315,11 +535,6 @@ async def search_file(request):
     search_directory = os.path.dirname(absolute_filepath)
     partial_filename = os.path.basename(absolute_filepath)
 
-    if not os.path.exists(search_directory) or not os.path.isdir(search_directory):
-        return web.json_response(
-            {"error": "Directory does not exist."}, status=404, content_type="application/json"
-        )
-
     supported_extensions = [
         ".mp4",
         ".avi",
@@ -357,34 +572,21 @@ async def search_file(request):
         ".usdz",
     ]
 
-    candidates = []
-    for extension in supported_extensions:
-        pattern = partial_filename + "*" + extension
-        pattern_path = os.path.join(search_directory, pattern)
-        for candidate_filepath in glob.glob(pattern_path):
-            candidate_absolute_path = os.path.abspath(candidate_filepath)
-            if not candidate_absolute_path.startswith(base_directory):
-                continue
-
-            relative_path = os.path.relpath(candidate_absolute_path, base_directory)
-            path_parts = relative_path.split(os.sep)
-            if any(part in BLACKLISTED_DIRECTORIES for part in path_parts):
-                continue
-
-            if os.path.isfile(candidate_absolute_path):
-                candidates.append(candidate_absolute_path)
-                break
-
-        if candidates:
-            break
-
+    candidates = await run_io(
+        _search_candidates, search_directory, partial_filename, supported_extensions
+    )
+    if candidates is None:
+        return web.json_response(
+            {"error": "Directory does not exist."}, status=404, content_type="application/json"
+        )
     if not candidates:
         return web.json_response(
             {"error": "File not found."}, status=404, content_type="application/json"
         )
 
-    candidates.sort(key=lambda x: os.path.getmtime(x), reverse=True)
-    absolute_filepath = candidates[0]
+    # The earliest supported extension with a match wins, newest file first
+    newest_name = max(candidates, key=lambda match: match[2])[0]
+    absolute_filepath = os.path.join(search_directory, newest_name)
 
     file_extension = os.path.splitext(absolute_filepath)[1]
     if file_extension.lower() not in supported_extensions:
@@ -395,10 +597,19 @@ async def search_file(request):
     video_extensions = [".mp4", ".avi", ".mov", ".wmv", ".flv", ".mkv", ".webm"]
     model_extensions = [".safetensors", ".pth", ".ckpt", ".onnx", ".pb", ".h5", ".pt", ".pkl"]
 
-    # For video files, check cache first
-    if file_extension.lower() in video_extensions and is_file_recently_accessed(absolute_filepath):
-        cache_file_access(absolute_filepath)  # Update cache timestamp
-        logger.info(f"Video file served from cache: {absolute_filepath}")
+    try:
+        metadata = await run_io(get_file_metadata_cache().get, absolute_filepath)
+    except OSError:
+        return web.json_response(
+            {"error": "File not found."}, status=404, content_type="application/json"
+        )
+
+    # Files seen complete at this size and mtime, written by our save nodes or
+    # seen closed by inotify need no stability polling
+    if metadata.ready:
+        logger.info(f"File metadata served from cache: {absolute_filepath}")
+    elif await run_io(is_file_marked_ready, absolute_filepath):
+        metadata.ready = True
     else:
         max_delay = (
             30
@@ -410,18 +621,13 @@ async def search_file(request):
             return web.json_response(
                 {"error": "File not ready yet."}, status=404, content_type="application/json"
             )
+        metadata = await run_io(get_file_metadata_cache().get, absolute_filepath)
+        metadata.ready = True
 
-        # Cache successful file access
-        if file_extension.lower() in video_extensions:
-            cache_file_access(absolute_filepath)
-
-    mime_type, _ = mimetypes.guess_type(absolute_filepath)
-    if mime_type is None:
-        mime_type = "application/octet-stream"
+    mime_type = metadata.mime_type or "application/octet-stream"
 
     if file_extension.lower() in model_extensions:
-        with open(absolute_filepath.replace(file_extension, ".txt")) as f:
-            content = f.read()
+        content = await run_io(_read_text, absolute_filepath.replace(file_extension, ".txt"))
 
         logger.info(f"Reading model file: {absolute_filepath}")
         logger.info(f"Model metadata: {content}")
@@ -431,33 +637,13 @@ async def search_file(request):
 
     else:
         try:
-            # For video files, add support for range requests (partial content)
+            headers = {
+                "Content-Disposition": f'attachment; filename="{os.path.basename(absolute_filepath)}"',
+            }
+            # Videos are scrubbed by the preview player, so let browsers keep ranges around
             if file_extension.lower() in video_extensions:
-                # Check if this is a range request
-                range_header = request.headers.get("Range")
-                if range_header:
-                    return await handle_range_request(
-                        request, absolute_filepath, range_header, mime_type
-                    )
-                else:
-                    # Return file with Accept-Ranges header to enable progressive download
-                    return web.FileResponse(
-                        path=absolute_filepath,
-                        headers={
-                            "Content-Type": mime_type,
-                            "Content-Disposition": f'attachment; filename="{os.path.basename(absolute_filepath)}"',
-                            "Accept-Ranges": "bytes",
-                            "Cache-Control": "public, max-age=3600",  # Cache for 1 hour
-                        },
-                    )
-            else:
-                return web.FileResponse(
-                    path=absolute_filepath,
-                    headers={
-                        "Content-Type": mime_type,
-                        "Content-Disposition": f'attachment; filename="{os.path.basename(absolute_filepath)}"',
-                    },
-                )
+                headers["Cache-Control"] = "public, max-age=3600"  # Cache for 1 hour
+            return await send_file(request, absolute_filepath, mime_type, headers)
         except Exception as e:
             logger.error(f"Error reading file: {e}")
             return web.json_response({"error": str(e)}, status=500, content_type="application/json")
@@ -490,8 +676,8 @@ async def delete_file(request):
             continue
 
         try:
-            if os.path.exists(normalized_path) and os.path.isfile(normalized_path):
-                os.remove(normalized_path)
+            if await run_io(os.path.isfile, normalized_path):
+                await run_io(os.remove, normalized_path)
                 file_found = True
                 return web.json_response({"message": f"File {filename} deleted successfully"})
         except Exception as e:
@@ -502,6 +688,14 @@ async def delete_file(request):
         return web.json_response({"error": "File not found"}, status=404)
 
 
+def _purge_files(directory_path):
+    os.makedirs(directory_path, exist_ok=True)
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            if entry.is_file():
+                os.remove(entry.path)
+
+
 @PromptServer.instance.routes.delete("/flowscale/io/purge")
 async def purge_directory(request):
     output_dir = "output"
@@ -509,11 +703,7 @@ async def purge_directory(request):
     directory_path = os.path.abspath(os.path.join(base_directory, output_dir))
 
     try:
-        os.makedirs(directory_path, exist_ok=True)
-        for file in os.listdir(directory_path):
-            file_path = os.path.join(directory_path, file)
-            if os.path.isfile(file_path):
-                os.remove(file_path)
+        await run_io(_purge_files, directory_path)
 
         return web.json_response({"message": "Directory purged successfully."})
     except Exception as e:
@@ -563,14 +753,14 @@ async def delete_directory(request):
         )
 
     # Check if directory exists
-    if not os.path.exists(sanitized_path) or not os.path.isdir(sanitized_path):
+    if not await run_io(os.path.isdir, sanitized_path):
         return web.json_response(
             {"error": "Directory does not exist."}, status=404, headers=headers
         )
 
     try:
         # Delete the directory and all contents
-        shutil.rmtree(sanitized_path)
+        await run_io(shutil.rmtree, sanitized_path)
         logger.info(f"Directory deleted: {sanitized_path}")
 
         return web.json_response(
@@ -622,7 +812,7 @@ async def is_file_ready_async(file_path, max_delay=15, check_interval=1):
     Async version with shorter check intervals and optimizations for video files.
     """
     elapsed_time = 0
-    stat_info = os.stat(file_path)
+    stat_info = await run_io(os.stat, file_path)
     size_initial = stat_info.st_size
     last_modification = stat_info.st_mtime
 
@@ -643,7 +833,7 @@ async def is_file_ready_async(file_path, max_delay=15, check_interval=1):
         elapsed_time += check_interval
 
         try:
-            stat_info = os.stat(file_path)
+            stat_info = await run_io(os.stat, file_path)
             size_current = stat_info.st_size
             current_modification = stat_info.st_mtime
 
@@ -663,7 +853,7 @@ async def is_file_ready_async(file_path, max_delay=15, check_interval=1):
 
     # After max_delay, return True if file exists and has size > 0
     try:
-        stat_info = os.stat(file_path)
+        stat_info = await run_io(os.stat, file_path)
         return stat_info.st_size > 0
     except OSError:
         return False
@@ -676,6 +866,13 @@ def is_file_ready(file_path, max_delay=15):
     return asyncio.run(is_file_ready_async(file_path, max_delay))
 
 
+def _save_uploaded_file(source, filepath):
+    source.seek(0)
+    # Replaced rather than rewritten, as the old file may be linked to a deduplicated upload
+    with atomic_output(filepath) as temp_path, open(temp_path, "wb") as f:
+        shutil.copyfileobj(source, f, 1024 * 1024)
+
+
 @PromptServer.instance.routes.post("/upload/video")
 async def upload_video(request):
     try:
@@ -694,8 +891,7 @@ async def upload_video(request):
         filepath = os.path.join(input_dir, filename)
 
         # Write the file
-        with open(filepath, "wb") as f:
-            f.write(video.file.read())
+        await run_io(_save_uploaded_file, video.file, filepath)
 
         return web.Response(status=200)
     except Exception as e:
@@ -705,75 +901,23 @@ async def upload_video(request):
 VIDEO_EXTENSIONS = ["mp4", "avi", "mov", "webm"]
 
 
+def _list_video_files(input_dir):
+    files = []
+    for f in os.listdir(input_dir):
+        if os.path.isfile(os.path.join(input_dir, f)):
+            file_parts = f.split(".")
+            if len(file_parts) > 1 and (file_parts[-1].lower() in VIDEO_EXTENSIONS):
+                files.append(f)
+    return sorted(files)
+
+
 @PromptServer.instance.routes.get("/fs/get_video_files")
 async def get_video_files(request):
     input_dir = folder_paths.get_input_directory()
-    files = []
 
     try:
-        for f in os.listdir(input_dir):
-            if os.path.isfile(os.path.join(input_dir, f)):
-                file_parts = f.split(".")
-                if len(file_parts) > 1 and (file_parts[-1].lower() in VIDEO_EXTENSIONS):
-                    files.append(f)
-
-        return web.json_response({"files": sorted(files)})
+        files = await run_io(_list_video_files, input_dir)
+        return web.json_response({"files": files})
     except Exception as e:
         logger.error(f"Error getting video files: {e}")
         return web.Response(status=500, text=str(e))
-
-
-async def handle_range_request(request, file_path, range_header, mime_type):
-    """
-    Handle HTTP range requests for partial content delivery (used for video streaming).
-    """
-    try:
-        file_size = os.path.getsize(file_path)
-
-        # Parse range header (e.g., "bytes=0-1023")
-        range_match = re.match(r"bytes=(\d+)-(\d*)", range_header)
-        if not range_match:
-            return web.Response(status=416)  # Range Not Satisfiable
-
-        start = int(range_match.group(1))
-        end = int(range_match.group(2)) if range_match.group(2) else file_size - 1
-
-        # Validate range
-        if start >= file_size or end >= file_size or start > end:
-            return web.Response(status=416)
-
-        content_length = end - start + 1
-
-        # Create streaming response
-        response = web.StreamResponse(
-            status=206,  # Partial Content
-            headers={
-                "Content-Type": mime_type,
-                "Content-Range": f"bytes {start}-{end}/{file_size}",
-                "Accept-Ranges": "bytes",
-                "Content-Length": str(content_length),
-                "Cache-Control": "public, max-age=3600",
-            },
-        )
-
-        await response.prepare(request)
-
-        # Stream the requested range
-        with open(file_path, "rb") as f:
-            f.seek(start)
-            remaining = content_length
-            chunk_size = 8192  # 8KB chunks
-
-            while remaining > 0:
-                chunk = f.read(min(chunk_size, remaining))
-                if not chunk:
-                    break
-                await response.write(chunk)
-                remaining -= len(chunk)
-
-        await response.write_eof()
-        return response
-
-    except Exception as e:
-        logger.error(f"Error handling range request: {e}")
-        return web.Response(status=500)
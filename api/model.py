@@ -1,9 +1,15 @@
+import contextlib
+import hashlib
 import logging
 import os
 
 from aiohttp import web
 from server import PromptServer  # type: ignore
 
+from ..nodes.content_index import store_upload
+from ..nodes.file_ready import partial_output_path
+from ..nodes.io_executor import run_io
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 MODELS_DIR = os.path.join(os.getcwd(), "models")
@@ -11,6 +17,22 @@ MODELS_DIR = os.path.join(os.getcwd(), "models")
 # Increase the maximum upload size limit (default is usually 1MB)
 # Set to 10GB (10 * 1024 * 1024 * 1024 bytes)
 MAX_UPLOAD_SIZE = 10 * 1024 * 1024 * 1024
+WRITE_BATCH_SIZE = 1024 * 1024  # bytes handed to the I/O executor per write
+
+
+def resolve_model_path(model_folder, model_name):
+    """
+    Resolve an upload's ``model_folder`` and ``model_name`` to a file path in
+    models/. Raises ``ValueError`` for folders outside models/ and for names
+    that are empty or refer to the folder itself (``.``, ``..``).
+    """
+    target_dir = os.path.normpath(os.path.join(MODELS_DIR, model_folder or ""))
+    if target_dir != MODELS_DIR and not target_dir.startswith(MODELS_DIR + os.sep):
+        raise ValueError("Invalid model folder.")
+    model_name = os.path.basename(model_name or "")
+    if model_name in ("", ".", ".."):
+        raise ValueError("Invalid model name.")
+    return os.path.join(target_dir, model_name)
 
 
 @PromptServer.instance.routes.get("/flowscale/model/list")
@@ -94,36 +116,57 @@ async def upload_model(request):
             model_name = f"{model_name}.safetensors"
             logger.debug(f"Updated model name: {model_name}")
 
-        # Create the directory if it doesn't exist
-        target_dir = os.path.join(MODELS_DIR, model_folder)
-        logger.debug(f"Target directory: {target_dir}")
-        os.makedirs(target_dir, exist_ok=True)
-
-        # Save the uploaded file to the models directory
-        destination_path = os.path.join(target_dir, model_name)
+        try:
+            destination_path = resolve_model_path(model_folder, model_name)
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
         logger.debug(f"Destination path: {destination_path}")
 
-        # Stream the file data to disk in chunks
+        # Create the directory if it doesn't exist
+        os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+
+        # Stream the file data to a temporary file in chunks, hashing it on the way
         size = 0
         chunk_count = 0
         chunk_size = 64 * 1024  # 64KB chunks
+        digest = hashlib.sha256()
+        temp_path = partial_output_path(destination_path)
 
         logger.debug(f"Starting streaming file write with {chunk_size}B chunks")
-        with open(destination_path, "wb") as f:
-            while True:
-                chunk = await model_file_field.read_chunk(size=chunk_size)
-                if not chunk:
-                    break
-
-                chunk_count += 1
-                current_chunk_size = len(chunk)
-                size += current_chunk_size
-                f.write(chunk)
-
-                if chunk_count % 100 == 0:
-                    logger.debug(f"Wrote {chunk_count} chunks, {size} bytes so far")
-
-        logger.debug(f"Completed streaming write: {chunk_count} chunks, {size} total bytes")
+        # Chunks are batched and written on the I/O executor, off the event loop
+        buffer = bytearray()
+        try:
+            f = await run_io(open, temp_path, "wb")
+            try:
+                while True:
+                    chunk = await model_file_field.read_chunk(size=chunk_size)
+                    if not chunk:
+                        break
+
+                    chunk_count += 1
+                    current_chunk_size = len(chunk)
+                    size += current_chunk_size
+                    digest.update(chunk)
+                    buffer += chunk
+                    if len(buffer) >= WRITE_BATCH_SIZE:
+                        batch, buffer = buffer, bytearray()
+                        await run_io(f.write, batch)
+
+                    if chunk_count % 100 == 0:
+                        logger.debug(f"Wrote {chunk_count} chunks, {size} bytes so far")
+                if buffer:
+                    await run_io(f.write, buffer)
+            finally:
+                await run_io(f.close)
+
+            logger.debug(f"Completed streaming write: {chunk_count} chunks, {size} total bytes")
+            # Renamed into place, or linked to an identical model uploaded before
+            sha256 = digest.hexdigest()
+            await run_io(store_upload, temp_path, destination_path, sha256, hardlink=True)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                await run_io(os.remove, temp_path)
+            raise
 
         # Verify the file was saved correctly
         if os.path.exists(destination_path):
@@ -140,6 +183,7 @@ async def upload_model(request):
                 "message": "Model uploaded successfully",
                 "path": destination_path,
                 "size_bytes": size,
+                "sha256": sha256,
             },
             status=200,
         )
@@ -0,0 +1,208 @@
+import logging
+
+from aiohttp import web
+from server import PromptServer  # type: ignore
+
+from ..nodes.file_metadata import file_metadata_metric_lines, get_file_metadata_cache
+from ..nodes.io_executor import io_metric_lines, run_io
+from ..nodes.presign_cache import PRESIGN_METHODS
+from ..nodes.s3_copy import copy_destination_allowed, copy_s3_object
+from ..nodes.s3_sync import SYNC_DIRECTIONS, resolve_local_directory, sync_directory
+from ..nodes.s3_utils import S3_BUCKET_NAME, get_presigned_urls, transfer_scheduler
+from ..nodes.transfer_metrics import get_transfer_metrics, scheduler_gauge_lines
+from ..nodes.upload_queue import get_upload_queue
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@PromptServer.instance.routes.get("/flowscale/s3/uploads")
+async def list_background_uploads(request):
+    """
+    Endpoint to list background S3 uploads, optionally filtered by `status`.
+    """
+    status = request.query.get("status")
+    try:
+        uploads = get_upload_queue().list(status=status)
+        return web.json_response({"uploads": uploads}, status=200)
+    except Exception as e:
+        logger.error(f"Error listing background uploads: {str(e)}")
+        return web.json_response(
+            {"error": "Failed to list background uploads", "details": str(e)}, status=500
+        )
+
+
+@PromptServer.instance.routes.get("/flowscale/s3/uploads/{job_id}")
+async def get_background_upload(request):
+    """
+    Endpoint to fetch the status of a single background S3 upload.
+    """
+    job = get_upload_queue().get(request.match_info["job_id"])
+    if job is None:
+        return web.json_response({"error": "Upload not found"}, status=404)
+    return web.json_response(job, status=200)
+
+
+@PromptServer.instance.routes.post("/flowscale/s3/presign")
+async def presign_s3_objects(request):
+    """
+    Endpoint to fetch presigned URLs for many keys in the configured bucket at once.
+    Body: {"keys": [...], "method": "get_object", "expires_in": 3600}
+    """
+    try:
+        data = await request.json()
+    except ValueError:
+        return web.json_response({"error": "Invalid JSON body"}, status=400)
+
+    keys = data.get("keys")
+    method = data.get("method", "get_object")
+    expires_in = data.get("expires_in")
+
+    if not S3_BUCKET_NAME:
+        return web.json_response({"error": "S3 bucket is not configured"}, status=500)
+    if not isinstance(keys, list) or not keys or not all(isinstance(k, str) for k in keys):
+        return web.json_response(
+            {"error": "'keys' must be a non-empty list of strings"}, status=400
+        )
+    if method not in PRESIGN_METHODS:
+        return web.json_response(
+            {"error": f"Unsupported method '{method}'", "details": list(PRESIGN_METHODS)},
+            status=400,
+        )
+    if expires_in is not None and (
+        not isinstance(expires_in, int) or not 0 < expires_in <= 7 * 24 * 60 * 60
+    ):
+        return web.json_response(
+            {"error": "'expires_in' must be between 1 and 604800 seconds"}, status=400
+        )
+
+    try:
+        urls = get_presigned_urls(S3_BUCKET_NAME, keys, method=method, expires_in=expires_in)
+        return web.json_response({"urls": urls}, status=200)
+    except Exception as e:
+        logger.error(f"Error generating presigned URLs: {str(e)}")
+        return web.json_response(
+            {"error": "Failed to generate presigned URLs", "details": str(e)}, status=500
+        )
+
+
+@PromptServer.instance.routes.post("/flowscale/s3/sync")
+async def sync_s3_directory(request):
+    """
+    Endpoint to sync a local directory with a prefix of the configured bucket.
+    Body: {"local_directory": "models/loras", "prefix": "loras", "direction": "upload",
+           "delete_extra": false, "compare_checksums": true, "dry_run": false}
+    Returns the sync manifest.
+    """
+    try:
+        data = await request.json()
+    except ValueError:
+        return web.json_response({"error": "Invalid JSON body"}, status=400)
+
+    direction = data.get("direction", "upload")
+    if direction not in SYNC_DIRECTIONS:
+        return web.json_response(
+            {"error": f"Unsupported direction '{direction}'", "details": SYNC_DIRECTIONS},
+            status=400,
+        )
+    if not data.get("local_directory") or not isinstance(data.get("prefix"), str):
+        return web.json_response(
+            {"error": "'local_directory' and 'prefix' are required"}, status=400
+        )
+    if not S3_BUCKET_NAME:
+        return web.json_response({"error": "S3 bucket is not configured"}, status=500)
+
+    try:
+        local_directory = resolve_local_directory(data["local_directory"])
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+
+    try:
+        manifest = await run_io(
+            sync_directory,
+            local_directory,
+            data["prefix"],
+            direction=direction,
+            delete_extra=bool(data.get("delete_extra", False)),
+            compare_checksums=bool(data.get("compare_checksums", True)),
+            dry_run=bool(data.get("dry_run", False)),
+        )
+        return web.json_response(manifest, status=200)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    except Exception as e:
+        logger.error(f"Error syncing {local_directory} with S3: {str(e)}")
+        return web.json_response(
+            {"error": "Failed to sync directory", "details": str(e)}, status=500
+        )
+
+
+@PromptServer.instance.routes.post("/flowscale/s3/copy")
+async def copy_s3_key(request):
+    """
+    Endpoint to copy an object from the configured bucket entirely inside S3.
+    Body: {"source_key": "models/x.safetensors", "destination_key": "public/x.safetensors",
+           "destination_bucket": "optional-other-bucket"}
+    The destination defaults to the configured bucket; any other bucket must be
+    listed in FLOWSCALE_S3_COPY_BUCKETS.
+    """
+    try:
+        data = await request.json()
+    except ValueError:
+        return web.json_response({"error": "Invalid JSON body"}, status=400)
+
+    source_key = data.get("source_key")
+    destination_key = data.get("destination_key")
+    if not source_key or not destination_key:
+        return web.json_response(
+            {"error": "'source_key' and 'destination_key' are required"}, status=400
+        )
+    if not S3_BUCKET_NAME:
+        return web.json_response({"error": "S3 bucket is not configured"}, status=500)
+
+    destination_bucket = data.get("destination_bucket") or S3_BUCKET_NAME
+    if not copy_destination_allowed(destination_bucket):
+        return web.json_response(
+            {"error": f"Copying into bucket '{destination_bucket}' is not allowed"}, status=403
+        )
+    try:
+        await run_io(
+            copy_s3_object,
+            S3_BUCKET_NAME,
+            source_key,
+            destination_bucket,
+            destination_key,
+        )
+        return web.json_response({"bucket": destination_bucket, "key": destination_key}, status=200)
+    except Exception as e:
+        logger.error(f"Error copying {source_key} to {destination_key}: {str(e)}")
+        return web.json_response({"error": "Failed to copy object", "details": str(e)}, status=500)
+
+
+@PromptServer.instance.routes.get("/flowscale/metrics")
+async def transfer_metrics(request):
+    """
+    Endpoint exposing S3 transfer metrics in the Prometheus text format.
+
+    Counts, bytes, retries and latency histograms per direction and priority
+    class, plus the current slot usage of the transfer scheduler, the hit
+    rate of the file API's metadata cache, the I/O executor's load and how
+    long the event loop has been blocked.
+    """
+    try:
+        body = get_transfer_metrics().render(
+            [
+                *scheduler_gauge_lines(transfer_scheduler.stats()),
+                *file_metadata_metric_lines(get_file_metadata_cache().stats()),
+                *io_metric_lines(),
+            ]
+        )
+        return web.Response(
+            body=body.encode("utf-8"),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+    except Exception as e:
+        logger.error(f"Error rendering transfer metrics: {str(e)}")
+        return web.json_response(
+            {"error": "Failed to render transfer metrics", "details": str(e)}, status=500
+        )
@@ -0,0 +1,332 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+
+from aiohttp import web
+from server import PromptServer  # type: ignore
+
+from ..nodes.content_index import get_content_index
+from ..nodes.io_executor import run_io
+from ..nodes.resumable_upload import (
+    UPLOAD_MAX_CHUNK_SIZE,
+    UploadSessionError,
+    get_upload_sessions,
+    parse_checksum_header,
+)
+from .io import sanitize_upload_filename, upload_media_type
+from .model import WRITE_BATCH_SIZE, resolve_model_path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+UPLOAD_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, HEAD, POST, PUT, DELETE, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Upload-Offset, Upload-Checksum",
+    "Access-Control-Expose-Headers": "Location, Upload-Offset, Upload-Length",
+    "Cache-Control": "no-store",
+}
+SHA256_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+def _session_response(session, status=200):
+    headers = {
+        **UPLOAD_HEADERS,
+        "Location": f"/flowscale/uploads/{session['upload_id']}",
+        "Upload-Offset": str(session["offset"]),
+        "Upload-Length": str(session["size"]),
+    }
+    return web.json_response(session, status=status, headers=headers)
+
+
+def _error_response(message, status):
+    return web.json_response({"error": message}, status=status, headers=UPLOAD_HEADERS)
+
+
+async def _read_size(request):
+    try:
+        body = await request.json()
+        size = int(body["size"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise UploadSessionError("A JSON body with an integer size is required.") from e
+    return body, size
+
+
+def _media_destination(body):
+    """Resolve ``filename`` of a media upload body to ``(path in input/, media type)``"""
+    filename = sanitize_upload_filename(str(body.get("filename") or ""))
+    media_type = upload_media_type(os.path.splitext(filename)[1].lower())
+    if media_type is None:
+        raise UploadSessionError(
+            "Invalid file type. Only images, videos, and audio files are allowed."
+        )
+    return os.path.join(os.getcwd(), "input", filename), media_type
+
+
+def _model_destination(body):
+    """Resolve ``model_name`` and ``model_folder`` of a model upload body to a path in models/"""
+    if not body.get("model_name"):
+        raise UploadSessionError("Model name is required")
+    try:
+        return resolve_model_path(str(body.get("model_folder") or ""), str(body["model_name"]))
+    except ValueError as e:
+        raise UploadSessionError(str(e)) from e
+
+
+def _media_payload(destination, size, media_type, sha256=None):
+    payload = {
+        "message": "File uploaded successfully.",
+        "filename": os.path.basename(destination),
+        "size": size,
+        "type": media_type,
+    }
+    if sha256:
+        payload["sha256"] = sha256
+    return payload
+
+
+def _model_payload(destination, size, sha256=None):
+    payload = {"message": "Model uploaded successfully", "path": destination, "size_bytes": size}
+    if sha256:
+        payload["sha256"] = sha256
+    return payload
+
+
+async def _read_sha256(request):
+    try:
+        body = await request.json()
+        sha256 = str(body["sha256"]).lower()
+    except (ValueError, KeyError, TypeError) as e:
+        raise UploadSessionError("A JSON body with a sha256 digest is required.") from e
+    if not SHA256_PATTERN.fullmatch(sha256):
+        raise UploadSessionError("sha256 must be a hex encoded SHA-256 digest.")
+    return body, sha256
+
+
+async def _materialize(sha256, destination, hardlink=False):
+    """Copy known content ``sha256`` to ``destination``; returns its size or ``None``"""
+    index = get_content_index()
+    if index is None:
+        return None
+    return await run_io(index.materialize, sha256, destination, hardlink)
+
+
+@PromptServer.instance.routes.post("/flowscale/io/upload/check")
+async def check_media_upload(request):
+    """
+    Hash-first upload into `input/`.
+
+    Body: `{"filename": ..., "sha256": <hex digest>}`. When a file with this
+    content was uploaded before, it is copied to `filename` and the answer is
+    `{"exists": true, ...}` shaped like the `/flowscale/io/upload` response,
+    so the body never has to be sent. Otherwise `{"exists": false}`.
+    """
+    try:
+        body, sha256 = await _read_sha256(request)
+        destination, media_type = _media_destination(body)
+        size = await _materialize(sha256, destination)
+    except UploadSessionError as e:
+        return _error_response(str(e), e.status)
+    except Exception as e:
+        logger.error(f"Error checking upload: {e}")
+        return _error_response(str(e), 500)
+    if size is None:
+        return web.json_response({"exists": False}, headers=UPLOAD_HEADERS)
+    payload = _media_payload(destination, size, media_type, sha256)
+    return web.json_response({"exists": True, **payload}, headers=UPLOAD_HEADERS)
+
+
+@PromptServer.instance.routes.post("/flowscale/model/upload/check")
+async def check_model_upload(request):
+    """
+    Hash-first upload into `models/`.
+
+    Body: `{"model_name": ..., "model_folder": ..., "sha256": <hex digest>}`;
+    works like `/flowscale/io/upload/check`.
+    """
+    try:
+        body, sha256 = await _read_sha256(request)
+        destination = _model_destination(body)
+        size = await _materialize(sha256, destination, hardlink=True)
+    except UploadSessionError as e:
+        return _error_response(str(e), e.status)
+    except Exception as e:
+        logger.error(f"Error checking model upload: {e}")
+        return _error_response(str(e), 500)
+    if size is None:
+        return web.json_response({"exists": False}, headers=UPLOAD_HEADERS)
+    payload = _model_payload(destination, size, sha256)
+    return web.json_response({"exists": True, **payload}, headers=UPLOAD_HEADERS)
+
+
+@PromptServer.instance.routes.post("/flowscale/io/upload/sessions")
+async def create_media_upload(request):
+    """
+    Start a resumable upload into `input/`.
+
+    Body: `{"filename": ..., "size": <bytes>}`. Send the file with
+    `PUT /flowscale/uploads/{upload_id}` chunks, then finish it with
+    `POST /flowscale/uploads/{upload_id}/complete`. Unlike
+    `/flowscale/io/upload` there is no size cap beyond free disk space.
+    """
+    try:
+        body, size = await _read_size(request)
+        destination, media_type = _media_destination(body)
+        session = await run_io(
+            get_upload_sessions().create, "media", destination, size, {"type": media_type}
+        )
+        return _session_response(session, status=201)
+    except UploadSessionError as e:
+        return _error_response(str(e), e.status)
+    except Exception as e:
+        logger.error(f"Error creating upload session: {e}")
+        return _error_response(str(e), 500)
+
+
+@PromptServer.instance.routes.post("/flowscale/model/upload/sessions")
+async def create_model_upload(request):
+    """
+    Start a resumable upload into `models/`.
+
+    Body: `{"model_name": ..., "model_folder": ..., "size": <bytes>}`; the
+    protocol is the same as for `/flowscale/io/upload/sessions`.
+    """
+    try:
+        body, size = await _read_size(request)
+        destination = _model_destination(body)
+        session = await run_io(get_upload_sessions().create, "model", destination, size)
+        return _session_response(session, status=201)
+    except UploadSessionError as e:
+        return _error_response(str(e), e.status)
+    except Exception as e:
+        logger.error(f"Error creating model upload session: {e}")
+        return _error_response(str(e), 500)
+
+
+@PromptServer.instance.routes.get("/flowscale/uploads/{upload_id}")
+async def get_upload(request):
+    """
+    Offset query for a resumable upload: `offset` is the number of bytes
+    received from the start, `received`/`missing` list byte ranges
+    (`[start, end)`) for clients that send chunks out of order.
+    """
+    try:
+        session = await run_io(get_upload_sessions().get, request.match_info["upload_id"])
+        return _session_response(session)
+    except UploadSessionError as e:
+        return _error_response(str(e), e.status)
+
+
+@PromptServer.instance.routes.put("/flowscale/uploads/{upload_id}")
+async def put_upload_chunk(request):
+    """
+    Write one chunk of a resumable upload at the byte offset given by the
+    `Upload-Offset` header (or `offset` query parameter). Chunks may arrive in
+    any order and be retried. With an `Upload-Checksum: <sha256|sha1|md5>
+    <base64 digest>` header a corrupted chunk is refused with 460 and has to
+    be sent again.
+    """
+    upload_id = request.match_info["upload_id"]
+    store = get_upload_sessions()
+    try:
+        try:
+            offset = int(request.headers.get("Upload-Offset") or request.query["offset"])
+        except (KeyError, ValueError) as e:
+            raise UploadSessionError("Upload-Offset header is required.") from e
+        length = request.content_length
+        if length is not None and length > UPLOAD_MAX_CHUNK_SIZE:
+            raise UploadSessionError(
+                f"Chunks may be at most {UPLOAD_MAX_CHUNK_SIZE} bytes.", status=413
+            )
+        checksum = request.headers.get("Upload-Checksum")
+        checksum = parse_checksum_header(checksum) if checksum else None
+        partial_path, size = await run_io(store.check_chunk, upload_id, offset, length)
+    except UploadSessionError as e:
+        return _error_response(str(e), e.status)
+
+    digest = hashlib.new(checksum[0]) if checksum else None
+    written = 0
+    buffer = bytearray()
+    try:
+        async for data in request.content.iter_chunked(WRITE_BATCH_SIZE):
+            if offset + written + len(buffer) + len(data) > size:
+                raise UploadSessionError("Chunk extends past the declared size.", status=416)
+            if written + len(buffer) + len(data) > UPLOAD_MAX_CHUNK_SIZE:
+                raise UploadSessionError(
+                    f"Chunks may be at most {UPLOAD_MAX_CHUNK_SIZE} bytes.", status=413
+                )
+            if digest:
+                digest.update(data)
+            buffer += data
+            if len(buffer) >= WRITE_BATCH_SIZE:
+                batch, buffer = buffer, bytearray()
+                written += len(batch)
+                await run_io(store.write, partial_path, batch, offset + written - len(batch))
+        if buffer:
+            written += len(buffer)
+            await run_io(store.write, partial_path, buffer, offset + written - len(buffer))
+
+        if length is not None and written != length:
+            raise UploadSessionError("Chunk body is shorter than its Content-Length.")
+        if digest and digest.digest() != checksum[1]:
+            raise UploadSessionError("Checksum mismatch.", status=460)
+        session = await run_io(store.record_chunk, upload_id, offset, written)
+        return _session_response(session)
+    except BaseException as e:
+        # Bytes handed to the writer may have overwritten a range received earlier
+        await run_io(store.discard_range, upload_id, offset, written)
+        if isinstance(e, UploadSessionError):
+            return _error_response(str(e), e.status)
+        if isinstance(e, Exception):
+            logger.error(f"Error writing chunk of upload {upload_id}: {e}")
+            return _error_response(str(e), 500)
+        raise
+    finally:
+        # Shielded, as a leaked writer would keep the upload from ever completing
+        await asyncio.shield(run_io(store.release_chunk, upload_id))
+
+
+@PromptServer.instance.routes.post("/flowscale/uploads/{upload_id}/complete")
+async def complete_upload(request):
+    """
+    Finish a resumable upload once every byte has arrived. An optional
+    `Upload-Checksum` header is checked against the whole file before it is
+    renamed atomically into place.
+    """
+    upload_id = request.match_info["upload_id"]
+    try:
+        checksum = request.headers.get("Upload-Checksum")
+        checksum = parse_checksum_header(checksum) if checksum else None
+        session = await run_io(get_upload_sessions().complete, upload_id, checksum)
+    except UploadSessionError as e:
+        return _error_response(str(e), e.status)
+    except Exception as e:
+        logger.error(f"Error completing upload {upload_id}: {e}")
+        return _error_response(str(e), 500)
+
+    sha256 = None
+    if checksum is not None and checksum[0] == "sha256":
+        # The whole file was just verified against this digest, so it can be indexed
+        sha256 = checksum[1].hex()
+        index = get_content_index()
+        if index is not None:
+            await run_io(index.add, sha256, session["destination"], session["kind"] == "model")
+    if session["kind"] == "model":
+        payload = _model_payload(session["destination"], session["size"], sha256)
+    else:
+        payload = _media_payload(
+            session["destination"], session["size"], session["metadata"].get("type"), sha256
+        )
+    return web.json_response(payload, headers=UPLOAD_HEADERS)
+
+
+@PromptServer.instance.routes.delete("/flowscale/uploads/{upload_id}")
+async def abort_upload(request):
+    """Abandon a resumable upload and delete what was received"""
+    try:
+        await run_io(get_upload_sessions().abort, request.match_info["upload_id"])
+        return web.Response(status=204, headers=UPLOAD_HEADERS)
+    except UploadSessionError as e:
+        return _error_response(str(e), e.status)
@@ -0,0 +1,471 @@
+"""
+Benchmark the S3 transfer paths in ``nodes/s3_utils.py`` against a local S3 stand-in.
+
+Runs single-part and multipart uploads, ranged downloads, link relays and
+batch image uploads over a range of sizes and writes a JSON report with the
+throughput, latency and peak RSS of every case, so runs before and after a
+change to part sizes or concurrency can be compared:
+
+    python benchmarks/s3_transfers.py --output before.json
+    FLOWSCALE_S3_UPLOAD_CONCURRENCY=16 python benchmarks/s3_transfers.py \\
+        --output after.json --baseline before.json
+
+By default an in-process moto server (``pip install "moto[server]"``) is the
+stand-in; pass ``--endpoint-url`` to use MinIO or any other S3-compatible
+server instead, which is advisable for multi-GB sizes since moto keeps every
+object in memory. The modules import ComfyUI's ``folder_paths``, so the
+ComfyUI root must be importable: by default it is assumed to be two levels up
+from this repository (``ComfyUI/custom_nodes/flowscale-nodes``).
+"""
+
+import argparse
+import contextlib
+import functools
+import importlib
+import json
+import os
+import platform
+import resource
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import types
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = "flowscale_nodes_bench"
+
+MB = 1024 * 1024
+DEFAULT_SIZES = "1MB,16MB,128MB,1GB"
+DEFAULT_IMAGE_BATCHES = "1,4,16"
+IMAGE_SIZE = 1024  # square frames, as produced by a typical SDXL workflow
+RSS_SAMPLE_INTERVAL = 0.02
+REPORT_SCHEMA = 1
+
+CASES = ["upload_small_file", "upload_multipart", "download_ranged", "relay_link", "image_batch"]
+
+_UNITS = {"B": 1, "KB": 1024, "MB": MB, "GB": 1024 * MB}
+
+
+def parse_size(text):
+    text = text.strip().upper()
+    for unit in ("GB", "MB", "KB", "B"):
+        if text.endswith(unit):
+            return int(float(text[: -len(unit)]) * _UNITS[unit])
+    return int(text)
+
+
+def format_size(size):
+    for unit in ("GB", "MB", "KB"):
+        if size >= _UNITS[unit] and size % _UNITS[unit] == 0:
+            return f"{size // _UNITS[unit]}{unit}"
+    return f"{size}B"
+
+
+def _current_rss():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _peak_rss():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """
+    Track the peak resident set size while a case runs.
+
+    Samples ``/proc/self/statm`` on a background thread; where that is not
+    available the process-wide peak from ``getrusage`` is reported instead,
+    which only ever grows and so is less useful for comparing cases.
+    """
+
+    def __init__(self):
+        self.baseline = _current_rss()
+        self.peak = self.baseline
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(RSS_SAMPLE_INTERVAL):
+            rss = _current_rss()
+            if rss is not None and rss > self.peak:
+                self.peak = rss
+
+    def __enter__(self):
+        if self.baseline is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        else:
+            self.peak = _peak_rss()
+
+    def result(self):
+        return {
+            "rss_peak_bytes": self.peak,
+            "rss_delta_bytes": self.peak - self.baseline if self.baseline is not None else None,
+        }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def moto_server():
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        sys.exit('moto is not installed; pip install "moto[server]" or pass --endpoint-url')
+
+    port = _free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.stop()
+
+
+def _file_handler(directory):
+    class FileHandler(BaseHTTPRequestHandler):
+        """Serves files with a Content-Length, like a CDN-hosted workflow output"""
+
+        def do_GET(self):
+            path = os.path.join(directory, os.path.basename(self.path))
+            if not os.path.isfile(path):
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(os.path.getsize(path)))
+            self.end_headers()
+            with open(path, "rb") as f:
+                while chunk := f.read(MB):
+                    self.wfile.write(chunk)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FileHandler
+
+
+@contextlib.contextmanager
+def file_server(directory):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _file_handler(directory))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def write_test_file(path, size):
+    """Write ``size`` bytes of incompressible data without holding it all in memory"""
+    block = os.urandom(MB)
+    with open(path, "wb") as f:
+        remaining = size
+        while remaining:
+            chunk = block[: min(remaining, MB)]
+            f.write(chunk)
+            remaining -= len(chunk)
+            # Vary the blocks so stores that deduplicate cannot shortcut the transfer
+            block = block[1:] + block[:1]
+
+
+def load_modules(comfyui_root):
+    """
+    Import the transfer modules without running the package ``__init__``, which
+    registers routes on a live ComfyUI server.
+    """
+    sys.path.insert(0, comfyui_root)
+    try:
+        importlib.import_module("folder_paths")
+    except ImportError:
+        sys.exit(
+            f"ComfyUI's folder_paths is not importable from {comfyui_root}; pass --comfyui-root"
+        )
+
+    package = types.ModuleType(PACKAGE_NAME)
+    package.__path__ = [REPO_ROOT]
+    sys.modules[PACKAGE_NAME] = package
+    return {
+        "s3_utils": importlib.import_module(f"{PACKAGE_NAME}.nodes.s3_utils"),
+        "transfer_metrics": importlib.import_module(f"{PACKAGE_NAME}.nodes.transfer_metrics"),
+    }
+
+
+def run_case(name, size, iterations, transfer, cleanup=None):
+    """Time ``transfer`` ``iterations`` times and summarize it as one report entry"""
+    seconds = []
+    error = None
+    with RssSampler() as rss:
+        for _ in range(iterations):
+            started = time.perf_counter()
+            try:
+                transfer()
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                break
+            seconds.append(time.perf_counter() - started)
+            if cleanup:
+                cleanup()
+
+    result = {
+        "case": name,
+        "size_bytes": size,
+        "size": format_size(size),
+        "iterations": len(seconds),
+    }
+    if error:
+        result["error"] = error
+    if seconds:
+        median = statistics.median(seconds)
+        result.update(
+            {
+                "seconds": [round(s, 4) for s in seconds],
+                "latency_median_seconds": round(median, 4),
+                "latency_min_seconds": round(min(seconds), 4),
+                "latency_max_seconds": round(max(seconds), 4),
+                "throughput_median_mbps": round(size / MB / median, 2) if median else None,
+            }
+        )
+    result.update(rss.result())
+    status = result.get("error") or (
+        f"{result['throughput_median_mbps']} MB/s, {result['latency_median_seconds']}s median"
+    )
+    print(f"  {name:<18} {result['size']:>7}  {status}", flush=True)
+    return result
+
+
+def _image_batch(batch_size):
+    try:
+        import numpy as np
+        import torch
+    except ImportError as e:
+        raise RuntimeError(f"image batches need numpy and torch: {e}") from e
+
+    rng = np.random.default_rng(0)
+    frames = rng.random((batch_size, IMAGE_SIZE, IMAGE_SIZE, 3), dtype=np.float32)
+    return torch.from_numpy(frames)
+
+
+def run_benchmarks(args, modules, bucket, work_dir):
+    s3_utils = modules["s3_utils"]
+    s3_client = s3_utils.get_optimized_s3_client()
+    cases = set(args.cases)
+    results = []
+
+    download_path = os.path.join(work_dir, "download.bin")
+    with file_server(work_dir) as file_url:
+        for size in args.sizes:
+            path = os.path.join(work_dir, f"payload-{size}.bin")
+            write_test_file(path, size)
+            key = f"bench/{format_size(size)}.bin"
+            print(f"{format_size(size)}:", flush=True)
+
+            transfers = {
+                "upload_small_file": (
+                    functools.partial(s3_utils.upload_small_file, path, bucket, key),
+                    None,
+                ),
+                "upload_multipart": (
+                    functools.partial(s3_utils.upload_large_file_multipart, path, bucket, key),
+                    None,
+                ),
+                "download_ranged": (
+                    functools.partial(
+                        s3_utils.download_s3_object_parallel, bucket, key, download_path
+                    ),
+                    functools.partial(os.remove, download_path),
+                ),
+                "relay_link": (
+                    functools.partial(
+                        s3_utils.relay_url_to_s3,
+                        f"{file_url}/{os.path.basename(path)}",
+                        bucket,
+                        f"bench/relay-{format_size(size)}.bin",
+                    ),
+                    None,
+                ),
+            }
+            for name, (transfer, cleanup) in transfers.items():
+                if name not in cases:
+                    continue
+                if name == "download_ranged":
+                    s3_utils.upload_with_progress(path, bucket, key)
+                results.append(run_case(name, size, args.iterations, transfer, cleanup))
+
+            os.remove(path)
+            for stale_key in (key, f"bench/relay-{format_size(size)}.bin"):
+                with contextlib.suppress(Exception):
+                    s3_client.delete_object(Bucket=bucket, Key=stale_key)
+
+    if "image_batch" in cases:
+        print("image batches:", flush=True)
+        node = s3_utils.UploadImageToS3()
+        node.bucket_name = bucket
+        for batch_size in args.image_batches:
+            try:
+                images = _image_batch(batch_size)
+            except RuntimeError as e:
+                results.append({"case": "image_batch", "batch_size": batch_size, "error": str(e)})
+                print(f"  image_batch        skipped: {e}", flush=True)
+                break
+            size = images.numel() * images.element_size()
+            result = run_case(
+                "image_batch",
+                size,
+                args.iterations,
+                functools.partial(
+                    node.upload_images_to_s3,
+                    images,
+                    "bench",
+                    identifier="bench",
+                    save_local_copy=False,
+                ),
+            )
+            result["batch_size"] = batch_size
+            results.append(result)
+
+    return results
+
+
+def settings(s3_utils):
+    return {
+        name: getattr(s3_utils, name)
+        for name in (
+            "MULTIPART_THRESHOLD",
+            "MIN_PART_SIZE",
+            "S3_UPLOAD_CONCURRENCY",
+            "S3_MAX_INFLIGHT_BYTES",
+            "S3_DOWNLOAD_CONCURRENCY",
+            "S3_DOWNLOAD_PART_SIZE",
+            "S3_CHECKSUMS",
+            "S3_MAX_POOL_CONNECTIONS",
+            "IMAGE_UPLOAD_CONCURRENCY",
+            "RELAY_MAX_BUFFERED_PARTS",
+        )
+    }
+
+
+def _result_key(result):
+    return (result["case"], result.get("batch_size", result.get("size_bytes")))
+
+
+def compare(report, baseline, max_regression):
+    """Print the median throughput change per case; return the cases that regressed"""
+    previous = {_result_key(r): r for r in baseline["results"]}
+    regressions = []
+    print(f"\n{'case':<18} {'size':>7} {'before':>10} {'after':>10} {'change':>8}")
+    for result in report["results"]:
+        before = previous.get(_result_key(result), {}).get("throughput_median_mbps")
+        after = result.get("throughput_median_mbps")
+        if not before or not after:
+            continue
+        change = (after - before) / before * 100
+        print(
+            f"{result['case']:<18} {result.get('size', ''):>7} {before:>10} {after:>10} {change:>+7.1f}%"
+        )
+        if max_regression is not None and change < -max_regression:
+            regressions.append(result)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"default: {DEFAULT_SIZES}")
+    parser.add_argument(
+        "--image-batches", default=DEFAULT_IMAGE_BATCHES, help=f"default: {DEFAULT_IMAGE_BATCHES}"
+    )
+    parser.add_argument("--cases", default=",".join(CASES), help="comma-separated subset to run")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--endpoint-url", help="existing S3-compatible server instead of moto")
+    parser.add_argument("--bucket", default="flowscale-bench")
+    parser.add_argument(
+        "--comfyui-root",
+        default=os.path.dirname(os.path.dirname(REPO_ROOT)),
+        help="ComfyUI checkout",
+    )
+    parser.add_argument("--work-dir", help="where payload files are written (default: a temp dir)")
+    parser.add_argument("--output", default="s3_benchmark.json", help="JSON report path")
+    parser.add_argument("--baseline", help="earlier report to compare median throughput against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        help="with --baseline, exit non-zero if any case slowed down by more than this percent",
+    )
+    args = parser.parse_args(argv)
+    args.sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    args.image_batches = [int(n) for n in args.image_batches.split(",") if n.strip()]
+    args.cases = [c.strip() for c in args.cases.split(",") if c.strip()]
+    unknown = set(args.cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}; choose from {', '.join(CASES)}")
+
+    with contextlib.ExitStack() as stack:
+        endpoint_url = args.endpoint_url or stack.enter_context(moto_server())
+        # Read by s3_utils at import time
+        os.environ["AWS_S3_ENDPOINT_URL"] = endpoint_url
+        os.environ["AWS_S3_BUCKET_NAME"] = args.bucket
+        if not args.endpoint_url:
+            os.environ["AWS_S3_ACCESS_KEY_ID"] = "testing"
+            os.environ["AWS_S3_SECRET_ACCESS_KEY"] = "testing"
+
+        modules = load_modules(args.comfyui_root)
+        s3_client = modules["s3_utils"].get_optimized_s3_client()
+        with contextlib.suppress(Exception):
+            s3_client.create_bucket(Bucket=args.bucket)
+
+        work_dir = args.work_dir or stack.enter_context(tempfile.TemporaryDirectory())
+        started_at = datetime.now(timezone.utc).isoformat()
+        results = run_benchmarks(args, modules, args.bucket, work_dir)
+
+        report = {
+            "schema": REPORT_SCHEMA,
+            "started_at": started_at,
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "stand_in": "external" if args.endpoint_url else "moto",
+                "endpoint_url": endpoint_url,
+            },
+            "settings": settings(modules["s3_utils"]),
+            "results": results,
+            "metrics": modules["transfer_metrics"].get_transfer_metrics().render(),
+        }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        if regressions:
+            print(f"\n{len(regressions)} cases regressed by more than {args.max_regression}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
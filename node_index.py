@@ -16,6 +16,8 @@ from .nodes.hunyuan3d import FSHunyuan3DGenerate
 from .nodes.io.threed import FSLoad3D, FSSave3D
 from .nodes.io.video import FSLoadVideo, FSLoadVideoFromURL, FSSaveVideo
 from .nodes.model_utils import LoadModelFromURL
+from .nodes.s3_copy import CopyModelInS3
+from .nodes.s3_sync import SyncDirectoryWithS3
 from .nodes.s3_utils import (
     LoadModelFromPrivateS3,
     LoadModelFromPublicS3,
@@ -42,6 +44,8 @@ NODE_CLASS_MAPPINGS = {
     "UploadModelToPrivateS3": UploadModelToPrivateS3,
     "LoadModelFromPublicS3": LoadModelFromPublicS3,
     "LoadModelFromPrivateS3": LoadModelFromPrivateS3,
+    "CopyModelInS3": CopyModelInS3,
+    "SyncDirectoryWithS3": SyncDirectoryWithS3,
     "LoadModelFromURL": LoadModelFromURL,
     "SaveModelToFlowscaleVolume": SaveModelToFlowscaleVolume,
     "WebhookSender": WebhookSender,
@@ -81,6 +85,8 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "UploadModelToPrivateS3": f"[FS]{FS_NODE_ICON}Upload Model to Private S3",
     "LoadModelFromPublicS3": f"[FS]{FS_NODE_ICON}Load Model from Public S3",
     "LoadModelFromPrivateS3": f"[FS]{FS_NODE_ICON}Load Model to Private S3",
+    "CopyModelInS3": f"[FS]{FS_NODE_ICON}Copy Model in S3",
+    "SyncDirectoryWithS3": f"[FS]{FS_NODE_ICON}Sync Directory with S3",
     "LoadModelFromURL": f"[FS]{FS_NODE_ICON}Load Model from URL",
     "SaveModelToFlowscaleVolume": f"[FS]{FS_NODE_ICON}Save Model to Flowscale Volume",
     "GithubReadmeExtractor": f"[FS]{FS_NODE_ICON}Extract GitHub Readme",
@@ -0,0 +1,157 @@
+import json
+import logging
+import os
+import threading
+
+from .file_ready import mark_file_ready
+from .model_cache import link_or_copy
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CONTENT_INDEX_DIR = os.environ.get(
+    "FLOWSCALE_CONTENT_INDEX_DIR", os.path.join(os.getcwd(), ".flowscale_cache", "content_index")
+)
+CONTENT_DEDUPE_ENABLED = os.environ.get("FLOWSCALE_UPLOAD_DEDUPE", "true").lower() == "true"
+
+_content_index = None
+_content_index_lock = threading.Lock()
+
+
+class ContentIndex:
+    """
+    Index of uploaded files by SHA-256, used to deduplicate uploads.
+
+    Each digest maps to one canonical path together with the inode, size and
+    mtime it had when it was indexed; an entry whose file has since changed or
+    disappeared is dropped on lookup. Duplicates are materialized with
+    ``link_or_copy``. Hardlinks are only used between files indexed with
+    ``hardlink=True`` (models), which are always replaced by rename rather than
+    rewritten. Media in input/ may be rewritten in place by ComfyUI itself
+    (``/upload/image`` with ``overwrite``, the mask editor), which would change
+    every hardlinked twin, so media duplicates are reflinked where the
+    filesystem supports copy-on-write clones and copied otherwise.
+    """
+
+    def __init__(self, index_dir=CONTENT_INDEX_DIR):
+        self.index_dir = index_dir
+        self._index_path = os.path.join(index_dir, "index.json")
+        self._lock = threading.Lock()
+        os.makedirs(index_dir, exist_ok=True)
+        self._entries = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable content index: {e}")
+            return {}
+
+    def _save_index(self):
+        tmp_path = f"{self._index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _lookup_entry(self, sha256):
+        sha256 = sha256.lower()
+        with self._lock:
+            entry = self._entries.get(sha256)
+            if entry is None:
+                return None
+            try:
+                info = os.stat(entry["path"])
+                if (info.st_ino, info.st_size, info.st_mtime_ns) == (
+                    entry["inode"],
+                    entry["size"],
+                    entry["mtime_ns"],
+                ):
+                    return dict(entry)
+            except OSError:
+                pass
+            del self._entries[sha256]
+            self._save_index()
+            return None
+
+    def lookup(self, sha256):
+        """Return the canonical path holding content ``sha256``, or ``None``"""
+        entry = self._lookup_entry(sha256)
+        return entry["path"] if entry else None
+
+    def add(self, sha256, path, hardlink=False):
+        """
+        Record ``path`` as holding ``sha256`` unless a valid copy is already
+        indexed. ``hardlink`` marks a file that is never rewritten in place.
+        """
+        path = os.path.abspath(path)
+        if self.lookup(sha256) is not None:
+            return
+        info = os.stat(path)
+        with self._lock:
+            self._entries[sha256.lower()] = {
+                "path": path,
+                "inode": info.st_ino,
+                "size": info.st_size,
+                "mtime_ns": info.st_mtime_ns,
+                "hardlink": hardlink,
+            }
+            self._save_index()
+
+    def materialize(self, sha256, destination, hardlink=False):
+        """
+        Place a copy of content ``sha256`` at ``destination`` without transferring
+        it. Returns the size of the file, or ``None`` when the content is unknown.
+        With ``hardlink`` the copy is a hardlink if the indexed file allows it.
+        """
+        entry = self._lookup_entry(sha256)
+        if entry is None:
+            return None
+        existing = entry["path"]
+        destination = os.path.abspath(destination)
+        if not (os.path.exists(destination) and os.path.samefile(existing, destination)):
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            link_or_copy(existing, destination, hardlink=hardlink and entry.get("hardlink", False))
+            mark_file_ready(destination)
+            logger.info(f"Deduplicated upload {destination} against {existing}")
+        return os.path.getsize(destination)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries)}
+
+
+def get_content_index():
+    """
+    Return the process-wide content index, or ``None`` when deduplication is
+    disabled with ``FLOWSCALE_UPLOAD_DEDUPE=false``.
+    """
+    global _content_index
+
+    if not CONTENT_DEDUPE_ENABLED:
+        return None
+    with _content_index_lock:
+        if _content_index is None:
+            _content_index = ContentIndex()
+    return _content_index
+
+
+def store_upload(temp_path, path, sha256, hardlink=False):
+    """
+    Move a fully written upload from ``temp_path`` to ``path``. When identical
+    content is already indexed, ``path`` becomes a copy of it (see
+    ``ContentIndex`` for when that is a hardlink) and the new file is deleted;
+    otherwise the upload is renamed into place and indexed. Pass ``hardlink``
+    for models. Returns True when the upload was deduplicated.
+    """
+    index = get_content_index()
+    if index is not None and index.materialize(sha256, path, hardlink) is not None:
+        os.remove(temp_path)
+        return True
+    os.replace(temp_path, path)
+    mark_file_ready(path)
+    if index is not None:
+        index.add(sha256, path, hardlink)
+    return False
@@ -0,0 +1,370 @@
+import bisect
+import contextlib
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import stat
+import struct
+import sys
+import threading
+import time
+
+import folder_paths  # type: ignore
+
+from .file_ready import get_file_ready_registry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DIRECTORY_INDEX_ENABLED = os.environ.get("FLOWSCALE_IO_INDEX", "true").lower() == "true"
+# Full rescans repair anything inotify missed; without inotify they are the only updates
+DIRECTORY_INDEX_RESCAN_INTERVAL = float(os.environ.get("FLOWSCALE_IO_INDEX_RESCAN_INTERVAL", "300"))
+DIRECTORY_INDEX_POLL_INTERVAL = float(os.environ.get("FLOWSCALE_IO_INDEX_POLL_INTERVAL", "10"))
+
+# inotify(7) event masks
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (
+    IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+_directory_index = None
+_directory_index_lock = threading.Lock()
+
+
+class _Listing:
+    """Files of one directory, with names kept sorted for prefix lookups"""
+
+    __slots__ = ("names", "stats")
+
+    def __init__(self, stats=None):
+        self.stats = stats or {}
+        self.names = sorted(self.stats)
+
+    def set(self, name, size, mtime):
+        if name not in self.stats:
+            bisect.insort(self.names, name)
+        self.stats[name] = (size, mtime)
+
+    def discard(self, name):
+        if self.stats.pop(name, None) is not None:
+            del self.names[bisect.bisect_left(self.names, name)]
+
+    def prefix(self, prefix):
+        """Yield ``(name, size, mtime)`` for names starting with ``prefix``"""
+        for i in range(bisect.bisect_left(self.names, prefix), len(self.names)):
+            name = self.names[i]
+            if not name.startswith(prefix):
+                break
+            yield (name, *self.stats[name])
+
+
+def scan_directory(directory):
+    """Return ``({name: (size, mtime)}, [subdirectories])`` from one ``scandir`` pass"""
+    files = {}
+    subdirectories = []
+    with contextlib.suppress(OSError), os.scandir(directory) as entries:
+        for entry in entries:
+            with contextlib.suppress(OSError):
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif entry.is_file():
+                    info = entry.stat()
+                    files[entry.name] = (info.st_size, info.st_mtime)
+    return files, subdirectories
+
+
+def _visible(matches, prefix):
+    if prefix.startswith("."):
+        return matches
+    return [match for match in matches if not match[0].startswith(".")]
+
+
+def scan_prefix(directory, prefix):
+    """Unindexed ``DirectoryIndex.lookup``: one ``scandir`` of ``directory``"""
+    files, _ = scan_directory(directory)
+    return _visible(list(_Listing(files).prefix(prefix)), prefix)
+
+
+class _Inotify:
+    """Minimal ctypes binding for Linux inotify, so no extra dependency is needed"""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path):
+        wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_add_watch failed: {os.strerror(errno)}")
+        return wd
+
+    def rm_watch(self, wd):
+        self._rm_watch(self.fd, wd)
+
+    def read_events(self, timeout):
+        """Return ``[(wd, mask, name)]`` for events arriving within ``timeout`` seconds"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+
+class DirectoryIndex:
+    """
+    In-memory index of the files under a set of root directories.
+
+    Every directory keeps a sorted list of file names with their size and
+    mtime, so a prefix lookup is a binary search with no filesystem calls. On
+    Linux the index follows inotify events for every directory under the roots
+    and a full rescan every ``rescan_interval`` seconds repairs anything missed
+    (exhausted watch limits, queue overflows). Elsewhere the roots are rescanned
+    every ``poll_interval`` seconds. A lookup that misses rescans that one
+    directory before giving up, watched or not, since an inotify event for a
+    file created just before the lookup may not have been handled yet. Files
+    closed after writing or renamed into a watched directory are marked ready
+    in the file-ready registry.
+    """
+
+    def __init__(
+        self,
+        roots,
+        rescan_interval=DIRECTORY_INDEX_RESCAN_INTERVAL,
+        poll_interval=DIRECTORY_INDEX_POLL_INTERVAL,
+    ):
+        self.roots = sorted({os.path.abspath(root) for root in roots})
+        self.rescan_interval = rescan_interval
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._listings = {}
+        self._watches = {}  # wd -> directory
+        self._watched = {}  # directory -> wd
+        self._inotify = None
+        if sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError) as e:
+                logger.warning(f"inotify unavailable, polling the directory index instead: {e}")
+        self._thread = threading.Thread(
+            target=self._run, name="flowscale-directory-index", daemon=True
+        )
+        self._thread.start()
+
+    def covers(self, directory):
+        return any(directory == root or directory.startswith(root + os.sep) for root in self.roots)
+
+    def lookup(self, directory, prefix, accept=None):
+        """
+        Return ``[(name, size, mtime)]`` for the files in ``directory`` whose
+        names start with ``prefix``. Hidden files only match a prefix that
+        starts with ``.``, as with ``glob``. When no match passes ``accept``
+        (a predicate on the name; any match by default) the directory is
+        rescanned before the result is returned.
+        """
+        directory = os.path.abspath(directory)
+        if not self.covers(directory):
+            return scan_prefix(directory, prefix)
+
+        with self._lock:
+            listing = self._listings.get(directory)
+            matches = _visible(list(listing.prefix(prefix)) if listing else [], prefix)
+        # A miss may only mean the index has not caught up, even with a live watch
+        if not any(accept is None or accept(match[0]) for match in matches):
+            matches = _visible(list(self.refresh(directory).prefix(prefix)), prefix)
+        return matches
+
+    def refresh(self, directory):
+        """Rescan one directory (not its subdirectories) and return its listing"""
+        files, _ = scan_directory(directory)
+        listing = _Listing(files)
+        with self._lock:
+            self._listings[directory] = listing
+        return listing
+
+    def stats(self):
+        with self._lock:
+            return {
+                "roots": self.roots,
+                "directories": len(self._listings),
+                "files": sum(len(listing.names) for listing in self._listings.values()),
+                "watched_directories": len(self._watched),
+                "inotify": self._inotify is not None,
+            }
+
+    def rescan(self):
+        """Rebuild the listings of every directory under the roots"""
+        seen = set()
+        for root in self.roots:
+            if os.path.isdir(root):
+                seen.update(self._scan_tree(root))
+        with self._lock:
+            stale = [path for path in self._listings if path not in seen]
+        for path in stale:
+            self._drop_tree(path)
+
+    def _scan_tree(self, root):
+        scanned = []
+        pending = [root]
+        while pending:
+            directory = pending.pop()
+            # Watch before listing so files created in between are not missed
+            self._watch(directory)
+            files, subdirectories = scan_directory(directory)
+            with self._lock:
+                self._listings[directory] = _Listing(files)
+            scanned.append(directory)
+            pending.extend(subdirectories)
+        return scanned
+
+    def _watch(self, directory):
+        if self._inotify is None or directory in self._watched:
+            return
+        try:
+            wd = self._inotify.add_watch(directory)
+        except OSError as e:
+            # Usually fs.inotify.max_user_watches; the directory falls back to rescans
+            logger.debug(f"Not watching {directory}: {e}")
+            return
+        with self._lock:
+            self._watches[wd] = directory
+            self._watched[directory] = wd
+
+    def _drop_tree(self, directory):
+        removed = []
+        with self._lock:
+            for path in list(self._listings) + list(self._watched):
+                if path == directory or path.startswith(directory + os.sep):
+                    self._listings.pop(path, None)
+                    wd = self._watched.pop(path, None)
+                    if wd is not None:
+                        self._watches.pop(wd, None)
+                        removed.append(wd)
+        # Directories moved out of the roots keep their watch unless it is removed
+        for wd in removed:
+            self._inotify.rm_watch(wd)
+
+    def _handle_event(self, wd, mask, name):
+        with self._lock:
+            directory = self._watches.get(wd)
+        if directory is None:
+            return
+        if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+            self._drop_tree(directory)
+            return
+
+        path = os.path.join(directory, name)
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self._scan_tree(path)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self._drop_tree(path)
+            return
+
+        if mask & (IN_DELETE | IN_MOVED_FROM):
+            with self._lock:
+                listing = self._listings.get(directory)
+                if listing:
+                    listing.discard(name)
+            return
+
+        try:
+            info = os.stat(path)
+        except OSError:
+            return
+        if stat.S_ISREG(info.st_mode):
+            with self._lock:
+                listing = self._listings.setdefault(directory, _Listing())
+                listing.set(name, info.st_size, info.st_mtime)
+            # Closed after writing or renamed into place: external writers are done with it
+            if mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                get_file_ready_registry().mark(path, info)
+
+    def _run(self):
+        try:
+            self.rescan()
+        except Exception as e:
+            logger.error(f"Initial directory index scan failed: {e}")
+        stats = self.stats()
+        logger.info(
+            f"Indexed {stats['files']} files in {stats['directories']} directories "
+            f"under {', '.join(self.roots)}"
+        )
+
+        interval = self.rescan_interval if self._inotify else self.poll_interval
+        next_rescan = time.monotonic() + interval
+        while True:
+            try:
+                timeout = max(0.0, next_rescan - time.monotonic())
+                if self._inotify is None:
+                    time.sleep(timeout)
+                else:
+                    for wd, mask, name in self._inotify.read_events(timeout):
+                        if mask & IN_Q_OVERFLOW:
+                            logger.warning("inotify queue overflowed, rescanning directory index")
+                            next_rescan = 0
+                            break
+                        self._handle_event(wd, mask, name)
+                if time.monotonic() >= next_rescan:
+                    self.rescan()
+                    next_rescan = time.monotonic() + interval
+            except Exception as e:
+                logger.error(f"Directory index update failed: {e}")
+                time.sleep(1)
+
+
+def get_directory_index():
+    """
+    Return the process-wide index of the ComfyUI input and output directories,
+    or ``None`` when it is disabled with ``FLOWSCALE_IO_INDEX=false``.
+    """
+    global _directory_index
+
+    if not DIRECTORY_INDEX_ENABLED:
+        return None
+    with _directory_index_lock:
+        if _directory_index is None:
+            _directory_index = DirectoryIndex(
+                [folder_paths.get_input_directory(), folder_paths.get_output_directory()]
+            )
+    return _directory_index
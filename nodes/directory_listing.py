@@ -0,0 +1,208 @@
+import base64
+import binascii
+import bisect
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .file_metadata import get_file_metadata_cache
+
+# Listings are reused while the directory's mtime is unchanged, up to this many
+# seconds so the sizes of files that are still being written stay fresh
+LIST_CACHE_TTL = float(os.environ.get("FLOWSCALE_IO_LIST_CACHE_TTL", "2"))
+LIST_CACHE_SIZE = 64  # directories
+LIST_PAGE_MAX = 1000
+LIST_SORT_FIELDS = ["name", "mtime", "size"]
+LIST_ENTRY_TYPES = ["file", "directory"]
+
+_directory_listings = None
+_directory_listings_lock = threading.Lock()
+
+
+def _sort_key(entry, sort):
+    if sort == "name":
+        return (entry["name"],)
+    value = entry[sort]
+    return (value if value is not None else -1, entry["name"])
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort="name"):
+    """
+    Decode a cursor made by ``encode_cursor`` for a listing sorted by ``sort``.
+    Raises ``ValueError`` unless it holds a sort key of that field's types,
+    since mismatched types cannot be compared with the listing's keys.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, binascii.Error) as e:
+        raise ValueError("Invalid cursor.") from e
+    if not isinstance(key, list) or not key or not isinstance(key[-1], str):
+        raise ValueError("Invalid cursor.")
+    if sort == "name":
+        valid = len(key) == 1
+    else:
+        number_types = (int, float) if sort == "mtime" else int
+        valid = len(key) == 2 and isinstance(key[0], number_types) and not isinstance(key[0], bool)
+    if not valid:
+        raise ValueError("Invalid cursor.")
+    return tuple(key)
+
+
+class _Snapshot:
+    """One ``scandir`` of a directory, with sorted views built on first use"""
+
+    def __init__(self, directory):
+        stat = os.stat(directory)
+        self.mtime_ns = stat.st_mtime_ns
+        self.scanned_at = time.monotonic()
+        self.entries = []
+        file_metadata = get_file_metadata_cache()
+        with os.scandir(directory) as dir_entries:
+            for dir_entry in dir_entries:
+                entry = {"name": dir_entry.name, "type": "file", "size": None, "mtime": None}
+                with contextlib.suppress(OSError):
+                    if dir_entry.is_dir():
+                        entry["type"] = "directory"
+                    # DirEntry caches the result, and on Windows it comes with the listing
+                    info = dir_entry.stat()
+                    entry["mtime"] = info.st_mtime
+                    if entry["type"] == "file":
+                        entry["size"] = info.st_size
+                        # Warms the cache for the /flowscale/io/search that usually follows
+                        metadata = file_metadata.get(dir_entry.path, info)
+                        entry["mime_type"] = metadata.mime_type
+                        entry["media_type"] = metadata.media_type
+                        entry["etag"] = metadata.etag
+                self.entries.append(entry)
+
+        digest = hashlib.sha1()
+        for entry in sorted(self.entries, key=lambda entry: entry["name"]):
+            digest.update(
+                f"{entry['name']}\0{entry['type']}\0{entry['size']}\0{entry['mtime']}\n".encode()
+            )
+        self.digest = digest.hexdigest()
+        self._sorted = {}
+        self._lock = threading.Lock()
+
+    def sorted_by(self, sort):
+        with self._lock:
+            if sort not in self._sorted:
+                self._sorted[sort] = sorted(self.entries, key=lambda e: _sort_key(e, sort))
+            return self._sorted[sort]
+
+
+class DirectoryListingCache:
+    """
+    LRU of directory snapshots used by ``/flowscale/io/list``.
+
+    A snapshot is reused while the directory's mtime (which changes whenever an
+    entry is added, removed or renamed) is unchanged and it is younger than
+    ``ttl``, so polling an unchanged folder costs a single ``stat``.
+    """
+
+    def __init__(self, ttl=LIST_CACHE_TTL, max_directories=LIST_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_directories = max_directories
+        self._snapshots = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, directory):
+        mtime_ns = os.stat(directory).st_mtime_ns
+        with self._lock:
+            snapshot = self._snapshots.get(directory)
+            if (
+                snapshot is not None
+                and snapshot.mtime_ns == mtime_ns
+                and time.monotonic() - snapshot.scanned_at < self.ttl
+            ):
+                self._snapshots.move_to_end(directory)
+                return snapshot
+
+        snapshot = _Snapshot(directory)
+        with self._lock:
+            self._snapshots[directory] = snapshot
+            self._snapshots.move_to_end(directory)
+            while len(self._snapshots) > self.max_directories:
+                self._snapshots.popitem(last=False)
+        return snapshot
+
+    def list(
+        self,
+        directory,
+        sort="name",
+        order=None,
+        limit=None,
+        cursor=None,
+        entry_type=None,
+        extensions=None,
+    ):
+        """
+        Return ``(page, etag)`` for one page of ``directory``.
+
+        ``entry_type`` keeps only ``file``/``directory`` entries or files of a
+        media type such as ``video``; ``extensions`` keeps files ending in one of
+        them. Entries are sorted by ``sort`` (``order`` defaults to ascending for
+        names and descending otherwise) and ``cursor`` resumes after the last
+        entry of a previous page. Without ``limit`` every remaining entry is
+        returned. The ETag covers both the directory state and the query.
+        """
+        if sort not in LIST_SORT_FIELDS:
+            raise ValueError(f"Unsupported sort: {sort}")
+        order = order or ("asc" if sort == "name" else "desc")
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Unsupported order: {order}")
+        if limit is not None:
+            limit = max(1, min(limit, LIST_PAGE_MAX))
+        after = decode_cursor(cursor, sort) if cursor else None
+        suffixes = tuple(f".{ext.lower().lstrip('.')}" for ext in extensions or ())
+
+        snapshot = self.get(directory)
+        etag_source = json.dumps(
+            [snapshot.digest, sort, order, limit, cursor, entry_type, sorted(suffixes)]
+        )
+        etag = f'"{hashlib.sha1(etag_source.encode()).hexdigest()}"'
+
+        entries = [
+            entry for entry in snapshot.sorted_by(sort) if _matches(entry, entry_type, suffixes)
+        ]
+        keys = [_sort_key(entry, sort) for entry in entries]
+        if order == "asc":
+            start = bisect.bisect_right(keys, after) if after else 0
+            remaining = entries[start:]
+        else:
+            end = bisect.bisect_left(keys, after) if after else len(entries)
+            remaining = entries[:end][::-1]
+
+        page = remaining[:limit] if limit else remaining
+        next_cursor = None
+        if limit and len(remaining) > limit:
+            next_cursor = encode_cursor(_sort_key(page[-1], sort))
+        return {"entries": page, "total": len(entries), "next_cursor": next_cursor}, etag
+
+
+def _matches(entry, entry_type, suffixes):
+    if entry_type in LIST_ENTRY_TYPES:
+        if entry["type"] != entry_type:
+            return False
+    elif entry_type and (entry["type"] != "file" or entry.get("media_type") != entry_type):
+        return False
+    return not suffixes or (entry["type"] == "file" and entry["name"].lower().endswith(suffixes))
+
+
+def get_directory_listings():
+    """Return the process-wide directory listing cache"""
+    global _directory_listings
+
+    with _directory_listings_lock:
+        if _directory_listings is None:
+            _directory_listings = DirectoryListingCache()
+    return _directory_listings
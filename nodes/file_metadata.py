@@ -0,0 +1,124 @@
+import mimetypes
+import os
+import threading
+import time
+from collections import OrderedDict
+
+FILE_METADATA_CACHE_SIZE = 8192  # files
+FILE_METADATA_CACHE_TTL = 300  # seconds an entry may sit unused before it is dropped
+
+_file_metadata_cache = None
+_file_metadata_cache_lock = threading.Lock()
+
+
+def file_etag(info):
+    """Strong ETag from inode, mtime and size; any rewrite or replacement changes it"""
+    return f'"{info.st_ino:x}-{info.st_mtime_ns:x}-{info.st_size:x}"'
+
+
+class FileMetadata:
+    """What the file API needs to know about one version of a file"""
+
+    __slots__ = ("path", "inode", "size", "mtime", "mtime_ns", "mime_type", "etag", "ready")
+
+    def __init__(self, path, info):
+        self.path = path
+        self.inode = info.st_ino
+        self.size = info.st_size
+        self.mtime = info.st_mtime
+        self.mtime_ns = info.st_mtime_ns
+        self.mime_type = mimetypes.guess_type(path)[0]
+        self.etag = file_etag(info)
+        self.ready = False  # set once this version is known to be completely written
+
+    def matches(self, info):
+        return self.size == info.st_size and self.mtime_ns == info.st_mtime_ns
+
+    @property
+    def media_type(self):
+        """Top-level MIME type (``image``, ``video``, ``audio``, ``model``, ...)"""
+        return self.mime_type.split("/", 1)[0] if self.mime_type else None
+
+
+class FileMetadataCache:
+    """
+    Bounded, thread-safe LRU of file metadata keyed by ``(path, inode)``.
+
+    An entry is reused while the file's size and mtime match the ``stat`` the
+    caller supplies (or that ``get`` makes), so a file replaced by a rename or
+    rewritten in place gets a fresh entry and loses its ``ready`` verdict.
+    Entries unused for ``ttl`` seconds are dropped on their next lookup and the
+    least recently used ones are evicted beyond ``max_entries``.
+    """
+
+    def __init__(self, max_entries=FILE_METADATA_CACHE_SIZE, ttl=FILE_METADATA_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # (path, inode) -> (FileMetadata, last used)
+        self._lock = threading.Lock()
+
+    def get(self, path, info=None):
+        """Return the ``FileMetadata`` of ``path``; raises ``OSError`` if it is gone"""
+        path = os.path.abspath(path)
+        if info is None:
+            info = os.stat(path)
+        key = (path, info.st_ino)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                metadata, last_used = cached
+                if now - last_used < self.ttl and metadata.matches(info):
+                    self._entries[key] = (metadata, now)
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return metadata
+            self.misses += 1
+
+        metadata = FileMetadata(path, info)
+        with self._lock:
+            self._entries[key] = (metadata, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return metadata
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def file_metadata_metric_lines(stats):
+    """Render ``FileMetadataCache.stats()`` in the Prometheus text format"""
+    return [
+        "# HELP flowscale_file_metadata_cache_lookups_total File metadata cache lookups.",
+        "# TYPE flowscale_file_metadata_cache_lookups_total counter",
+        f'flowscale_file_metadata_cache_lookups_total{{result="hit"}} {stats["hits"]}',
+        f'flowscale_file_metadata_cache_lookups_total{{result="miss"}} {stats["misses"]}',
+        "# HELP flowscale_file_metadata_cache_evictions_total Entries evicted from the cache.",
+        "# TYPE flowscale_file_metadata_cache_evictions_total counter",
+        f"flowscale_file_metadata_cache_evictions_total {stats['evictions']}",
+        "# HELP flowscale_file_metadata_cache_entries Files in the metadata cache.",
+        "# TYPE flowscale_file_metadata_cache_entries gauge",
+        f"flowscale_file_metadata_cache_entries {stats['entries']}",
+    ]
+
+
+def get_file_metadata_cache():
+    """Return the process-wide file metadata cache"""
+    global _file_metadata_cache
+
+    with _file_metadata_cache_lock:
+        if _file_metadata_cache is None:
+            _file_metadata_cache = FileMetadataCache()
+    return _file_metadata_cache
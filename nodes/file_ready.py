@@ -0,0 +1,108 @@
+import contextlib
+import os
+import re
+import threading
+import uuid
+from collections import OrderedDict
+
+FILE_READY_REGISTRY_SIZE = 4096  # most recently completed files remembered
+PARTIAL_OUTPUT_PATTERN = re.compile(r"^\..*\.[0-9a-f]{8}\.partial(\.[^.]*)?$")
+
+_file_ready_registry = None
+_file_ready_registry_lock = threading.Lock()
+
+
+class FileReadyRegistry:
+    """
+    Files known to be completely written, so readers need not poll for stability.
+
+    Save nodes mark their outputs once the final rename has happened and the
+    directory index marks files closed after writing (``IN_CLOSE_WRITE``) or
+    renamed into place. Each entry remembers the inode, size and mtime it was
+    marked with; a file rewritten since then no longer counts as ready.
+    """
+
+    def __init__(self, max_entries=FILE_READY_REGISTRY_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def mark(self, path, info=None):
+        path = os.path.abspath(path)
+        if info is None:
+            try:
+                info = os.stat(path)
+            except OSError:
+                return
+        with self._lock:
+            self._entries[path] = (info.st_ino, info.st_size, info.st_mtime_ns)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def is_ready(self, path):
+        path = os.path.abspath(path)
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry is None:
+            return False
+        try:
+            info = os.stat(path)
+        except OSError:
+            return False
+        return entry == (info.st_ino, info.st_size, info.st_mtime_ns)
+
+    def discard(self, path):
+        with self._lock:
+            self._entries.pop(os.path.abspath(path), None)
+
+
+def get_file_ready_registry():
+    """Return the process-wide registry of completely written files"""
+    global _file_ready_registry
+
+    with _file_ready_registry_lock:
+        if _file_ready_registry is None:
+            _file_ready_registry = FileReadyRegistry()
+    return _file_ready_registry
+
+
+def mark_file_ready(path):
+    get_file_ready_registry().mark(path)
+
+
+def is_file_marked_ready(path):
+    return get_file_ready_registry().is_ready(path)
+
+
+def partial_output_path(path):
+    """Hidden temporary path next to ``path`` that keeps its extension"""
+    directory, name = os.path.split(path)
+    stem, ext = os.path.splitext(name)
+    return os.path.join(directory, f".{stem}.{uuid.uuid4().hex[:8]}.partial{ext}")
+
+
+def is_partial_output(name):
+    """Whether the file name ``name`` was made by ``partial_output_path``"""
+    return PARTIAL_OUTPUT_PATTERN.match(name) is not None
+
+
+@contextlib.contextmanager
+def atomic_output(path):
+    """
+    Yield a temporary path next to ``path`` to write the file to.
+
+    On success the temporary file is renamed over ``path`` and marked ready, so
+    readers never see a partial file; on error it is removed. The temporary
+    name is hidden from ``/flowscale/io/search`` and keeps the extension, so
+    writers that pick a format from it (PIL, ffmpeg, OpenCV) still work.
+    """
+    temp_path = partial_output_path(path)
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+    mark_file_ready(path)
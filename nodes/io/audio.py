@@ -11,6 +11,8 @@ import numpy as np
 import torch  # type: ignore
 import torchaudio  # type: ignore
 
+from ..file_ready import atomic_output
+
 AUDIO_EXTENSIONS = [".wav", ".mp3", ".ogg", ".flac", ".m4a", ".aac"]
 
 
@@ -315,31 +317,35 @@ class FSSaveAudio:
             filepath = os.path.join(full_output_folder, file)
 
             try:
-                if format == "flac":
-                    # For FLAC, save to a buffer first to add metadata
-                    buff = io.BytesIO()
-                    _save_audio(buff, waveform, audio["sample_rate"], format="FLAC")
-
-                    # Add metadata as Vorbis comments if we have any
-                    if metadata:
-                        try:
-                            buff = insert_or_replace_vorbis_comment(buff, metadata)
-                        except Exception as e:
-                            print(f"Warning: Failed to add metadata to FLAC file: {e}")
-
-                    # Write the buffer to file
-                    with open(filepath, "wb") as f:
-                        if isinstance(buff, io.BytesIO):
-                            f.write(buff.getbuffer())
-                        else:
-                            f.write(buff)
-
-                elif format == "mp3":
-                    _save_audio(filepath, waveform, audio["sample_rate"], format="mp3")
-
-                else:
-                    # For WAV and OGG formats
-                    _save_audio(filepath, waveform, audio["sample_rate"], format=format.upper())
+                # Written next to the final name and renamed into place once complete
+                with atomic_output(filepath) as temp_path:
+                    if format == "flac":
+                        # For FLAC, save to a buffer first to add metadata
+                        buff = io.BytesIO()
+                        _save_audio(buff, waveform, audio["sample_rate"], format="FLAC")
+
+                        # Add metadata as Vorbis comments if we have any
+                        if metadata:
+                            try:
+                                buff = insert_or_replace_vorbis_comment(buff, metadata)
+                            except Exception as e:
+                                print(f"Warning: Failed to add metadata to FLAC file: {e}")
+
+                        # Write the buffer to file
+                        with open(temp_path, "wb") as f:
+                            if isinstance(buff, io.BytesIO):
+                                f.write(buff.getbuffer())
+                            else:
+                                f.write(buff)
+
+                    elif format == "mp3":
+                        _save_audio(temp_path, waveform, audio["sample_rate"], format="mp3")
+
+                    else:
+                        # For WAV and OGG formats
+                        _save_audio(
+                            temp_path, waveform, audio["sample_rate"], format=format.upper()
+                        )
 
                 # Add to results
                 results.append(
@@ -11,6 +11,8 @@ import torch  # type: ignore
 from PIL import Image
 from pillow_heif import register_heif_opener  # type: ignore
 
+from ..file_ready import atomic_output
+
 # Register HEIF support
 register_heif_opener()
 _ = pillow_avif
@@ -183,20 +185,24 @@ class FSSaveImage:
             save_path = os.path.join(output_dir, save_filename)
             preview_path = os.path.join(output_dir, preview_filename)
 
-            # Save the actual image in requested format
-            if format in ["webp", "avif"]:
-                pil_image.save(save_path, format=format.upper(), quality=quality, lossless=lossless)
-            elif format == "heif":
-                pil_image.save(save_path, format="HEIF", quality=quality)
-            elif format in ["jpg", "jpeg"]:
-                pil_image.save(save_path, format="JPEG", quality=quality)
-            else:
-                # PNG and others
-                pil_image.save(save_path)
+            # Save the actual image in requested format, renamed into place once complete
+            with atomic_output(save_path) as temp_path:
+                if format in ["webp", "avif"]:
+                    pil_image.save(
+                        temp_path, format=format.upper(), quality=quality, lossless=lossless
+                    )
+                elif format == "heif":
+                    pil_image.save(temp_path, format="HEIF", quality=quality)
+                elif format in ["jpg", "jpeg"]:
+                    pil_image.save(temp_path, format="JPEG", quality=quality)
+                else:
+                    # PNG and others
+                    pil_image.save(temp_path)
 
             # For HEIF format, save a PNG copy for preview
             if format == "heif":
-                pil_image.save(preview_path, format="PNG")
+                with atomic_output(preview_path) as temp_path:
+                    pil_image.save(temp_path, format="PNG")
                 preview_filename = preview_filename  # Use PNG version for preview
             else:
                 preview_filename = save_filename  # Use original file for preview
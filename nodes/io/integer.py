@@ -1,6 +1,8 @@
 import random
 import string
 
+from ..file_ready import atomic_output
+
 
 class FSLoadInteger:
     @classmethod
@@ -65,7 +67,7 @@ class FSSaveInteger:
         os.makedirs(output_dir, exist_ok=True)
         filepath = os.path.join(output_dir, filename)
 
-        with open(filepath, "w", encoding="utf-8") as f:
+        with atomic_output(filepath) as temp_path, open(temp_path, "w", encoding="utf-8") as f:
             f.write(text)
 
         print(f"Preview: {text}")
@@ -2,6 +2,8 @@ import os
 import random
 import string
 
+from ..file_ready import atomic_output
+
 ORCHESTRATOR_API_URL = os.environ.get("ORCHESTRATOR_API_URL")
 ORCHESTRATOR_API_KEY = os.environ.get("ORCHESTRATOR_API_KEY")
 
@@ -81,7 +83,7 @@ class FSSaveText:
         os.makedirs(output_dir, exist_ok=True)
         filepath = os.path.join(output_dir, filename)
 
-        with open(filepath, "w", encoding="utf-8") as f:
+        with atomic_output(filepath) as temp_path, open(temp_path, "w", encoding="utf-8") as f:
             f.write(text)
 
         print(f"Preview: {text}")
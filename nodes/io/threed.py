@@ -6,6 +6,8 @@ import string
 
 import folder_paths  # type: ignore
 
+from ..file_ready import atomic_output
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -111,8 +113,9 @@ class FSSave3D:
             save_filename = f"{filename_prefix}_{random_segment}{ext}"
             save_path = os.path.join(output_dir, save_filename)
 
-            # Copy the file to the output directory
-            shutil.copy2(file_path, save_path)
+            # Copy the file to the output directory, renamed into place once complete
+            with atomic_output(save_path) as temp_path:
+                shutil.copy2(file_path, temp_path)
 
             logger.info(f"I/O Label: {label}")
             logger.info(f"3D model saved to: {save_path}")
@@ -14,6 +14,8 @@ import numpy as np
 import torch  # type: ignore
 from PIL.PngImagePlugin import PngInfo
 
+from ..file_ready import atomic_output
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -307,7 +309,8 @@ class FSSaveVideo:
 
                     # Use FFmpeg to encode video
                     logger.info("Using FFmpeg for video encoding...")
-                    self._encode_with_ffmpeg(temp_dir, output_path, fps, format, quality)
+                    with atomic_output(output_path) as temp_path:
+                        self._encode_with_ffmpeg(temp_dir, temp_path, fps, format, quality)
 
                 finally:
                     # Clean up temporary directory
@@ -362,19 +365,20 @@ class FSSaveVideo:
                 else:
                     fourcc = cv2.VideoWriter_fourcc(*"XVID")  # type: ignore
 
-                # Create video writer
-                video_writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+                with atomic_output(output_path) as temp_path:
+                    # Create video writer
+                    video_writer = cv2.VideoWriter(temp_path, fourcc, fps, (width, height))
 
-                if not video_writer.isOpened():
-                    raise ValueError("Could not open VideoWriter. Try using FFmpeg instead.")
+                    if not video_writer.isOpened():
+                        raise ValueError("Could not open VideoWriter. Try using FFmpeg instead.")
 
-                # Write frames
-                for frame in uint8_frames:
-                    # Convert RGB to BGR for OpenCV
-                    bgr_frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                    video_writer.write(bgr_frame)
+                    # Write frames
+                    for frame in uint8_frames:
+                        # Convert RGB to BGR for OpenCV
+                        bgr_frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+                        video_writer.write(bgr_frame)
 
-                video_writer.release()
+                    video_writer.release()
 
             output_files.append(output_path)
             logger.info(f"Video saved to: {output_path}")
@@ -0,0 +1,156 @@
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .transfer_metrics import Counter, Histogram
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+IO_EXECUTOR_WORKERS = int(os.environ.get("FLOWSCALE_IO_WORKERS", "8"))
+# Stalls of the event loop longer than this are logged
+LOOP_LAG_WARN_THRESHOLD = float(os.environ.get("FLOWSCALE_LOOP_LAG_WARN_THRESHOLD", "0.25"))
+LOOP_LAG_INTERVAL = 0.1  # seconds between loop lag probes
+LOOP_LAG_MIN = 0.01  # timer jitter below this does not count as blocked time
+LOOP_LAG_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_io_executor = None
+_io_executor_lock = threading.Lock()
+_loop_lag_monitor = None
+
+
+class IOExecutor:
+    """
+    Bounded thread pool for blocking filesystem and subprocess work of the
+    HTTP routes, so it never runs on ComfyUI's event loop. Tracks how many
+    calls are running and waiting for a worker.
+    """
+
+    def __init__(self, max_workers=IO_EXECUTOR_WORKERS):
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="flowscale-io"
+        )
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def _call(self, func):
+        with self._lock:
+            self.active += 1
+        try:
+            return func()
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    async def run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, self._call, functools.partial(func, *args, **kwargs)
+        )
+
+    def stats(self):
+        with self._lock:
+            active = self.active
+        return {
+            "workers": self.max_workers,
+            "active": active,
+            "waiting": self.executor._work_queue.qsize(),
+        }
+
+
+def get_io_executor():
+    """Return the process-wide executor for blocking route work"""
+    global _io_executor
+
+    with _io_executor_lock:
+        if _io_executor is None:
+            _io_executor = IOExecutor()
+    return _io_executor
+
+
+async def run_io(func, *args, **kwargs):
+    """Run ``func(*args, **kwargs)`` on the shared I/O executor and await its result"""
+    return await get_io_executor().run(func, *args, **kwargs)
+
+
+class LoopLagMonitor:
+    """
+    Measures how long the event loop is blocked.
+
+    A task sleeps ``interval`` seconds at a time; any extra time before it
+    wakes up is time the loop spent running something that did not yield.
+    Delays are recorded in a histogram, stalls are summed into a blocked-time
+    counter and logged when they exceed ``warn_threshold``.
+    """
+
+    def __init__(self, interval=LOOP_LAG_INTERVAL, warn_threshold=LOOP_LAG_WARN_THRESHOLD):
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self.max_lag = 0.0
+        self.task = None
+        self.lag = Histogram(
+            "flowscale_event_loop_lag_seconds",
+            "Delay of event loop wake-ups beyond their scheduled time.",
+            LOOP_LAG_BUCKETS,
+        )
+        self.blocked = Counter(
+            "flowscale_event_loop_blocked_seconds_total",
+            "Time the event loop spent blocked past a scheduled wake-up.",
+        )
+
+    async def run(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - started - self.interval)
+            self.lag.observe(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= LOOP_LAG_MIN:
+                self.blocked.inc(lag)
+            if lag >= self.warn_threshold:
+                logger.warning(f"Event loop was blocked for {lag:.2f}s")
+
+    def metric_lines(self):
+        return [
+            *self.lag.render(),
+            *self.blocked.render(),
+            "# HELP flowscale_event_loop_max_lag_seconds Longest event loop stall seen.",
+            "# TYPE flowscale_event_loop_max_lag_seconds gauge",
+            f"flowscale_event_loop_max_lag_seconds {self.max_lag!r}",
+        ]
+
+
+def start_loop_lag_monitor(loop):
+    """Start the process-wide loop lag monitor on ``loop`` once; a no-op without a loop"""
+    global _loop_lag_monitor
+
+    if loop is None or _loop_lag_monitor is not None:
+        return _loop_lag_monitor
+    monitor = _loop_lag_monitor = LoopLagMonitor()
+
+    def start():
+        monitor.task = loop.create_task(monitor.run())
+
+    loop.call_soon_threadsafe(start)
+    return monitor
+
+
+def io_metric_lines():
+    """Prometheus lines for the I/O executor and, once started, the loop lag monitor"""
+    stats = get_io_executor().stats()
+    lines = []
+    for field, help_text in (
+        ("workers", "Threads of the I/O executor."),
+        ("active", "Blocking calls running on the I/O executor."),
+        ("waiting", "Blocking calls waiting for an I/O executor thread."),
+    ):
+        name = f"flowscale_io_executor_{field}"
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {stats[field]}"]
+    if _loop_lag_monitor is not None:
+        lines += _loop_lag_monitor.metric_lines()
+    return lines
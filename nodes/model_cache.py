@@ -0,0 +1,209 @@
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from .file_ready import partial_output_path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODEL_CACHE_DIR = os.environ.get(
+    "FLOWSCALE_MODEL_CACHE_DIR", os.path.join(os.getcwd(), ".flowscale_cache", "models")
+)
+MODEL_CACHE_MAX_BYTES = int(
+    os.environ.get("FLOWSCALE_MODEL_CACHE_MAX_BYTES", str(100 * 1024 * 1024 * 1024))
+)
+
+# ioctl request number for FICLONE (copy-on-write clone on btrfs/xfs)
+FICLONE = 0x40049409
+
+_model_cache = None
+_model_cache_lock = threading.Lock()
+
+
+def _reflink_or_copy(src, dst):
+    """Clone ``src`` to ``dst`` copy-on-write when the filesystem allows it"""
+    try:
+        import fcntl
+
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return
+    except (ImportError, OSError):
+        pass
+    shutil.copyfile(src, dst)
+
+
+def link_or_copy(src, dst, hardlink=True):
+    """
+    Materialize ``src`` at ``dst`` as cheaply as possible.
+
+    Tries a hardlink first (unless ``hardlink`` is false, for files that may be
+    rewritten in place), then a reflink, then a plain copy. The result is
+    staged under a unique hidden name and renamed into place, so readers never
+    see a partial file and concurrent calls for the same ``dst`` do not collide.
+    """
+    tmp_path = partial_output_path(dst)
+    try:
+        linked = False
+        if hardlink:
+            with contextlib.suppress(OSError):
+                os.link(src, tmp_path)
+                linked = True
+        if not linked:
+            _reflink_or_copy(src, tmp_path)
+        os.replace(tmp_path, dst)
+    finally:
+        # rename() leaves both names alone when dst already links to the same inode
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+
+
+class ModelCache:
+    """
+    Content-addressed local cache for downloaded models.
+
+    Entries are keyed by the object source (``s3://bucket/key`` or a URL) plus
+    a validator such as the ETag, so a changed object never serves stale bytes.
+    Total size is bounded with least-recently-used eviction and hits are served
+    by hardlinking (or reflinking) the cached file into the requested path.
+    """
+
+    def __init__(self, cache_dir=MODEL_CACHE_DIR, max_bytes=MODEL_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._entries = self._load_index()
+
+    @staticmethod
+    def entry_id(source, validator):
+        return hashlib.sha256(f"{source}\n{validator}".encode()).hexdigest()
+
+    def _entry_path(self, entry_id):
+        return os.path.join(self.cache_dir, entry_id)
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable model cache index: {e}")
+            return {}
+        return {k: v for k, v in entries.items() if os.path.exists(self._entry_path(k))}
+
+    def _save_index(self):
+        tmp_path = f"{self._index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _remove_entry(self, entry_id):
+        self._entries.pop(entry_id, None)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._entry_path(entry_id))
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._entries.values())
+        by_age = sorted(self._entries.items(), key=lambda item: item[1]["last_access"])
+        for entry_id, entry in by_age:
+            if total <= self.max_bytes:
+                break
+            logger.info(f"Evicting {entry['source']} from model cache")
+            total -= entry["size"]
+            self._remove_entry(entry_id)
+
+    def fetch(self, source, validator, save_path):
+        """Link a cached copy into ``save_path``; return True on a cache hit"""
+        if not validator:
+            return False
+
+        entry_id = self.entry_id(source, validator)
+        with self._lock:
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                return False
+            entry["last_access"] = time.time()
+
+        # Linking may fall back to copying a multi-GB file, so it runs without the lock
+        cached_path = self._entry_path(entry_id)
+        try:
+            if os.path.getsize(cached_path) != entry["size"]:
+                raise OSError("size mismatch")
+            same_file = os.path.exists(save_path) and os.path.samefile(cached_path, save_path)
+            if not same_file:
+                link_or_copy(cached_path, save_path)
+        except OSError as e:
+            logger.warning(f"Dropping broken model cache entry for {source}: {e}")
+            with self._lock:
+                if self._entries.get(entry_id) is entry:
+                    self._remove_entry(entry_id)
+                self._save_index()
+            return False
+
+        with self._lock:
+            self._save_index()
+
+        logger.info(f"Model cache hit for {source}, linked into {save_path}")
+        return True
+
+    def store(self, source, validator, file_path):
+        """Add a freshly downloaded file to the cache and evict old entries"""
+        if not validator:
+            return
+
+        entry_id = self.entry_id(source, validator)
+        # Staged under a unique name outside the lock, then published under it
+        staged_path = f"{self._entry_path(entry_id)}.{uuid.uuid4().hex}.tmp"
+        try:
+            link_or_copy(file_path, staged_path)
+        except OSError as e:
+            logger.warning(f"Could not add {source} to model cache: {e}")
+            staged_path = None
+
+        with self._lock:
+            # A new validator for the same source means older copies are stale
+            for stale_id in [k for k, v in self._entries.items() if v["source"] == source]:
+                if stale_id != entry_id:
+                    self._remove_entry(stale_id)
+
+            if staged_path is None:
+                self._save_index()
+                return
+
+            os.replace(staged_path, self._entry_path(entry_id))
+            self._entries[entry_id] = {
+                "source": source,
+                "validator": validator,
+                "size": os.path.getsize(file_path),
+                "last_access": time.time(),
+            }
+            self._evict()
+            self._save_index()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size_bytes": sum(entry["size"] for entry in self._entries.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+
+def get_model_cache():
+    """Return the process-wide model cache"""
+    global _model_cache
+
+    with _model_cache_lock:
+        if _model_cache is None:
+            _model_cache = ModelCache()
+    return _model_cache
@@ -0,0 +1,65 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+PRESIGN_EXPIRES_IN = int(os.environ.get("FLOWSCALE_S3_PRESIGN_EXPIRES_IN", "3600"))
+PRESIGN_CACHE_SIZE = 10000
+
+# Methods callers may presign; anything that writes or deletes is excluded
+PRESIGN_METHODS = ("get_object", "head_object")
+
+
+class PresignedUrlCache:
+    """
+    Bounded LRU of presigned URLs keyed by (bucket, key, method, expires_in).
+
+    A cached URL is reused while at least half of the requested lifetime is
+    still left on it, so callers always get a URL valid for between
+    ``expires_in / 2`` and ``expires_in`` seconds without re-signing on every
+    request. Keying on the lifetime keeps a short-lived request from getting
+    a long-lived URL and the other way round.
+    """
+
+    def __init__(self, max_entries=PRESIGN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, s3_client, bucket, key, method="get_object", expires_in=None):
+        """Return ``(url, expires_at)`` for the object, signing a new URL if needed"""
+        if method not in PRESIGN_METHODS:
+            raise ValueError(f"Unsupported presign method: {method}")
+
+        expires_in = expires_in or PRESIGN_EXPIRES_IN
+        cache_key = (bucket, key, method, expires_in)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[1] - now >= expires_in / 2:
+                self._entries.move_to_end(cache_key)
+                return entry
+
+        url = s3_client.generate_presigned_url(
+            ClientMethod=method,
+            Params={"Bucket": bucket, "Key": key},
+            ExpiresIn=expires_in,
+        )
+        entry = (url, now + expires_in)
+
+        with self._lock:
+            self._entries[cache_key] = entry
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get_many(self, s3_client, bucket, keys, method="get_object", expires_in=None):
+        """Return ``{key: (url, expires_at)}`` for a batch of keys"""
+        return {key: self.get(s3_client, bucket, key, method, expires_in) for key in keys}
+
+    def invalidate(self, bucket, key):
+        with self._lock:
+            for cache_key in [k for k in self._entries if k[:2] == (bucket, key)]:
+                del self._entries[cache_key]
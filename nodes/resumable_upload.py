@@ -0,0 +1,324 @@
+import base64
+import binascii
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from .file_ready import mark_file_ready
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+UPLOAD_SESSION_DIR = os.environ.get(
+    "FLOWSCALE_UPLOAD_SESSION_DIR",
+    os.path.join(os.getcwd(), ".flowscale_cache", "upload_sessions"),
+)
+# Sessions without a chunk for this long are dropped together with their partial file
+UPLOAD_SESSION_TTL = float(os.environ.get("FLOWSCALE_UPLOAD_SESSION_TTL", str(24 * 60 * 60)))
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # size suggested to clients
+UPLOAD_MAX_CHUNK_SIZE = 256 * 1024 * 1024  # largest single PUT accepted
+CHECKSUM_ALGORITHMS = ("sha256", "sha1", "md5")
+
+_upload_sessions = None
+_upload_sessions_lock = threading.Lock()
+
+
+class UploadSessionError(Exception):
+    """A request the session cannot accept; ``status`` is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_checksum_header(value):
+    """
+    Parse a tus ``Upload-Checksum`` header (``<algorithm> <base64 digest>``)
+    into ``(algorithm, digest bytes)``.
+    """
+    algorithm, _, encoded = value.strip().partition(" ")
+    algorithm = algorithm.lower()
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise UploadSessionError(f"Unsupported checksum algorithm: {algorithm}")
+    try:
+        return algorithm, base64.b64decode(encoded.strip(), validate=True)
+    except (ValueError, binascii.Error) as e:
+        raise UploadSessionError("Invalid Upload-Checksum header.") from e
+
+
+def _add_range(ranges, start, end):
+    """Merge ``[start, end)`` into a sorted list of disjoint ``[start, end)`` pairs"""
+    merged = []
+    for range_start, range_end in ranges:
+        if range_end < start or range_start > end:
+            merged.append([range_start, range_end])
+        else:
+            start, end = min(start, range_start), max(end, range_end)
+    merged.append([start, end])
+    return sorted(merged)
+
+
+def _remove_range(ranges, start, end):
+    remaining = []
+    for range_start, range_end in ranges:
+        if range_start < start:
+            remaining.append([range_start, min(range_end, start)])
+        if range_end > end:
+            remaining.append([max(range_start, end), range_end])
+    return remaining
+
+
+def _missing(ranges, size):
+    missing = []
+    position = 0
+    for start, end in ranges:
+        if start > position:
+            missing.append([position, start])
+        position = max(position, end)
+    if position < size:
+        missing.append([position, size])
+    return missing
+
+
+def _pwrite(path, data, offset):
+    fd = os.open(path, os.O_WRONLY | getattr(os, "O_BINARY", 0))
+    try:
+        view = memoryview(data)
+        if not hasattr(os, "pwrite"):
+            # Windows has no pwrite; every call opens its own descriptor, so seeking is safe
+            os.lseek(fd, offset, os.SEEK_SET)
+        while view:
+            written = os.pwrite(fd, view, offset) if hasattr(os, "pwrite") else os.write(fd, view)
+            view = view[written:]
+            offset += written
+    finally:
+        os.close(fd)
+
+
+def _check_not_completing(session):
+    if session.get("completing"):
+        raise UploadSessionError("Upload is being completed.", status=409)
+
+
+class UploadSessionStore:
+    """
+    Resumable, chunked uploads in the spirit of the tus protocol.
+
+    A session reserves a final path and a hidden partial file next to it (so
+    the last step is an atomic rename on the same filesystem). Chunks may
+    arrive in any order and are written in place with ``pwrite``; only
+    chunks whose checksum matched are recorded as received. Sessions are
+    persisted as JSON under ``session_dir`` and survive restarts.
+
+    Chunks and completion exclude each other: a chunk is refused with 409
+    while the session is being completed, and completion is refused while a
+    chunk admitted by ``check_chunk`` has not been released with
+    ``release_chunk``, so nothing is written after the final checksum.
+    """
+
+    def __init__(self, session_dir=UPLOAD_SESSION_DIR, ttl=UPLOAD_SESSION_TTL):
+        self.session_dir = session_dir
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._writers = {}  # upload id -> chunks being written
+        os.makedirs(session_dir, exist_ok=True)
+        self._restore()
+
+    def _session_path(self, upload_id):
+        return os.path.join(self.session_dir, f"{upload_id}.json")
+
+    def _persist(self, session):
+        tmp_path = f"{self._session_path(session['id'])}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(session, f)
+        os.replace(tmp_path, self._session_path(session["id"]))
+
+    def _restore(self):
+        for name in os.listdir(self.session_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.session_dir, name), encoding="utf-8") as f:
+                    session = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable upload session {name}: {e}")
+                continue
+            session.pop("completing", None)
+            self._sessions[session["id"]] = session
+        self._prune()
+
+    def _drop(self, session):
+        self._sessions.pop(session["id"], None)
+        for path in (session["partial_path"], self._session_path(session["id"])):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        for session in list(self._sessions.values()):
+            if session["updated_at"] < cutoff:
+                logger.info(f"Dropping expired upload session {session['id']}")
+                self._drop(session)
+
+    def _get(self, upload_id):
+        session = self._sessions.get(upload_id)
+        if session is None:
+            raise UploadSessionError("Upload session not found.", status=404)
+        return session
+
+    def describe(self, session):
+        received = session["received"]
+        return {
+            "upload_id": session["id"],
+            "kind": session["kind"],
+            "filename": os.path.basename(session["destination"]),
+            "size": session["size"],
+            "offset": received[0][1] if received and received[0][0] == 0 else 0,
+            "received": [list(r) for r in received],
+            "missing": _missing(received, session["size"]),
+            "chunk_size": UPLOAD_CHUNK_SIZE,
+            "max_chunk_size": UPLOAD_MAX_CHUNK_SIZE,
+            "expires_at": session["updated_at"] + self.ttl,
+        }
+
+    def create(self, kind, destination, size, metadata=None):
+        """Open a session that will be renamed to ``destination`` once ``size`` bytes arrived"""
+        if size < 0:
+            raise UploadSessionError("size must not be negative.")
+        directory, filename = os.path.split(destination)
+        os.makedirs(directory, exist_ok=True)
+        if shutil.disk_usage(directory).free < size:
+            raise UploadSessionError("Not enough free disk space for this upload.", status=507)
+
+        upload_id = uuid.uuid4().hex
+        partial_path = os.path.join(directory, f".{filename}.{upload_id}.upload")
+        with open(partial_path, "wb"):
+            pass
+        now = time.time()
+        session = {
+            "id": upload_id,
+            "kind": kind,
+            "destination": destination,
+            "partial_path": partial_path,
+            "size": size,
+            "received": [],
+            "metadata": metadata or {},
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self._lock:
+            self._prune()
+            self._sessions[upload_id] = session
+            self._persist(session)
+        return self.describe(session)
+
+    def get(self, upload_id):
+        with self._lock:
+            return self.describe(self._get(upload_id))
+
+    def check_chunk(self, upload_id, offset, length=None):
+        """
+        Validate a chunk's bounds before its body is read and admit it as a
+        writer; returns ``(partial path, size)``. Every admitted chunk must be
+        released with ``release_chunk``.
+        """
+        with self._lock:
+            session = self._get(upload_id)
+            _check_not_completing(session)
+            if offset < 0 or offset > session["size"]:
+                raise UploadSessionError("Offset is outside the upload.", status=416)
+            if length is not None and offset + length > session["size"]:
+                raise UploadSessionError("Chunk extends past the declared size.", status=416)
+            self._writers[upload_id] = self._writers.get(upload_id, 0) + 1
+        return session["partial_path"], session["size"]
+
+    def release_chunk(self, upload_id):
+        """Release a chunk admitted by ``check_chunk``, whether it was recorded or not"""
+        with self._lock:
+            writers = self._writers.get(upload_id, 0) - 1
+            if writers > 0:
+                self._writers[upload_id] = writers
+            else:
+                self._writers.pop(upload_id, None)
+
+    def write(self, partial_path, data, offset):
+        """Write part of a chunk; ``record_chunk`` marks it received once it is verified"""
+        _pwrite(partial_path, data, offset)
+
+    def record_chunk(self, upload_id, offset, length):
+        with self._lock:
+            session = self._get(upload_id)
+            _check_not_completing(session)
+            if length:
+                session["received"] = _add_range(session["received"], offset, offset + length)
+            session["updated_at"] = time.time()
+            self._persist(session)
+            return self.describe(session)
+
+    def discard_range(self, upload_id, offset, length):
+        """Forget ``length`` bytes at ``offset`` that a failed chunk may have overwritten"""
+        with self._lock:
+            session = self._sessions.get(upload_id)
+            if session is None or not length:
+                return
+            session["received"] = _remove_range(session["received"], offset, offset + length)
+            self._persist(session)
+
+    def complete(self, upload_id, checksum=None):
+        """
+        Verify that every byte arrived (and, with ``checksum``, the whole file's
+        digest), then rename the partial file into place. Returns the session.
+        """
+        with self._lock:
+            session = self._get(upload_id)
+            if _missing(session["received"], session["size"]):
+                raise UploadSessionError("Upload is incomplete.", status=409)
+            if session.get("completing"):
+                raise UploadSessionError("Upload is already being completed.", status=409)
+            if self._writers.get(upload_id):
+                raise UploadSessionError("Chunks are still being written.", status=409)
+            session["completing"] = True
+
+        partial_path = session["partial_path"]
+        try:
+            if checksum is not None:
+                algorithm, expected = checksum
+                digest = hashlib.new(algorithm)
+                with open(partial_path, "rb") as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b""):
+                        digest.update(block)
+                if digest.digest() != expected:
+                    raise UploadSessionError("Checksum mismatch.", status=460)
+
+            with open(partial_path, "rb+") as f:
+                f.truncate(session["size"])
+                os.fsync(f.fileno())
+            os.replace(partial_path, session["destination"])
+        finally:
+            session.pop("completing", None)
+        mark_file_ready(session["destination"])
+        with self._lock:
+            self._drop(session)
+        logger.info(f"Resumable upload {upload_id} saved to {session['destination']}")
+        return dict(session)
+
+    def abort(self, upload_id):
+        with self._lock:
+            self._drop(self._get(upload_id))
+
+
+def get_upload_sessions():
+    """Return the process-wide resumable upload session store"""
+    global _upload_sessions
+
+    with _upload_sessions_lock:
+        if _upload_sessions is None:
+            _upload_sessions = UploadSessionStore()
+    return _upload_sessions
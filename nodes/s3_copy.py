@@ -0,0 +1,213 @@
+import contextlib
+import logging
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .s3_utils import (
+    AWS_ACCESS_KEY_ID,
+    AWS_REGION,
+    AWS_SECRET_ACCESS_KEY,
+    MAX_PART_SIZE,
+    S3_BUCKET_NAME,
+    checksum_args,
+    compute_part_size,
+    get_optimized_s3_client,
+    transfer_scheduler,
+)
+from .transfer_metrics import track_transfer
+from .transfer_scheduler import BULK
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COPY_OBJECT_MAX_SIZE = 5 * 1024 * 1024 * 1024  # CopyObject limit, larger objects need parts
+COPY_PART_SIZE = 512 * 1024 * 1024  # server-side parts cost no worker memory
+S3_COPY_CONCURRENCY = int(os.environ.get("FLOWSCALE_S3_COPY_CONCURRENCY", "16"))
+# Buckets other than the configured one that copies may write into
+S3_COPY_BUCKETS = {
+    bucket.strip()
+    for bucket in os.environ.get("FLOWSCALE_S3_COPY_BUCKETS", "").split(",")
+    if bucket.strip()
+}
+
+
+def copy_destination_allowed(bucket):
+    """Whether copies may write into ``bucket``: the configured bucket or an allow-listed one"""
+    return bucket == S3_BUCKET_NAME or bucket in S3_COPY_BUCKETS
+
+
+def copy_s3_object(
+    source_bucket,
+    source_key,
+    destination_bucket,
+    destination_key,
+    part_size=None,
+    max_concurrency=None,
+):
+    """
+    Copy an object inside S3 without moving its bytes through this worker.
+
+    Objects up to 5 GB use a single ``copy_object``; larger ones are copied as
+    a multipart upload whose parts are ``upload_part_copy`` ranges issued in
+    parallel. Content type and user metadata are carried over in both cases.
+    The bytes never cross the wire, so the copy is tracked for counts and
+    duration under the "copy" direction but records no bytes or throughput.
+    """
+    s3_client = get_optimized_s3_client()
+    head = s3_client.head_object(Bucket=source_bucket, Key=source_key)
+    with track_transfer("copy", BULK) as tracker:
+        return _copy_object(
+            s3_client,
+            head,
+            source_bucket,
+            source_key,
+            destination_bucket,
+            destination_key,
+            part_size,
+            max_concurrency,
+            tracker,
+        )
+
+
+def _copy_object(
+    s3_client,
+    head,
+    source_bucket,
+    source_key,
+    destination_bucket,
+    destination_key,
+    part_size,
+    max_concurrency,
+    tracker,
+):
+    size = head["ContentLength"]
+    copy_source = {"Bucket": source_bucket, "Key": source_key}
+
+    if size <= COPY_OBJECT_MAX_SIZE:
+        logger.info(
+            f"Copying s3://{source_bucket}/{source_key} to s3://{destination_bucket}/{destination_key}"
+        )
+        return s3_client.copy_object(
+            Bucket=destination_bucket,
+            Key=destination_key,
+            CopySource=copy_source,
+            MetadataDirective="COPY",
+            **checksum_args(),
+        )
+
+    part_size = min(compute_part_size(size, part_size or COPY_PART_SIZE), MAX_PART_SIZE)
+    part_count = math.ceil(size / part_size)
+    extra_args = checksum_args()
+    if head.get("ContentType"):
+        extra_args["ContentType"] = head["ContentType"]
+    if head.get("Metadata"):
+        extra_args["Metadata"] = head["Metadata"]
+
+    upload_id = s3_client.create_multipart_upload(
+        Bucket=destination_bucket, Key=destination_key, **extra_args
+    )["UploadId"]
+
+    def copy_part(part_number):
+        start = (part_number - 1) * part_size
+        end = min(start + part_size, size) - 1
+        # Part copies move no bytes through the worker but still hold a pooled connection
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(
+                transfer_scheduler.slot(BULK, job=(destination_bucket, destination_key))
+            )
+            stack.enter_context(tracker.part())
+            result = s3_client.upload_part_copy(
+                Bucket=destination_bucket,
+                Key=destination_key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                CopySource=copy_source,
+                CopySourceRange=f"bytes={start}-{end}",
+                # Fail instead of mixing parts from two versions if the source is replaced
+                CopySourceIfMatch=head["ETag"],
+            )["CopyPartResult"]
+        part = {"ETag": result["ETag"], "PartNumber": part_number}
+        if result.get("ChecksumSHA256"):
+            part["ChecksumSHA256"] = result["ChecksumSHA256"]
+        return part
+
+    workers = max(1, min(max_concurrency or S3_COPY_CONCURRENCY, part_count))
+    logger.info(
+        f"Copying s3://{source_bucket}/{source_key} to s3://{destination_bucket}/{destination_key} "
+        f"in {part_count} parts of {part_size // (1024 * 1024)}MB with {workers} workers"
+    )
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(copy_part, n) for n in range(1, part_count + 1)]
+            try:
+                parts = [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        return s3_client.complete_multipart_upload(
+            Bucket=destination_bucket,
+            Key=destination_key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+    except Exception:
+        s3_client.abort_multipart_upload(
+            Bucket=destination_bucket, Key=destination_key, UploadId=upload_id
+        )
+        raise
+
+
+class CopyModelInS3:
+    """
+    Copies a model between S3 keys or buckets server-side, e.g. to promote a
+    private upload to its public path
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "source_key": ("STRING", {"forceInput": False}),
+                "destination_key": ("STRING", {"forceInput": False}),
+            },
+            "optional": {
+                "destination_bucket": (
+                    "STRING",
+                    {
+                        "default": "",
+                        "tooltip": "Bucket to copy into; leave empty to copy within the "
+                        "configured bucket. Other buckets must be listed in "
+                        "FLOWSCALE_S3_COPY_BUCKETS",
+                    },
+                ),
+            },
+        }
+
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("download_url", "s3_key")
+    FUNCTION = "copy_model_in_s3"
+    CATEGORY = "FlowScale/Cloud/Models"
+
+    def copy_model_in_s3(self, source_key, destination_key, destination_bucket=""):
+        if not all([AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, S3_BUCKET_NAME]):
+            raise Exception("AWS credentials not set")
+
+        destination_bucket = destination_bucket or S3_BUCKET_NAME
+        if not copy_destination_allowed(destination_bucket):
+            raise Exception(
+                f"Copying into bucket '{destination_bucket}' is not allowed; "
+                "add it to FLOWSCALE_S3_COPY_BUCKETS"
+            )
+        try:
+            copy_s3_object(S3_BUCKET_NAME, source_key, destination_bucket, destination_key)
+        except Exception as e:
+            raise Exception(f"Failed to copy model in S3: {str(e)}") from e
+
+        download_url = (
+            f"https://{destination_bucket}.s3.{AWS_REGION}.amazonaws.com/{destination_key}"
+        )
+        return (download_url, destination_key)
@@ -0,0 +1,371 @@
+import contextlib
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .file_ready import is_partial_output
+from .s3_utils import (
+    AWS_ACCESS_KEY_ID,
+    AWS_SECRET_ACCESS_KEY,
+    S3_BUCKET_NAME,
+    S3_DOWNLOAD_CONCURRENCY,
+    S3_UPLOAD_CONCURRENCY,
+    compute_part_size,
+    download_s3_object_parallel,
+    get_optimized_s3_client,
+    upload_with_progress,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+S3_SYNC_CONCURRENCY = int(os.environ.get("FLOWSCALE_S3_SYNC_CONCURRENCY", "16"))
+DELETE_BATCH_SIZE = 1000  # DeleteObjects limit
+HASH_BLOCK_SIZE = 1024 * 1024  # bytes read at a time while computing ETags
+
+UPLOAD = "upload"
+DOWNLOAD = "download"
+SYNC_DIRECTIONS = [UPLOAD, DOWNLOAD]
+# Never synced: ComfyUI's own code and settings
+BLACKLISTED_DIRECTORIES = ["config", "api_server", "app", "comfy", "custom_nodes"]
+# A download may only delete extra local files below one of these
+DELETE_EXTRA_ROOTS = ["input", "output", "models"]
+
+
+def resolve_local_directory(directory):
+    """
+    Resolve ``directory`` under the ComfyUI root, rejecting the root itself,
+    paths that escape it and blacklisted directories
+    """
+    if directory.startswith("./") or directory.startswith("../"):
+        directory = directory.removeprefix("./").removeprefix("../")
+    if directory.startswith("/") or directory.startswith("\\"):
+        directory = directory.removeprefix("/").removeprefix("\\")
+
+    base_directory = os.getcwd()
+    sanitized_directory = os.path.normpath(directory).lstrip(os.sep).rstrip(os.sep)
+    directory_path = os.path.abspath(os.path.join(base_directory, sanitized_directory))
+    if not directory_path.startswith(base_directory + os.sep):
+        raise ValueError(f"Invalid directory path: {directory}")
+    path_parts = os.path.relpath(directory_path, base_directory).split(os.sep)
+    if any(part in BLACKLISTED_DIRECTORIES for part in path_parts):
+        raise ValueError(f"Invalid directory path: {directory}")
+    return directory_path
+
+
+def check_delete_extra(local_directory):
+    """
+    Raise ``ValueError`` unless a download may delete extra files in
+    ``local_directory``: it has to lie strictly below input/, output/ or models/.
+    """
+    base_directory = os.getcwd()
+    local_directory = os.path.abspath(local_directory)
+    for root in DELETE_EXTRA_ROOTS:
+        if local_directory.startswith(os.path.join(base_directory, root) + os.sep):
+            return
+    raise ValueError(
+        "delete_extra on download is only allowed in a subdirectory of "
+        f"{', '.join(DELETE_EXTRA_ROOTS)}"
+    )
+
+
+def normalize_prefix(prefix):
+    prefix = prefix.strip().strip("/")
+    return f"{prefix}/" if prefix else ""
+
+
+def list_local_files(directory):
+    """Return ``{relative_posix_path: size}`` for every regular file under ``directory``"""
+    files = {}
+    if not os.path.isdir(directory):
+        return files
+
+    for root, dirs, names in os.walk(directory):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in names:
+            # Skip our own transfer sidecars and partial downloads
+            if name.endswith((".s3upload.json", ".s3upload.json.tmp", ".download")):
+                continue
+            if is_partial_output(name):
+                continue
+            path = os.path.join(root, name)
+            with contextlib.suppress(FileNotFoundError):
+                if os.path.isfile(path):
+                    rel_path = os.path.relpath(path, directory).replace(os.sep, "/")
+                    files[rel_path] = os.path.getsize(path)
+    return files
+
+
+def list_remote_objects(bucket, prefix):
+    """Return ``{relative_key: (size, etag)}`` for every object under ``prefix``"""
+    objects = {}
+    paginator = get_optimized_s3_client().get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            rel_key = obj["Key"][len(prefix) :]
+            if rel_key and not rel_key.endswith("/"):
+                objects[rel_key] = (obj["Size"], obj["ETag"])
+    return objects
+
+
+def _md5_of(f, size):
+    digest = hashlib.md5(usedforsecurity=False)
+    while size > 0:
+        block = f.read(min(size, HASH_BLOCK_SIZE))
+        if not block:
+            break
+        digest.update(block)
+        size -= len(block)
+    return digest
+
+
+def local_etag(file_path, remote_etag):
+    """
+    Compute the S3 ETag ``file_path`` would have under the remote object's part layout.
+
+    A plain ETag is the MD5 of an object sent in one PUT, whatever its size.
+    Multipart ETags end in ``-<parts>``; when that count does not match our own
+    part size the layout is inferred from it, which covers most other uploaders
+    that use whole-MiB part sizes.
+    """
+    file_size = os.path.getsize(file_path)
+    etag_body = remote_etag.strip('"')
+    with open(file_path, "rb") as f:
+        if "-" not in etag_body:
+            return f'"{_md5_of(f, file_size).hexdigest()}"'
+
+        part_count = int(etag_body.rsplit("-", 1)[1])
+        part_size = compute_part_size(file_size)
+        if math.ceil(file_size / part_size) != part_count:
+            part_size = math.ceil(file_size / part_count / (1024 * 1024)) * 1024 * 1024
+        part_digests = [
+            _md5_of(f, part_size).digest() for _ in range(math.ceil(file_size / part_size))
+        ]
+    combined = hashlib.md5(b"".join(part_digests), usedforsecurity=False).hexdigest()
+    return f'"{combined}-{len(part_digests)}"'
+
+
+def is_unchanged(file_path, local_size, remote_size, remote_etag, compare_checksums):
+    if local_size != remote_size:
+        return False
+    if not compare_checksums:
+        return True
+    return local_etag(file_path, remote_etag) == remote_etag
+
+
+def _delete_remote(bucket, keys):
+    s3_client = get_optimized_s3_client()
+    failed = {}
+    for i in range(0, len(keys), DELETE_BATCH_SIZE):
+        batch = keys[i : i + DELETE_BATCH_SIZE]
+        response = s3_client.delete_objects(
+            Bucket=bucket, Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+        )
+        for error in response.get("Errors", []):
+            failed[error["Key"]] = error.get("Message", error.get("Code"))
+    return failed
+
+
+def sync_directory(
+    local_directory,
+    prefix,
+    direction=UPLOAD,
+    bucket=None,
+    delete_extra=False,
+    compare_checksums=True,
+    dry_run=False,
+    max_concurrency=None,
+):
+    """
+    Make an S3 prefix mirror a local directory, or the other way round.
+
+    Files are compared by size and, when sizes match and ``compare_checksums``
+    is set, by the S3 ETag computed locally. Only files that differ are
+    transferred, on a pool of ``max_concurrency`` workers that also runs the
+    comparisons. The parts and ranges of all those transfers share one pool
+    sized like a single transfer's, so the thread count stays bounded however
+    many files run at once. With ``delete_extra`` anything present only at the
+    destination is removed; for downloads only below input/, output/ or
+    models/ (see ``check_delete_extra``). Returns a JSON-serializable manifest
+    of what happened.
+    """
+    if direction not in SYNC_DIRECTIONS:
+        raise ValueError(f"Unknown sync direction: {direction}")
+    if direction == DOWNLOAD and delete_extra:
+        check_delete_extra(local_directory)
+
+    bucket = bucket or S3_BUCKET_NAME
+    prefix = normalize_prefix(prefix)
+    max_concurrency = max_concurrency or S3_SYNC_CONCURRENCY
+    started = time.time()
+
+    local_files = list_local_files(local_directory)
+    remote_objects = list_remote_objects(bucket, prefix)
+
+    if direction == UPLOAD:
+        sources, destinations = local_files, remote_objects
+    else:
+        sources, destinations = remote_objects, local_files
+
+    def local_path(rel_path):
+        path = os.path.abspath(os.path.join(local_directory, *rel_path.split("/")))
+        if not path.startswith(os.path.abspath(local_directory) + os.sep):
+            raise ValueError(f"Refusing to write outside {local_directory}: {rel_path}")
+        return path
+
+    def sync_one(rel_path):
+        path = local_path(rel_path)
+        key = f"{prefix}{rel_path}"
+        if rel_path in local_files and rel_path in remote_objects:
+            remote_size, remote_etag = remote_objects[rel_path]
+            if is_unchanged(
+                path, local_files[rel_path], remote_size, remote_etag, compare_checksums
+            ):
+                return "unchanged", 0
+        if dry_run:
+            return "transferred", 0
+
+        if direction == UPLOAD:
+            upload_with_progress(path, bucket, key, executor=part_executor)
+            return "transferred", local_files[rel_path]
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        download_s3_object_parallel(bucket, key, path, executor=part_executor)
+        return "transferred", remote_objects[rel_path][0]
+
+    manifest = {
+        "direction": direction,
+        "bucket": bucket,
+        "prefix": prefix,
+        "local_directory": local_directory,
+        "dry_run": dry_run,
+        "transferred": [],
+        "unchanged": [],
+        "deleted": [],
+        "failed": [],
+        "bytes_transferred": 0,
+    }
+
+    workers = max(1, min(max_concurrency, len(sources)))
+    part_workers = S3_UPLOAD_CONCURRENCY if direction == UPLOAD else S3_DOWNLOAD_CONCURRENCY
+    with contextlib.ExitStack() as stack:
+        part_executor = stack.enter_context(ThreadPoolExecutor(max_workers=part_workers))
+        executor = stack.enter_context(ThreadPoolExecutor(max_workers=workers))
+        futures = {executor.submit(sync_one, rel_path): rel_path for rel_path in sorted(sources)}
+        for future, rel_path in futures.items():
+            try:
+                outcome, size = future.result()
+            except Exception as e:
+                logger.error(f"Failed to sync {rel_path}: {e}")
+                manifest["failed"].append({"path": rel_path, "error": str(e)})
+                continue
+            manifest[outcome].append(rel_path)
+            manifest["bytes_transferred"] += size
+
+    if delete_extra:
+        extras = sorted(set(destinations) - set(sources))
+        if direction == UPLOAD:
+            failed = {} if dry_run else _delete_remote(bucket, [f"{prefix}{p}" for p in extras])
+            for rel_path in extras:
+                error = failed.get(f"{prefix}{rel_path}")
+                if error:
+                    manifest["failed"].append({"path": rel_path, "error": error})
+                else:
+                    manifest["deleted"].append(rel_path)
+        else:
+            for rel_path in extras:
+                try:
+                    if not dry_run:
+                        os.remove(local_path(rel_path))
+                    manifest["deleted"].append(rel_path)
+                except OSError as e:
+                    manifest["failed"].append({"path": rel_path, "error": str(e)})
+
+    manifest["duration"] = round(time.time() - started, 3)
+    logger.info(
+        f"Synced {local_directory} {'to' if direction == UPLOAD else 'from'} "
+        f"s3://{bucket}/{prefix}: {len(manifest['transferred'])} transferred, "
+        f"{len(manifest['unchanged'])} unchanged, {len(manifest['deleted'])} deleted, "
+        f"{len(manifest['failed'])} failed"
+    )
+    return manifest
+
+
+class SyncDirectoryWithS3:
+    """
+    Syncs a local directory with an S3 prefix in either direction
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "local_directory": ("STRING", {"forceInput": False}),
+                "s3_prefix": ("STRING", {"forceInput": False}),
+                "direction": (SYNC_DIRECTIONS, {"default": UPLOAD}),
+            },
+            "optional": {
+                "delete_extra": (
+                    "BOOLEAN",
+                    {
+                        "default": False,
+                        "tooltip": "Delete files at the destination that are not in the source",
+                    },
+                ),
+                "compare_checksums": (
+                    "BOOLEAN",
+                    {
+                        "default": True,
+                        "tooltip": "Hash same-sized files and compare them with the S3 ETag; "
+                        "when off, files of equal size are treated as unchanged",
+                    },
+                ),
+                "dry_run": (
+                    "BOOLEAN",
+                    {"default": False, "tooltip": "Report what would change without transferring"},
+                ),
+                "max_concurrency": (
+                    "INT",
+                    {"default": S3_SYNC_CONCURRENCY, "min": 1, "max": 128},
+                ),
+            },
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("manifest",)
+    FUNCTION = "sync_directory"
+    CATEGORY = "FlowScale/Cloud/Sync"
+
+    def sync_directory(
+        self,
+        local_directory,
+        s3_prefix,
+        direction=UPLOAD,
+        delete_extra=False,
+        compare_checksums=True,
+        dry_run=False,
+        max_concurrency=S3_SYNC_CONCURRENCY,
+    ):
+        if not all([AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, S3_BUCKET_NAME]):
+            raise Exception("AWS credentials not set")
+
+        try:
+            manifest = sync_directory(
+                resolve_local_directory(local_directory),
+                s3_prefix,
+                direction=direction,
+                delete_extra=delete_extra,
+                compare_checksums=compare_checksums,
+                dry_run=dry_run,
+                max_concurrency=max_concurrency,
+            )
+        except Exception as e:
+            raise Exception(f"Failed to sync directory with S3: {str(e)}") from e
+
+        if manifest["failed"]:
+            logger.warning(f"{len(manifest['failed'])} files failed to sync")
+        return (json.dumps(manifest, indent=2),)
@@ -1,6 +1,15 @@
+import base64
+import contextlib
+import functools
+import hashlib
+import io
+import json
 import logging
+import math
 import os
 import random
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 import boto3
 import folder_paths  # type: ignore
@@ -8,9 +17,15 @@ import httpx
 import numpy as np
 from boto3.exceptions import S3UploadFailedError
 from botocore.config import Config
-from botocore.exceptions import NoCredentialsError, PartialCredentialsError
+from botocore.exceptions import ClientError, NoCredentialsError, PartialCredentialsError
 from PIL import Image
 
+from .model_cache import get_model_cache
+from .presign_cache import PresignedUrlCache
+from .transfer_metrics import track_transfer
+from .transfer_scheduler import BULK, INTERACTIVE, TransferScheduler
+from .upload_queue import get_upload_queue, has_pending_uploads, register_upload_handler
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -19,97 +34,1367 @@ AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_S3_SECRET_ACCESS_KEY")
 AWS_REGION = os.environ.get("AWS_S3_REGION", "us-east-1")
 S3_BUCKET_NAME = os.environ.get("AWS_S3_BUCKET_NAME")
 
-# Global S3 client with optimized configuration
-_s3_client_pool = None
+# Multipart upload tuning
+MULTIPART_THRESHOLD = 100 * 1024 * 1024  # 100MB
+MIN_PART_SIZE = 8 * 1024 * 1024  # S3 minimum is 5MB
+MAX_PART_SIZE = 5 * 1024 * 1024 * 1024  # S3 maximum is 5GB
+MAX_PARTS = 10000
+S3_UPLOAD_CONCURRENCY = int(os.environ.get("FLOWSCALE_S3_UPLOAD_CONCURRENCY", "8"))
+S3_MAX_INFLIGHT_BYTES = int(
+    os.environ.get("FLOWSCALE_S3_MAX_INFLIGHT_BYTES", str(256 * 1024 * 1024))
+)
+
+# Ranged download tuning
+S3_DOWNLOAD_CONCURRENCY = int(os.environ.get("FLOWSCALE_S3_DOWNLOAD_CONCURRENCY", "8"))
+S3_DOWNLOAD_PART_SIZE = int(
+    os.environ.get("FLOWSCALE_S3_DOWNLOAD_PART_SIZE", str(16 * 1024 * 1024))
+)
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB reads per range stream
+DOWNLOAD_TIMEOUT = httpx.Timeout(30.0, read=300.0)
+
+# End-to-end integrity checks: S3 verifies a SHA256 per uploaded part and
+# downloads are hashed in flight against the checksums S3 stored for each part
+S3_CHECKSUMS = os.environ.get("FLOWSCALE_S3_CHECKSUMS", "true").lower() == "true"
+CHECKSUM_ALGORITHM = "SHA256"
+RANGE_RETRIES = 3  # attempts per range before a corrupt download is given up
+
+# Parallel encode/upload workers for image batches
+IMAGE_UPLOAD_CONCURRENCY = int(os.environ.get("FLOWSCALE_IMAGE_UPLOAD_CONCURRENCY", "8"))
+
+# Parts in flight while relaying a URL into S3
+RELAY_MAX_BUFFERED_PARTS = 4
+
+RESUMABLE_TOOLTIP = (
+    "Keep a sidecar manifest next to the file so a failed upload resumes "
+    "from the parts already in S3 instead of starting over"
+)
+
+SKIP_IF_UNCHANGED_TOOLTIP = (
+    "Hash the file and skip the upload when the object already in S3 has the same contents"
+)
+BACKGROUND_TOOLTIP = (
+    "Hand the transfer to the background upload queue and return the key and URL "
+    "immediately; track progress at /flowscale/s3/uploads"
+)
+USE_CACHE_TOOLTIP = (
+    "Reuse a locally cached copy when the remote ETag is unchanged instead of "
+    "downloading the model again"
+)
+
+# S3 client pool settings
+S3_ENDPOINT_URL = os.environ.get("AWS_S3_ENDPOINT_URL")
+S3_MAX_POOL_CONNECTIONS = int(os.environ.get("FLOWSCALE_S3_MAX_POOL_CONNECTIONS", "50"))
+S3_TCP_KEEPALIVE = os.environ.get("FLOWSCALE_S3_TCP_KEEPALIVE", "true").lower() == "true"
+
+# Process-wide S3 clients keyed by region, credentials, endpoint and pool size
+_s3_clients = {}
+_s3_clients_lock = threading.Lock()
+
+
+def get_s3_client(
+    region=None,
+    access_key_id=None,
+    secret_access_key=None,
+    endpoint_url=None,
+    max_pool_connections=None,
+):
+    """
+    Return a shared S3 client for the given settings, creating it on first use.
+
+    Clients are expensive to build (endpoint resolution, credential chain) and
+    each owns its own connection pool, so every S3 node goes through this
+    registry to keep TLS connections alive across prompts. Arguments default to
+    the ``AWS_S3_*`` environment configuration.
+    """
+    region = region or AWS_REGION
+    access_key_id = access_key_id or AWS_ACCESS_KEY_ID
+    secret_access_key = secret_access_key or AWS_SECRET_ACCESS_KEY
+    endpoint_url = endpoint_url or S3_ENDPOINT_URL
+    max_pool_connections = max_pool_connections or S3_MAX_POOL_CONNECTIONS
+    key = (region, access_key_id, secret_access_key, endpoint_url, max_pool_connections)
+
+    with _s3_clients_lock:
+        client = _s3_clients.get(key)
+        if client is None:
+            config = Config(
+                region_name=region,
+                retries={"max_attempts": 3, "mode": "adaptive"},
+                max_pool_connections=max_pool_connections,
+                tcp_keepalive=S3_TCP_KEEPALIVE,
+            )
+            client = boto3.client(
+                "s3",
+                aws_access_key_id=access_key_id,
+                aws_secret_access_key=secret_access_key,
+                endpoint_url=endpoint_url,
+                use_ssl=True,
+                config=config,
+            )
+            _s3_clients[key] = client
+        return client
 
 
 def get_optimized_s3_client():
     """Get an optimized S3 client with connection pooling"""
-    global _s3_client_pool
-
-    if _s3_client_pool is None:
-        config = Config(
-            region_name=AWS_REGION,
-            retries={"max_attempts": 3, "mode": "adaptive"},
-            max_pool_connections=50,
-            use_ssl=True,
-        )
+    return get_s3_client()
 
-        _s3_client_pool = boto3.client(
-            "s3",
-            aws_access_key_id=AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-            config=config,
-        )
 
-    return _s3_client_pool
+_presigned_urls = PresignedUrlCache()
 
+# Every transfer takes a slot here, so interactive uploads are never stuck
+# behind bulk model parts in the shared connection pool
+transfer_scheduler = TransferScheduler(S3_MAX_POOL_CONNECTIONS)
 
-def upload_with_progress(file_path, bucket, key, callback=None):
-    """Upload file with progress tracking and multipart for large files"""
-    file_size = os.path.getsize(file_path)
 
-    # Use multipart upload for files larger than 100MB
-    if file_size > 100 * 1024 * 1024:
-        return upload_large_file_multipart(file_path, bucket, key, callback)
-    else:
-        return upload_small_file(file_path, bucket, key, callback)
+def get_presigned_url(bucket, key, method="get_object", expires_in=None, s3_client=None):
+    """Return a presigned URL, reusing a cached one while enough lifetime remains"""
+    s3_client = s3_client or get_optimized_s3_client()
+    return _presigned_urls.get(s3_client, bucket, key, method, expires_in)[0]
 
 
-def upload_small_file(file_path, bucket, key, callback=None):
-    """Upload small files directly"""
-    s3_client = get_optimized_s3_client()
+def get_presigned_urls(bucket, keys, method="get_object", expires_in=None):
+    """Return ``{key: {"url", "expires_at"}}`` for many keys in one call"""
+    entries = _presigned_urls.get_many(get_optimized_s3_client(), bucket, keys, method, expires_in)
+    return {
+        key: {"url": url, "expires_at": expires_at} for key, (url, expires_at) in entries.items()
+    }
+
+
+def checksum_args():
+    """``ExtraArgs`` asking boto3 to send a SHA256 that S3 verifies and stores"""
+    return {"ChecksumAlgorithm": CHECKSUM_ALGORITHM} if S3_CHECKSUMS else {}
+
+
+def b64_sha256(digest):
+    """Encode a raw SHA256 digest the way S3 reports ``ChecksumSHA256``"""
+    return base64.b64encode(digest).decode("ascii")
+
+
+def upload_with_progress(
+    file_path,
+    bucket,
+    key,
+    callback=None,
+    resumable=False,
+    skip_if_unchanged=False,
+    priority=BULK,
+    executor=None,
+):
+    """
+    Upload file with progress tracking and multipart for large files.
+
+    With ``skip_if_unchanged=True`` the file is hashed in one streaming pass and
+    compared with the existing object at ``key``; matching objects are not
+    uploaded again and ``None`` is returned. Uploaded objects carry the SHA256
+    in their metadata so later comparisons do not depend on the part layout.
+    ``priority`` is the ``transfer_scheduler`` class the upload runs in, and the
+    transfer is recorded in the ``/flowscale/metrics`` histograms. ``executor``
+    optionally runs the parts of a multipart upload on a pool shared by several
+    transfers instead of one of their own.
+    """
+    file_size = os.path.getsize(file_path)
+    metadata = None
+
+    if skip_if_unchanged:
+        checksums = compute_file_checksums(file_path)
+        if remote_object_matches(bucket, key, file_size, checksums):
+            logger.info(f"s3://{bucket}/{key} already matches {file_path}, skipping upload")
+            return None
+        metadata = {"sha256": checksums["sha256"]}
+
+    with track_transfer("upload", priority) as tracker:
+        # Use multipart upload for files larger than 100MB
+        if file_size > MULTIPART_THRESHOLD:
+            return upload_large_file_multipart(
+                file_path,
+                bucket,
+                key,
+                callback,
+                resumable=resumable,
+                metadata=metadata,
+                priority=priority,
+                tracker=tracker,
+                executor=executor,
+            )
+        else:
+            return upload_small_file(
+                file_path,
+                bucket,
+                key,
+                callback,
+                metadata=metadata,
+                priority=priority,
+                tracker=tracker,
+            )
+
+
+def throttled_callback(priority, callback=None):
+    """boto3 ``Callback`` that applies the class bandwidth cap, then calls ``callback``"""
 
     def progress_callback(bytes_transferred):
+        transfer_scheduler.throttle(priority, bytes_transferred)
         if callback:
             callback(bytes_transferred)
 
-    s3_client.upload_file(file_path, bucket, key, Callback=progress_callback)
+    return progress_callback
 
 
-def upload_large_file_multipart(file_path, bucket, key, callback=None):
-    """Upload large files using multipart upload"""
+def upload_small_file(
+    file_path, bucket, key, callback=None, metadata=None, priority=BULK, tracker=None
+):
+    """Upload small files directly"""
     s3_client = get_optimized_s3_client()
 
-    # Initiate multipart upload
-    response = s3_client.create_multipart_upload(Bucket=bucket, Key=key)
-    upload_id = response["UploadId"]
+    extra_args = checksum_args()
+    if metadata:
+        extra_args["Metadata"] = metadata
+    with track_transfer("upload", priority, tracker) as tracker, transfer_scheduler.slot(priority):
+        s3_client.upload_file(
+            file_path,
+            bucket,
+            key,
+            ExtraArgs=extra_args or None,
+            Callback=throttled_callback(priority, tracker.callback(callback)),
+        )
+
+
+def compute_file_checksums(file_path, part_size=None):
+    """
+    Return the SHA256 and the S3 ETag of a file from a single streaming read.
+
+    The ETag is computed for the layout these helpers upload with: a single PUT
+    below ``MIN_PART_SIZE`` (boto3's default multipart threshold), otherwise
+    parts of ``compute_part_size(file_size)`` bytes.
+    """
+    file_size = os.path.getsize(file_path)
+    part_size = part_size or compute_part_size(file_size)
+    sha256 = hashlib.sha256()
+    part_digests = []
+
+    with open(file_path, "rb") as f:
+        while True:
+            data = f.read(part_size)
+            if not data:
+                break
+            sha256.update(data)
+            part_digests.append(hashlib.md5(data, usedforsecurity=False).digest())
+
+    if file_size < MIN_PART_SIZE:
+        etag = part_digests[0].hex() if part_digests else hashlib.md5(b"").hexdigest()
+    else:
+        combined = hashlib.md5(b"".join(part_digests), usedforsecurity=False).hexdigest()
+        etag = f"{combined}-{len(part_digests)}"
+
+    return {"sha256": sha256.hexdigest(), "etag": f'"{etag}"'}
+
+
+def head_object_or_none(bucket, key):
+    """Return ``head_object`` for ``key``, or None when the object does not exist"""
+    try:
+        return get_optimized_s3_client().head_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+
+
+def remote_object_matches(bucket, key, file_size, checksums):
+    """Check whether the object at ``key`` holds the same bytes as a local file"""
+    head = head_object_or_none(bucket, key)
+    if head is None or head["ContentLength"] != file_size:
+        return False
+
+    remote_sha256 = head.get("Metadata", {}).get("sha256")
+    if remote_sha256:
+        return remote_sha256 == checksums["sha256"]
+    return head.get("ETag") == checksums["etag"]
+
+
+def compute_part_size(file_size, min_part_size=MIN_PART_SIZE):
+    """
+    Pick a part size that keeps the upload under the S3 part count limit.
+
+    Parts grow in whole MiB steps once ``file_size / min_part_size`` would exceed
+    ``MAX_PARTS``, so a 100 GB checkpoint still fits in 10,000 parts.
+    """
+    part_size = max(min_part_size, MIN_PART_SIZE)
+    if file_size > part_size * MAX_PARTS:
+        part_size = math.ceil(file_size / MAX_PARTS)
+        part_size = math.ceil(part_size / (1024 * 1024)) * 1024 * 1024
+    return min(part_size, MAX_PART_SIZE)
+
+
+class _TransferProgress:
+    """Thread-safe byte counter that reports the running total to a callback"""
+
+    def __init__(self, callback=None):
+        self._callback = callback
+        self._lock = threading.Lock()
+        self.bytes_transferred = 0
+
+    def add(self, amount):
+        with self._lock:
+            self.bytes_transferred += amount
+            total = self.bytes_transferred
+        if self._callback:
+            self._callback(total)
+
+
+def _read_part(file_path, offset, size):
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
+
+def get_upload_manifest_path(file_path):
+    """Sidecar manifest used to resume an interrupted multipart upload"""
+    return f"{file_path}.s3upload.json"
+
+
+def _load_upload_manifest(manifest_path, bucket, key, file_size, file_mtime):
+    """Return the saved manifest if it still describes this file and destination"""
+    if not os.path.exists(manifest_path):
+        return None
 
     try:
-        parts = []
-        os.path.getsize(file_path)
-        chunk_size = 10 * 1024 * 1024  # 10MB chunks
-        part_number = 1
-        bytes_transferred = 0
-
-        with open(file_path, "rb") as f:
-            while True:
-                data = f.read(chunk_size)
-                if not data:
-                    break
-
-                # Upload part
-                response = s3_client.upload_part(
-                    Bucket=bucket, Key=key, PartNumber=part_number, UploadId=upload_id, Body=data
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable upload manifest {manifest_path}: {e}")
+        return None
+
+    expected = {"bucket": bucket, "key": key, "file_size": file_size, "file_mtime": file_mtime}
+    if any(manifest.get(field) != value for field, value in expected.items()):
+        logger.info(f"Upload manifest {manifest_path} is stale, starting a new upload")
+        return None
+
+    return manifest
+
+
+def _save_upload_manifest(manifest_path, manifest):
+    """Atomically persist the manifest so a crash never leaves a torn file"""
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+
+def _remove_upload_manifest(manifest_path):
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(manifest_path)
+
+
+def _list_uploaded_parts(s3_client, bucket, key, upload_id):
+    """Return ``{part_number: (etag, size, sha256)}`` for parts S3 already holds"""
+    parts = {}
+    marker = 0
+    while True:
+        response = s3_client.list_parts(
+            Bucket=bucket, Key=key, UploadId=upload_id, PartNumberMarker=marker
+        )
+        for part in response.get("Parts", []):
+            parts[part["PartNumber"]] = (part["ETag"], part["Size"], part.get("ChecksumSHA256"))
+        if not response.get("IsTruncated"):
+            return parts
+        marker = response["NextPartNumberMarker"]
+
+
+def _resume_multipart_upload(s3_client, manifest):
+    """Return ``{part_number: part}`` confirmed by S3 for a saved upload, or None if it is gone"""
+    try:
+        uploaded = _list_uploaded_parts(
+            s3_client, manifest["bucket"], manifest["key"], manifest["upload_id"]
+        )
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") == "NoSuchUpload":
+            logger.info(f"Multipart upload {manifest['upload_id']} no longer exists")
+            return None
+        raise
+
+    file_size = manifest["file_size"]
+    part_size = manifest["part_size"]
+    with_checksums = manifest.get("checksum_algorithm") == CHECKSUM_ALGORITHM
+    completed = {}
+    for part_number, (etag, size, sha256) in uploaded.items():
+        offset = (part_number - 1) * part_size
+        if size != min(part_size, file_size - offset):
+            continue
+        if with_checksums:
+            # Completing a checksummed upload needs every part's SHA256
+            if not sha256:
+                continue
+            completed[part_number] = {"ETag": etag, "ChecksumSHA256": sha256}
+        else:
+            completed[part_number] = {"ETag": etag}
+    return completed
+
+
+def upload_large_file_multipart(
+    file_path,
+    bucket,
+    key,
+    callback=None,
+    part_size=None,
+    max_concurrency=None,
+    max_inflight_bytes=None,
+    resumable=False,
+    metadata=None,
+    priority=BULK,
+    tracker=None,
+    executor=None,
+):
+    """
+    Upload large files using a concurrent multipart upload.
+
+    Parts are read and uploaded by a bounded worker pool. The number of workers
+    is capped so that at most ``max_inflight_bytes`` of part data is held in
+    memory at once; a shared ``executor`` replaces the pool and its bound.
+    ``callback`` receives the aggregate number of bytes uploaded.
+    Every part waits for a ``transfer_scheduler`` slot of ``priority`` before it
+    is read.
+
+    With ``resumable=True`` the upload id and completed part ETags are kept in a
+    sidecar manifest next to the file. A failed upload is left open instead of
+    aborted, and the next call verifies the manifest against ``list_parts`` and
+    only uploads the parts that are missing.
+
+    Each part's SHA256 is computed from the bytes already read for the upload
+    and sent along, so S3 rejects a part corrupted in transit (the part is then
+    read and sent again) and keeps the digests for verifying later downloads.
+    """
+    s3_client = get_optimized_s3_client()
+
+    stat_info = os.stat(file_path)
+    file_size = stat_info.st_size
+    manifest_path = get_upload_manifest_path(file_path)
+    manifest = None
+    completed = {}
+
+    if resumable:
+        manifest = _load_upload_manifest(manifest_path, bucket, key, file_size, stat_info.st_mtime)
+        if manifest is not None:
+            completed = _resume_multipart_upload(s3_client, manifest)
+            if completed is None:
+                manifest = None
+                completed = {}
+
+    if manifest is not None:
+        upload_id = manifest["upload_id"]
+        part_size = manifest["part_size"]
+        with_checksums = manifest.get("checksum_algorithm") == CHECKSUM_ALGORITHM
+        logger.info(f"Resuming multipart upload {upload_id} with {len(completed)} parts done")
+    else:
+        part_size = part_size or compute_part_size(file_size)
+        with_checksums = S3_CHECKSUMS
+        # Initiate multipart upload
+        extra_args = checksum_args()
+        if metadata:
+            extra_args["Metadata"] = metadata
+        response = s3_client.create_multipart_upload(Bucket=bucket, Key=key, **extra_args)
+        upload_id = response["UploadId"]
+        if resumable:
+            manifest = {
+                "bucket": bucket,
+                "key": key,
+                "upload_id": upload_id,
+                "file_size": file_size,
+                "file_mtime": stat_info.st_mtime,
+                "part_size": part_size,
+                "checksum_algorithm": CHECKSUM_ALGORITHM if with_checksums else None,
+                "parts": {},
+            }
+            _save_upload_manifest(manifest_path, manifest)
+
+    max_concurrency = max_concurrency or S3_UPLOAD_CONCURRENCY
+    max_inflight_bytes = max_inflight_bytes or S3_MAX_INFLIGHT_BYTES
+    workers = max(1, min(max_concurrency, max_inflight_bytes // part_size))
+    part_count = max(1, math.ceil(file_size / part_size))
+
+    progress = _TransferProgress(callback)
+    manifest_lock = threading.Lock()
+
+    def part_length(part_number):
+        offset = (part_number - 1) * part_size
+        return min(part_size, file_size - offset)
+
+    def send_part(part_number):
+        offset = (part_number - 1) * part_size
+        data = _read_part(file_path, offset, part_length(part_number))
+        transfer_scheduler.throttle(priority, len(data))
+        if not with_checksums:
+            response = s3_client.upload_part(
+                Bucket=bucket, Key=key, PartNumber=part_number, UploadId=upload_id, Body=data
+            )
+            tracker.retry("sdk", response["ResponseMetadata"].get("RetryAttempts", 0))
+            return data, {"ETag": response["ETag"]}
+
+        sha256 = b64_sha256(hashlib.sha256(data).digest())
+        response = s3_client.upload_part(
+            Bucket=bucket,
+            Key=key,
+            PartNumber=part_number,
+            UploadId=upload_id,
+            Body=data,
+            ChecksumAlgorithm=CHECKSUM_ALGORITHM,
+            ChecksumSHA256=sha256,
+        )
+        tracker.retry("sdk", response["ResponseMetadata"].get("RetryAttempts", 0))
+        return data, {"ETag": response["ETag"], "ChecksumSHA256": sha256}
+
+    def upload_part(part_number):
+        for attempt in range(1, RANGE_RETRIES + 1):
+            try:
+                with transfer_scheduler.slot(priority, job=(bucket, key)), tracker.part():
+                    data, part = send_part(part_number)
+                break
+            except ClientError as e:
+                if (
+                    e.response.get("Error", {}).get("Code") != "BadDigest"
+                    or attempt == RANGE_RETRIES
+                ):
+                    raise
+                tracker.retry("bad_digest")
+                logger.warning(f"S3 rejected part {part_number} of {key} as corrupt, resending")
+        if manifest is not None:
+            with manifest_lock:
+                manifest["parts"][str(part_number)] = part["ETag"]
+                _save_upload_manifest(manifest_path, manifest)
+        progress.add(len(data))
+        tracker.add(len(data))
+        return part
+
+    pending = [n for n in range(1, part_count + 1) if n not in completed]
+    if completed:
+        progress.add(sum(part_length(n) for n in completed))
+
+    logger.info(
+        f"Uploading {file_path} to s3://{bucket}/{key} in {part_count} parts "
+        f"of {part_size // (1024 * 1024)}MB with {workers} workers"
+    )
+
+    with track_transfer("upload", priority, tracker) as tracker:
+        try:
+            uploaded = dict(completed)
+            with _part_executor(executor, workers) as part_executor:
+                futures = {part_executor.submit(upload_part, n): n for n in pending}
+                try:
+                    for future, part_number in futures.items():
+                        uploaded[part_number] = future.result()
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+            parts = [{**uploaded[n], "PartNumber": n} for n in range(1, part_count + 1)]
+
+            # Complete multipart upload
+            response = s3_client.complete_multipart_upload(
+                Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+
+        except Exception as e:
+            if resumable:
+                logger.warning(
+                    f"Multipart upload {upload_id} interrupted, resume state kept in {manifest_path}"
                 )
+            else:
+                # Abort multipart upload on error
+                s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            raise e
 
-                parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+    if resumable:
+        _remove_upload_manifest(manifest_path)
+    return response
 
-                bytes_transferred += len(data)
-                if callback:
-                    callback(bytes_transferred)
 
-                part_number += 1
+def _part_executor(executor, workers):
+    """Use the shared ``executor`` when given, otherwise a pool of ``workers`` for one transfer"""
+    if executor is not None:
+        return contextlib.nullcontext(executor)
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def _pwrite_all(fd, data, offset):
+    """Write ``data`` at ``offset`` without touching the shared file position"""
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def _preallocate(fd, size):
+    if size <= 0:
+        return
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError:
+            # Not every filesystem supports fallocate (e.g. some network mounts)
+            pass
+    os.ftruncate(fd, size)
 
-        # Complete multipart upload
-        s3_client.complete_multipart_upload(
-            Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+
+class _OrderedDigest:
+    """
+    SHA256 of a file whose ranges are written concurrently and out of order.
+
+    Chunks are hashed in offset order as they arrive. Chunks ahead of the
+    hashed prefix wait in a reorder buffer, and ``wait_for_window`` keeps
+    ranges from starting more than ``window`` bytes past the prefix, so the
+    buffer stays bounded and nothing is read back from disk.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.position = 0
+        self.failed = False
+        self._digest = hashlib.sha256()
+        self._pending = {}  # offset -> chunk received ahead of ``position``
+        self._condition = threading.Condition()
+
+    def _feed(self, chunk):
+        self._digest.update(chunk)
+        self.position += len(chunk)
+        while self.position in self._pending:
+            chunk = self._pending.pop(self.position)
+            self._digest.update(chunk)
+            self.position += len(chunk)
+
+    def update(self, offset, chunk):
+        with self._condition:
+            if offset + len(chunk) <= self.position:
+                return  # a retried range re-sending bytes that are already hashed
+            if offset < self.position:
+                chunk = chunk[self.position - offset :]
+                offset = self.position
+            if offset == self.position:
+                self._feed(chunk)
+                self._condition.notify_all()
+            else:
+                self._pending[offset] = bytes(chunk)
+
+    def discard(self, start, end):
+        """Drop buffered chunks of ``start``-``end`` before the range is fetched again"""
+        with self._condition:
+            for offset in [o for o in self._pending if start <= o <= end]:
+                del self._pending[offset]
+
+    def wait_for_window(self, start):
+        with self._condition:
+            self._condition.wait_for(lambda: start - self.position <= self.window or self.failed)
+            if self.failed:
+                raise OSError("Download aborted")
+
+    def fail(self):
+        with self._condition:
+            self.failed = True
+            self._condition.notify_all()
+
+    def digest(self):
+        return self._digest.digest()
+
+
+def _file_range_sha256(fd, start, end):
+    sha256 = hashlib.sha256()
+    offset = start
+    while offset <= end:
+        data = os.pread(fd, min(DOWNLOAD_CHUNK_SIZE, end + 1 - offset), offset)
+        if not data:
+            break
+        sha256.update(data)
+        offset += len(data)
+    return b64_sha256(sha256.digest())
+
+
+def parallel_ranged_download(
+    fetch_range,
+    total_size,
+    save_path,
+    part_size=None,
+    max_concurrency=None,
+    callback=None,
+    ranges=None,
+    priority=BULK,
+    tracker=None,
+    sha256=None,
+    get_part_ranges=None,
+    executor=None,
+):
+    """
+    Download ``total_size`` bytes into ``save_path`` using concurrent ranged reads.
+
+    ``fetch_range(start, end)`` must yield the bytes of the inclusive range
+    ``start``-``end`` in order. Every range is written with ``os.pwrite`` at its
+    own offset into a preallocated temporary file, which is renamed over
+    ``save_path`` only after all ranges have completed.
+
+    ``ranges`` optionally replaces the ``part_size`` layout with
+    ``(start, end, sha256)`` tuples, ``sha256`` being the base64 digest S3
+    stores for that span (or None). Ranges are hashed as they are written, and
+    one that comes back short or with the wrong digest is fetched again on its
+    own, up to ``RANGE_RETRIES`` times, without restarting the download. Each
+    range holds a ``transfer_scheduler`` slot of ``priority`` while it runs.
+
+    ``sha256`` is a whole-object digest checked across all ranges in one
+    in-order pass (see ``_OrderedDigest``). Ranges run at most
+    ``S3_MAX_INFLIGHT_BYTES`` ahead of the hashed prefix. On a mismatch,
+    ``get_part_ranges()`` supplies per-part ``(start, end, sha256)`` tuples,
+    the written file is checked part by part and only the parts that fail are
+    fetched again.
+
+    ``executor`` optionally runs the ranges on a pool shared by several
+    downloads instead of one of their own.
+    """
+    part_size = part_size or S3_DOWNLOAD_PART_SIZE
+    max_concurrency = max_concurrency or S3_DOWNLOAD_CONCURRENCY
+    if ranges is None:
+        ranges = [
+            (start, min(start + part_size, total_size) - 1, None)
+            for start in range(0, total_size, part_size)
+        ]
+    workers = max(1, min(max_concurrency, len(ranges)))
+    progress = _TransferProgress(callback)
+    tmp_path = f"{save_path}.download"
+    ordered = None
+    if sha256:
+        window = max(part_size, min((workers - 1) * part_size, S3_MAX_INFLIGHT_BYTES))
+        ordered = _OrderedDigest(window)
+
+    def fetch_and_write(start, end, expected_sha256):
+        sha256 = hashlib.sha256() if expected_sha256 else None
+        offset = start
+        try:
+            for chunk in fetch_range(start, end):
+                transfer_scheduler.throttle(priority, len(chunk))
+                _pwrite_all(fd, chunk, offset)
+                if sha256 is not None:
+                    sha256.update(chunk)
+                if ordered is not None:
+                    ordered.update(offset, chunk)
+                offset += len(chunk)
+                progress.add(len(chunk))
+                tracker.add(len(chunk))
+        except BaseException:
+            progress.add(start - offset)
+            raise
+
+        if offset != end + 1:
+            problem, reason = f"ended early at byte {offset}", "short_read"
+        elif sha256 is not None and b64_sha256(sha256.digest()) != expected_sha256:
+            problem, reason = "failed SHA256 verification", "checksum"
+        else:
+            return None
+        progress.add(start - offset)
+        tracker.retry(reason)
+        if ordered is not None:
+            ordered.discard(start, end)
+        return problem
+
+    def download_range(start, end, expected_sha256):
+        if ordered is not None:
+            ordered.wait_for_window(start)
+        for attempt in range(1, RANGE_RETRIES + 1):
+            with transfer_scheduler.slot(priority, job=save_path), tracker.part():
+                problem = fetch_and_write(start, end, expected_sha256)
+            if problem is None:
+                return
+            logger.warning(f"Range {start}-{end} {problem} (attempt {attempt}/{RANGE_RETRIES})")
+        raise OSError(f"Range {start}-{end} {problem} after {RANGE_RETRIES} attempts")
+
+    def verify_parts():
+        nonlocal ordered
+        part_ranges = get_part_ranges() if get_part_ranges else None
+        if not part_ranges:
+            raise OSError(
+                f"{save_path} failed SHA256 verification and the source has no part "
+                "checksums to find the corrupt range"
+            )
+        ordered = None
+        corrupt = [r for r in part_ranges if _file_range_sha256(fd, r[0], r[1]) != r[2]]
+        if not corrupt:
+            logger.warning(
+                f"{save_path} does not match its advertised SHA256, but every part matches "
+                "its stored checksum; keeping it"
+            )
+            return
+        logger.warning(
+            f"{save_path} failed SHA256 verification, fetching {len(corrupt)} of "
+            f"{len(part_ranges)} parts again"
         )
+        for start, end, expected_sha256 in corrupt:
+            progress.add(start - end - 1)
+            download_range(start, end, expected_sha256)
 
-    except Exception as e:
-        # Abort multipart upload on error
-        s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
-        raise e
+    # Readable as well, so a failed whole-object check can re-hash parts in place
+    fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        _preallocate(fd, total_size)
+        with track_transfer("download", priority, tracker) as tracker:
+            with _part_executor(executor, workers) as range_executor:
+                futures = [
+                    range_executor.submit(download_range, *byte_range) for byte_range in ranges
+                ]
+                try:
+                    for future in futures:
+                        future.result()
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    if ordered is not None:
+                        ordered.fail()
+                    raise
+            if ordered is not None and b64_sha256(ordered.digest()) != sha256:
+                tracker.retry("checksum")
+                verify_parts()
+        os.fsync(fd)
+    except BaseException:
+        os.close(fd)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+    os.close(fd)
+    os.replace(tmp_path, save_path)
+    return save_path
+
+
+def probe_url(client, url):
+    """
+    Return ``(final_url, total_size, supports_ranges, validator, sha256)`` for a URL.
+
+    Probes with a one-byte ranged GET rather than HEAD, since presigned S3 GET
+    URLs reject HEAD requests. The body is never read on a full 200 response.
+    ``sha256`` is the base64 whole-object digest advertised by S3, if any.
+
+    An empty object answers the probe with 416 and ``Content-Range: bytes */0``
+    and is reported with size 0. A server that supports ranges but reports
+    the length as unknown (``bytes 0-0/*``) is reported as not supporting
+    ranges, with size 0, so the download uses a single stream.
+    """
+    with client.stream("GET", url, headers={"Range": "bytes=0-0"}) as response:
+        headers = response.headers
+        content_range_total = _content_range_total(headers.get("Content-Range"))
+        if response.status_code != 416 or content_range_total != 0:
+            response.raise_for_status()
+        final_url = str(response.url)
+        if response.status_code in (206, 416):
+            supports_ranges = content_range_total is not None
+            total_size = content_range_total or 0
+        else:
+            supports_ranges = False
+            total_size = int(headers.get("Content-Length", 0))
+
+    validator = headers.get("ETag")
+    if not validator and headers.get("Last-Modified"):
+        validator = f"{headers['Last-Modified']}:{total_size}"
+    return final_url, total_size, supports_ranges, validator, _advertised_sha256(headers)
+
+
+def _content_range_total(content_range):
+    """Complete length from a ``Content-Range`` header, or None when it is absent or ``*``"""
+    total = (content_range or "").rsplit("/", 1)[-1].strip()
+    return int(total) if total.isdigit() else None
+
+
+def _advertised_sha256(headers):
+    """Whole-object SHA256 from S3 response headers, base64 encoded"""
+    checksum = headers.get("x-amz-checksum-sha256")
+    if checksum and "-" not in checksum and headers.get("x-amz-checksum-type") != "COMPOSITE":
+        return checksum
+    hex_digest = headers.get("x-amz-meta-sha256")
+    if hex_digest:
+        try:
+            return b64_sha256(bytes.fromhex(hex_digest))
+        except ValueError:
+            return None
+    return None
+
+
+def _http_client(max_concurrency):
+    limits = httpx.Limits(
+        max_connections=max_concurrency, max_keepalive_connections=max_concurrency
+    )
+    return httpx.Client(follow_redirects=True, limits=limits, timeout=DOWNLOAD_TIMEOUT)
+
+
+def get_url_probe(url):
+    """
+    Return ``probe_url`` for ``url``; its fourth item is the ETag (or
+    Last-Modified and size) currently served, the model cache validator.
+    """
+    with _http_client(1) as client:
+        return probe_url(client, url)
+
+
+def get_s3_object_validator(bucket, key):
+    """Return the current ETag of an S3 object"""
+    return get_optimized_s3_client().head_object(Bucket=bucket, Key=key)["ETag"]
+
+
+def download_with_cache(source, validator, save_path, download, use_cache=True):
+    """
+    Serve ``save_path`` from the local model cache or run ``download()``.
+
+    ``source`` identifies the remote object and ``validator`` its current
+    version, so a hit is only served while the remote ETag still matches.
+    """
+    cache = get_model_cache() if use_cache and validator else None
+    if cache is not None and cache.fetch(source, validator, save_path):
+        return save_path
+
+    download()
+
+    if cache is not None:
+        cache.store(source, validator, save_path)
+    return save_path
+
+
+def download_url_parallel(
+    url,
+    save_path,
+    part_size=None,
+    max_concurrency=None,
+    callback=None,
+    priority=BULK,
+    probe=None,
+):
+    """
+    Download a URL with concurrent HTTP Range requests.
+
+    Falls back to a single streamed GET when the server does not support
+    byte ranges or does not report a content length.
+
+    When the server advertises a whole-object SHA256 (an S3 checksum or the
+    ``sha256`` metadata our uploads set) the download is verified against it
+    in the same pass, whether it arrives as one stream or many ranges. A
+    ranged download that fails the check is compared part by part with the
+    checksums S3 stores (see ``probe_url_parts``) and only corrupt parts are
+    fetched again. Every range is also length-checked and retried on its own.
+
+    ``probe`` reuses a ``probe_url`` result already fetched for ``url``.
+    """
+    max_concurrency = max_concurrency or S3_DOWNLOAD_CONCURRENCY
+    part_size = part_size or S3_DOWNLOAD_PART_SIZE
+    with track_transfer("download", priority) as tracker, _http_client(max_concurrency) as client:
+        final_url, total_size, supports_ranges, _, sha256 = probe or probe_url(client, url)
+        if not sha256:
+            logger.info(f"{url} advertises no SHA256, only the download's length is checked")
+
+        if not supports_ranges or total_size <= 0:
+            logger.info(f"{url} does not support ranged reads, using a single stream")
+            return _download_url_stream(
+                client, final_url, save_path, sha256, callback, priority, tracker
+            )
+
+        def fetch_range(start, end):
+            headers = {"Range": f"bytes={start}-{end}"}
+            with client.stream("GET", final_url, headers=headers) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise OSError(f"Server ignored range request for bytes {start}-{end}")
+                yield from response.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE)
+
+        ranges = None
+        get_part_ranges = None
+        if sha256 and total_size <= part_size:
+            ranges = [(0, total_size - 1, sha256)]
+            sha256 = None
+        elif sha256:
+            get_part_ranges = functools.partial(probe_url_parts, client, final_url, total_size)
+        return parallel_ranged_download(
+            fetch_range,
+            total_size,
+            save_path,
+            part_size,
+            max_concurrency,
+            callback,
+            ranges,
+            priority,
+            tracker,
+            sha256,
+            get_part_ranges,
+        )
+
+
+def probe_url_parts(client, url, total_size):
+    """
+    Return ``(start, end, sha256)`` for every uploaded part of the S3 object
+    behind ``url``, or None when they cannot be read.
+
+    Each part is requested with ``partNumber`` and ``x-amz-checksum-mode``;
+    only the headers are read. Presigned URLs (whose signature does not cover
+    the extra parameter) and servers other than S3 yield None.
+    """
+    ranges = []
+    start = 0
+    part_number = part_count = 1
+    while part_number <= part_count:
+        try:
+            with client.stream(
+                "GET",
+                url,
+                params={"partNumber": part_number},
+                headers={"x-amz-checksum-mode": "ENABLED"},
+            ) as response:
+                if response.status_code not in (200, 206):
+                    return None
+                headers = response.headers
+        except httpx.HTTPError:
+            return None
+        part_count = int(headers.get("x-amz-mp-parts-count", 1))
+        checksum = headers.get("x-amz-checksum-sha256")
+        size = int(headers.get("Content-Length", -1))
+        if not checksum or "-" in checksum or size < 0:
+            return None
+        ranges.append((start, start + size - 1, checksum))
+        start += size
+        part_number += 1
+    return ranges if start == total_size else None
+
+
+def _download_url_stream(client, url, save_path, sha256, callback, priority, tracker):
+    """Download a URL in one streamed GET, verifying ``sha256`` while writing"""
+    progress = _TransferProgress(callback)
+    for attempt in range(1, RANGE_RETRIES + 1):
+        digest = hashlib.sha256()
+        written = 0
+        with transfer_scheduler.slot(priority), client.stream("GET", url) as response:
+            response.raise_for_status()
+            with open(save_path, "wb") as f:
+                for chunk in response.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    transfer_scheduler.throttle(priority, len(chunk))
+                    f.write(chunk)
+                    digest.update(chunk)
+                    written += len(chunk)
+                    progress.add(len(chunk))
+                    tracker.add(len(chunk))
+
+        if not sha256 or b64_sha256(digest.digest()) == sha256:
+            return save_path
+        progress.add(-written)
+        tracker.retry("checksum")
+        logger.warning(f"{url} failed SHA256 verification (attempt {attempt}/{RANGE_RETRIES})")
+
+    os.remove(save_path)
+    raise OSError(f"{url} failed SHA256 verification after {RANGE_RETRIES} attempts")
+
+
+def get_s3_checksum_ranges(bucket, key):
+    """
+    Return ``(total_size, ranges)`` for verifying a download of an S3 object.
+
+    ``ranges`` holds one ``(start, end, sha256)`` tuple per uploaded part when
+    the object was uploaded with SHA256 part checksums, a single tuple for a
+    whole-object checksum, or None when S3 has no SHA256 for the object.
+    """
+    s3_client = get_optimized_s3_client()
+    if not S3_CHECKSUMS:
+        return s3_client.head_object(Bucket=bucket, Key=key)["ContentLength"], None
+
+    try:
+        attributes = s3_client.get_object_attributes(
+            Bucket=bucket, Key=key, ObjectAttributes=["Checksum", "ObjectParts", "ObjectSize"]
+        )
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            raise
+        # Older S3-compatible stores and restricted IAM policies lack this call
+        logger.info(f"Cannot read checksums of s3://{bucket}/{key}, skipping verification: {e}")
+        return s3_client.head_object(Bucket=bucket, Key=key)["ContentLength"], None
+
+    total_size = attributes["ObjectSize"]
+    checksum = attributes.get("Checksum", {})
+    sha256 = checksum.get("ChecksumSHA256")
+    if not sha256 or total_size == 0:
+        return total_size, None
+
+    object_parts = attributes.get("ObjectParts")
+    if not object_parts:
+        is_full_object = checksum.get("ChecksumType", "FULL_OBJECT") == "FULL_OBJECT"
+        if is_full_object and "-" not in sha256:
+            return total_size, [(0, total_size - 1, sha256)]
+        return total_size, None
+
+    parts = list(object_parts.get("Parts", []))
+    while object_parts.get("IsTruncated"):
+        object_parts = s3_client.get_object_attributes(
+            Bucket=bucket,
+            Key=key,
+            ObjectAttributes=["ObjectParts"],
+            PartNumberMarker=object_parts["NextPartNumberMarker"],
+        )["ObjectParts"]
+        parts.extend(object_parts.get("Parts", []))
+
+    ranges = []
+    start = 0
+    for part in sorted(parts, key=lambda part: part["PartNumber"]):
+        if not part.get("ChecksumSHA256"):
+            return total_size, None
+        ranges.append((start, start + part["Size"] - 1, part["ChecksumSHA256"]))
+        start += part["Size"]
+    if start != total_size:
+        return total_size, None
+    return total_size, ranges
+
+
+def download_s3_object_parallel(
+    bucket,
+    key,
+    save_path,
+    part_size=None,
+    max_concurrency=None,
+    callback=None,
+    priority=BULK,
+    executor=None,
+):
+    """
+    Download an S3 object with concurrent ranged ``GetObject`` calls.
+
+    Objects uploaded with SHA256 checksums are fetched along their part
+    boundaries so each range is verified against its stored digest in flight.
+    """
+    s3_client = get_optimized_s3_client()
+    with track_transfer("download", priority) as tracker:
+        total_size, ranges = get_s3_checksum_ranges(bucket, key)
+
+        def fetch_range(start, end):
+            response = s3_client.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}")
+            tracker.retry("sdk", response["ResponseMetadata"].get("RetryAttempts", 0))
+            yield from response["Body"].iter_chunks(chunk_size=DOWNLOAD_CHUNK_SIZE)
+
+        if total_size == 0:
+            open(save_path, "wb").close()
+            return save_path
+
+        return parallel_ranged_download(
+            fetch_range,
+            total_size,
+            save_path,
+            part_size,
+            max_concurrency,
+            callback,
+            ranges,
+            priority,
+            tracker,
+            executor=executor,
+        )
+
+
+class _ResponseStream(io.RawIOBase):
+    """Non-seekable file object over an httpx streaming response body"""
+
+    def __init__(self, response, chunk_size=DOWNLOAD_CHUNK_SIZE):
+        self._chunks = response.iter_bytes(chunk_size=chunk_size)
+        self._buffer = bytearray()
+        self._eof = False
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while not self._eof and (size is None or size < 0 or len(self._buffer) < size):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._eof = True
+            else:
+                self._buffer += chunk
+
+        if size is None or size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def readinto(self, b):
+        data = self.read(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+
+def relay_url_to_s3(
+    url,
+    bucket,
+    key,
+    s3_client=None,
+    metadata=None,
+    part_size=None,
+    max_concurrency=None,
+    max_buffered_parts=None,
+    priority=INTERACTIVE,
+):
+    """
+    Stream a URL straight into S3 without a temp file or a full in-memory copy.
+
+    The response body is read ``part_size`` bytes at a time and each part is
+    sent with ``upload_part`` by up to ``max_concurrency`` workers. At most
+    ``max_buffered_parts`` parts are in flight (plus the one being read), so
+    memory stays bounded regardless of the media size, and every part holds
+    its own ``transfer_scheduler`` slot while it is sent. A body shorter than
+    one part is sent with a single ``put_object``. Media relays are workflow
+    outputs, so they run in the interactive class by default.
+    """
+    s3_client = s3_client or get_optimized_s3_client()
+    part_size = part_size or MIN_PART_SIZE
+    max_buffered_parts = max_buffered_parts or RELAY_MAX_BUFFERED_PARTS
+    workers = max(1, min(max_concurrency or S3_UPLOAD_CONCURRENCY, max_buffered_parts))
+
+    def checksum(data):
+        if not S3_CHECKSUMS:
+            return {}
+        sha256 = b64_sha256(hashlib.sha256(data).digest())
+        return {"ChecksumAlgorithm": CHECKSUM_ALGORITHM, "ChecksumSHA256": sha256}
+
+    def send(call, data, **kwargs):
+        for attempt in range(1, RANGE_RETRIES + 1):
+            try:
+                with transfer_scheduler.slot(priority, job=(bucket, key)), tracker.part():
+                    transfer_scheduler.throttle(priority, len(data))
+                    response = call(Bucket=bucket, Key=key, Body=data, **kwargs)
+                break
+            except ClientError as e:
+                if (
+                    e.response.get("Error", {}).get("Code") != "BadDigest"
+                    or attempt == RANGE_RETRIES
+                ):
+                    raise
+                tracker.retry("bad_digest")
+                logger.warning(f"S3 rejected a part of {key} as corrupt, resending")
+        tracker.retry("sdk", response["ResponseMetadata"].get("RetryAttempts", 0))
+        tracker.add(len(data))
+        return response
+
+    def upload_part(part_number, data):
+        part_checksum = checksum(data)
+        response = send(
+            s3_client.upload_part,
+            data,
+            PartNumber=part_number,
+            UploadId=upload_id,
+            **part_checksum,
+        )
+        part = {"ETag": response["ETag"], "PartNumber": part_number}
+        if "ChecksumSHA256" in part_checksum:
+            part["ChecksumSHA256"] = part_checksum["ChecksumSHA256"]
+        return part
+
+    with httpx.stream("GET", url, follow_redirects=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        response.raise_for_status()
+        extra_args = {}
+        if metadata:
+            extra_args["Metadata"] = metadata
+        content_type = response.headers.get("Content-Type")
+        if content_type:
+            extra_args["ContentType"] = content_type
+
+        body = _ResponseStream(response)
+        with track_transfer("upload", priority) as tracker:
+            data = body.read(part_size)
+            if len(data) < part_size:
+                send(s3_client.put_object, data, **extra_args, **checksum(data))
+                return
+
+            upload_id = s3_client.create_multipart_upload(
+                Bucket=bucket, Key=key, **checksum_args(), **extra_args
+            )["UploadId"]
+            try:
+                parts = []
+                in_flight = set()
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    try:
+                        part_number = 0
+                        while data:
+                            if len(in_flight) >= max_buffered_parts:
+                                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                                parts.extend(future.result() for future in done)
+                            part_number += 1
+                            in_flight.add(executor.submit(upload_part, part_number, data))
+                            data = body.read(part_size)
+                        parts.extend(future.result() for future in in_flight)
+                    except BaseException:
+                        for future in in_flight:
+                            future.cancel()
+                        raise
+
+                s3_client.complete_multipart_upload(
+                    Bucket=bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": sorted(parts, key=lambda part: part["PartNumber"])},
+                )
+            except BaseException:
+                s3_client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+                raise
+
+
+def _run_file_upload_job(job, payload_path):
+    params = job["params"]
+    upload_with_progress(
+        params["file_path"],
+        job["bucket"],
+        job["key"],
+        resumable=params.get("resumable", False),
+        skip_if_unchanged=params.get("skip_if_unchanged", False),
+    )
+
+
+def _run_bytes_upload_job(job, payload_path):
+    # Spooled image and text outputs: small and latency-sensitive
+    with track_transfer("upload", INTERACTIVE) as tracker, transfer_scheduler.slot(INTERACTIVE):
+        get_optimized_s3_client().upload_file(
+            payload_path,
+            job["bucket"],
+            job["key"],
+            ExtraArgs={**checksum_args(), **job["params"].get("extra_args", {})},
+            Callback=throttled_callback(INTERACTIVE, tracker.callback()),
+        )
+
+
+def _run_link_upload_job(job, payload_path):
+    params = job["params"]
+    relay_url_to_s3(params["link"], job["bucket"], job["key"], metadata=params.get("metadata"))
+
+
+register_upload_handler("file", _run_file_upload_job)
+register_upload_handler("bytes", _run_bytes_upload_job)
+register_upload_handler("link", _run_link_upload_job)
+
+
+def upload_model_file(
+    file_path, s3_key, resumable=False, skip_if_unchanged=False, background=False, url=None
+):
+    """Upload a model file now, or queue it when ``background`` is set"""
+    if not background:
+        upload_with_progress(
+            file_path,
+            S3_BUCKET_NAME,
+            s3_key,
+            resumable=resumable,
+            skip_if_unchanged=skip_if_unchanged,
+        )
+        return None
+
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"Model file not found: {file_path}")
+    job = get_upload_queue().submit(
+        "file",
+        S3_BUCKET_NAME,
+        s3_key,
+        params={
+            "file_path": file_path,
+            "resumable": resumable,
+            "skip_if_unchanged": skip_if_unchanged,
+        },
+        url=url,
+    )
+    logger.info(f"Queued background upload {job['id']} of {file_path} to {s3_key}")
+    return job
+
+
+if has_pending_uploads():
+    # Pick up transfers that were still queued when the server last stopped
+    get_upload_queue()
 
 
 class UploadModelToS3:
@@ -124,6 +1409,20 @@ class UploadModelToS3:
                 "filepath": ("STRING", {"forceInput": True}),
                 "model_name": ("STRING", {"forceInput": False}),
             },
+            "optional": {
+                "resumable": (
+                    "BOOLEAN",
+                    {"default": False, "tooltip": RESUMABLE_TOOLTIP},
+                ),
+                "skip_if_unchanged": (
+                    "BOOLEAN",
+                    {"default": False, "tooltip": SKIP_IF_UNCHANGED_TOOLTIP},
+                ),
+                "background": (
+                    "BOOLEAN",
+                    {"default": False, "tooltip": BACKGROUND_TOOLTIP},
+                ),
+            },
         }
 
     RETURN_TYPES = ("STRING", "STRING")
@@ -131,7 +1430,14 @@ class UploadModelToS3:
     FUNCTION = "upload_model_to_s3"
     CATEGORY = "FlowScale/Cloud/Models"
 
-    def upload_model_to_s3(self, filepath, model_name=None):
+    def upload_model_to_s3(
+        self,
+        filepath,
+        model_name=None,
+        resumable=False,
+        skip_if_unchanged=False,
+        background=False,
+    ):
         CONTAINER_ID = os.environ.get("CONTAINER_ID", "default")
         if filepath.startswith("./") or filepath.startswith("../"):
             filepath = filepath.removeprefix("./").removeprefix("../")
@@ -146,13 +1452,6 @@ class UploadModelToS3:
         if not all([AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, S3_BUCKET_NAME]):
             raise Exception("AWS credentials not set")
 
-        boto3.client(
-            "s3",
-            aws_access_key_id=AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-            region_name=AWS_REGION,
-        )
-
         if model_name:
             if "." not in model_name and "." not in os.path.basename(absolute_filepath):
                 absolute_filepath += ".safetensors"
@@ -167,8 +1466,15 @@ class UploadModelToS3:
             s3_key = os.path.join("models", CONTAINER_ID, os.path.basename(absolute_filepath))
 
         try:
-            upload_with_progress(absolute_filepath, S3_BUCKET_NAME, s3_key)
             download_url = f"https://{S3_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/{s3_key}"
+            upload_model_file(
+                absolute_filepath,
+                s3_key,
+                resumable=resumable,
+                skip_if_unchanged=skip_if_unchanged,
+                background=background,
+                url=download_url,
+            )
             return (
                 download_url,
                 model_name,
@@ -191,6 +1497,18 @@ class UploadModelToPublicS3:
             },
             "optional": {
                 "file": ("*",),
+                "resumable": (
+                    "BOOLEAN",
+                    {"default": False, "tooltip": RESUMABLE_TOOLTIP},
+                ),
+                "skip_if_unchanged": (
+                    "BOOLEAN",
+                    {"default": False, "tooltip": SKIP_IF_UNCHANGED_TOOLTIP},
+                ),
+                "background": (
+                    "BOOLEAN",
+                    {"default": False, "tooltip": BACKGROUND_TOOLTIP},
+                ),
             },
         }
 
@@ -204,7 +1522,15 @@ class UploadModelToPublicS3:
     CATEGORY = "FlowScale/Cloud/Models"
     OUTPUT_NODE = True
 
-    def upload_model_to_s3(self, filepath, model_name=None, file=None):
+    def upload_model_to_s3(
+        self,
+        filepath,
+        model_name=None,
+        file=None,
+        resumable=False,
+        skip_if_unchanged=False,
+        background=False,
+    ):
         if filepath.startswith("./") or filepath.startswith("../"):
             filepath = filepath.removeprefix("./").removeprefix("../")
         if filepath.startswith("/") or filepath.startswith("\\"):
@@ -218,13 +1544,6 @@ class UploadModelToPublicS3:
         if not all([AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, S3_BUCKET_NAME]):
             raise Exception("AWS credentials not set")
 
-        boto3.client(
-            "s3",
-            aws_access_key_id=AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-            region_name=AWS_REGION,
-        )
-
         if model_name:
             modified_model_name = (
                 model_name + ".safetensors" if "." not in model_name else model_name
@@ -250,8 +1569,15 @@ class UploadModelToPublicS3:
 
             s3_key = os.path.join("models", os.path.basename(absolute_filepath))
         try:
-            upload_with_progress(absolute_filepath, S3_BUCKET_NAME, s3_key)
             download_url = f"https://{S3_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/{s3_key}"
+            upload_model_file(
+                absolute_filepath,
+                s3_key,
+                resumable=resumable,
+                skip_if_unchanged=skip_if_unchanged,
+                background=background,
+                url=download_url,
+            )
             return (
                 download_url,
                 model_name,
@@ -274,6 +1600,18 @@ class UploadModelToPrivateS3:
             },
             "optional": {
                 "file": ("*",),
+                "resumable": (
+                    "BOOLEAN",
+                    {"default": False, "tooltip": RESUMABLE_TOOLTIP},
+                ),
+                "skip_if_unchanged": (
+                    "BOOLEAN",
+                    {"default": False, "tooltip": SKIP_IF_UNCHANGED_TOOLTIP},
+                ),
+                "background": (
+                    "BOOLEAN",
+                    {"default": False, "tooltip": BACKGROUND_TOOLTIP},
+                ),
             },
         }
 
@@ -287,7 +1625,15 @@ class UploadModelToPrivateS3:
     CATEGORY = "FlowScale/Cloud/Models"
     OUTPUT_NODE = True
 
-    def upload_model_to_s3(self, filepath, model_name=None, file=None):
+    def upload_model_to_s3(
+        self,
+        filepath,
+        model_name=None,
+        file=None,
+        resumable=False,
+        skip_if_unchanged=False,
+        background=False,
+    ):
         if filepath.startswith("./") or filepath.startswith("../"):
             filepath = filepath.removeprefix("./").removeprefix("../")
         if filepath.startswith("/") or filepath.startswith("\\"):
@@ -299,13 +1645,6 @@ class UploadModelToPrivateS3:
         if not all([AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, S3_BUCKET_NAME]):
             raise Exception("AWS credentials not set")
 
-        boto3.client(
-            "s3",
-            aws_access_key_id=AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-            region_name=AWS_REGION,
-        )
-
         if model_name:
             modified_model_name = (
                 model_name + ".safetensors" if "." not in model_name else model_name
@@ -328,7 +1667,13 @@ class UploadModelToPrivateS3:
             s3_key = os.path.join("models", os.path.basename(absolute_filepath))
 
         try:
-            upload_with_progress(absolute_filepath, S3_BUCKET_NAME, s3_key)
+            upload_model_file(
+                absolute_filepath,
+                s3_key,
+                resumable=resumable,
+                skip_if_unchanged=skip_if_unchanged,
+                background=background,
+            )
             return (s3_key,)
         except Exception as e:
             raise Exception(f"Failed to upload model to S3: {str(e)}") from e
@@ -346,6 +1691,20 @@ class LoadModelFromPublicS3:
                 "download_url": ("STRING", {"forceInput": False}),
                 "save_path": ("STRING", {"forceInput": False}),
             },
+            "optional": {
+                "max_concurrency": (
+                    "INT",
+                    {"default": S3_DOWNLOAD_CONCURRENCY, "min": 1, "max": 64},
+                ),
+                "part_size_mb": (
+                    "INT",
+                    {"default": S3_DOWNLOAD_PART_SIZE // (1024 * 1024), "min": 1, "max": 1024},
+                ),
+                "use_cache": (
+                    "BOOLEAN",
+                    {"default": True, "tooltip": USE_CACHE_TOOLTIP},
+                ),
+            },
         }
 
     @classmethod
@@ -357,14 +1716,30 @@ class LoadModelFromPublicS3:
     FUNCTION = "load_model_from_s3"
     CATEGORY = "FlowScale/Cloud/Models"
 
-    def load_model_from_s3(self, download_url, save_path):
+    def load_model_from_s3(
+        self,
+        download_url,
+        save_path,
+        max_concurrency=S3_DOWNLOAD_CONCURRENCY,
+        part_size_mb=S3_DOWNLOAD_PART_SIZE // (1024 * 1024),
+        use_cache=True,
+    ):
         try:
-            with httpx.stream("GET", download_url, follow_redirects=True) as response:
-                response.raise_for_status()
-                with open(save_path, "wb") as f:
-                    for chunk in response.iter_bytes(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
+            # One probe serves both the cache validator and the download
+            probe = get_url_probe(download_url) if use_cache else None
+            download_with_cache(
+                download_url,
+                probe[3] if probe else None,
+                save_path,
+                lambda: download_url_parallel(
+                    download_url,
+                    save_path,
+                    part_size=part_size_mb * 1024 * 1024,
+                    max_concurrency=max_concurrency,
+                    probe=probe,
+                ),
+                use_cache=use_cache,
+            )
             logger.info(f"Model downloaded and saved to {save_path}")
             return (save_path,)
         except Exception as e:
@@ -383,6 +1758,20 @@ class LoadModelFromPrivateS3:
                 "s3_key": ("STRING", {"forceInput": False}),
                 "save_path": ("STRING", {"forceInput": False}),
             },
+            "optional": {
+                "max_concurrency": (
+                    "INT",
+                    {"default": S3_DOWNLOAD_CONCURRENCY, "min": 1, "max": 64},
+                ),
+                "part_size_mb": (
+                    "INT",
+                    {"default": S3_DOWNLOAD_PART_SIZE // (1024 * 1024), "min": 1, "max": 1024},
+                ),
+                "use_cache": (
+                    "BOOLEAN",
+                    {"default": True, "tooltip": USE_CACHE_TOOLTIP},
+                ),
+            },
         }
 
     RETURN_TYPES = ("STRING",)
@@ -390,17 +1779,17 @@ class LoadModelFromPrivateS3:
     FUNCTION = "load_model_from_s3"
     CATEGORY = "FlowScale/Cloud/Models"
 
-    def load_model_from_s3(self, s3_key, save_path):
+    def load_model_from_s3(
+        self,
+        s3_key,
+        save_path,
+        max_concurrency=S3_DOWNLOAD_CONCURRENCY,
+        part_size_mb=S3_DOWNLOAD_PART_SIZE // (1024 * 1024),
+        use_cache=True,
+    ):
         if not all([AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, S3_BUCKET_NAME]):
             raise Exception("AWS credentials not set")
 
-        s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-            region_name=AWS_REGION,
-        )
-
         base_directory = os.getcwd()
         save_path = os.path.join(base_directory, save_path)
 
@@ -413,7 +1802,19 @@ class LoadModelFromPrivateS3:
 
         logger.info(f"Downloading model from S3 key {s3_key} and saving to {save_path}")
         try:
-            s3_client.download_file(S3_BUCKET_NAME, s3_key, save_path)
+            download_with_cache(
+                f"s3://{S3_BUCKET_NAME}/{s3_key}",
+                get_s3_object_validator(S3_BUCKET_NAME, s3_key) if use_cache else None,
+                save_path,
+                lambda: download_s3_object_parallel(
+                    S3_BUCKET_NAME,
+                    s3_key,
+                    save_path,
+                    part_size=part_size_mb * 1024 * 1024,
+                    max_concurrency=max_concurrency,
+                ),
+                use_cache=use_cache,
+            )
             logger.info(f"Model downloaded from S3 key {s3_key} and saved to {save_path}")
             return (save_path,)
         except Exception as e:
@@ -427,12 +1828,7 @@ class UploadImageToS3:
 
     def __init__(self):
         self.output_dir = folder_paths.get_output_directory()
-        self.s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=os.environ.get("AWS_S3_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.environ.get("AWS_S3_SECRET_ACCESS_KEY"),
-            region_name=os.environ.get("AWS_S3_REGION", "us-east-1"),
-        )
+        self.s3_client = get_optimized_s3_client()
         self.region = os.environ.get("AWS_S3_REGION", "us-east-1")
         self.bucket_name = os.environ.get("AWS_S3_BUCKET_NAME")
 
@@ -455,6 +1851,17 @@ class UploadImageToS3:
                     "STRING",
                     {"default": "default", "tooltip": "Identifier to add to metadata"},
                 ),
+                "save_local_copy": (
+                    "BOOLEAN",
+                    {
+                        "default": True,
+                        "tooltip": "Also write each PNG to the output directory",
+                    },
+                ),
+                "background": (
+                    "BOOLEAN",
+                    {"default": False, "tooltip": BACKGROUND_TOOLTIP},
+                ),
             },
         }
 
@@ -464,110 +1871,121 @@ class UploadImageToS3:
     CATEGORY = "FlowScale/Cloud/Images"
     OUTPUT_NODE = True
 
+    def _upload_image(
+        self, image, s3_key, local_file_path, subfolder, user_id, identifier, background=False
+    ):
+        """Encode one frame to PNG in memory, optionally keep a local copy, and upload it"""
+        try:
+            img = Image.fromarray(np.clip(255.0 * image, 0, 255).astype(np.uint8))
+            buffer = io.BytesIO()
+            img.save(buffer, format="PNG", compress_level=4)
+
+            if local_file_path:
+                with open(local_file_path, "wb") as f:
+                    f.write(buffer.getbuffer())
+
+            extra_args = {
+                "ContentType": "image/png",
+                "Metadata": {"user_id": user_id, "identifier": identifier},
+            }
+            download_url = get_presigned_url(self.bucket_name, s3_key, s3_client=self.s3_client)
+
+            if background:
+                job = get_upload_queue().submit(
+                    "bytes",
+                    self.bucket_name,
+                    s3_key,
+                    params={"extra_args": extra_args},
+                    payload=buffer.getvalue(),
+                    url=download_url,
+                )
+                return {
+                    "key": s3_key,
+                    "url": download_url,
+                    "type": "output",
+                    "job_id": job["id"],
+                    "status": job["status"],
+                    "message": f"File {s3_key} queued for upload to S3 bucket {self.bucket_name}.",
+                }
+
+            buffer.seek(0)
+            with contextlib.ExitStack() as stack:
+                tracker = stack.enter_context(track_transfer("upload", INTERACTIVE))
+                stack.enter_context(transfer_scheduler.slot(INTERACTIVE))
+                self.s3_client.upload_fileobj(
+                    buffer,
+                    self.bucket_name,
+                    s3_key,
+                    ExtraArgs={**checksum_args(), **extra_args},
+                    Callback=throttled_callback(INTERACTIVE, tracker.callback()),
+                )
+
+            logger.info(f"File {s3_key} uploaded successfully to S3 bucket {self.bucket_name}.")
+            return {
+                "key": s3_key,
+                "url": download_url,
+                "type": "output",
+                "message": f"File {s3_key} uploaded successfully to S3 bucket {self.bucket_name}.",
+            }
+        except NoCredentialsError:
+            error_msg = "AWS credentials not found in environment variables."
+        except PartialCredentialsError:
+            error_msg = "Incomplete AWS credentials provided."
+        except S3UploadFailedError as e:
+            error_msg = f"Failed to upload file to S3: {str(e)}"
+        except Exception as e:
+            error_msg = f"An unexpected error occurred: {str(e)}"
+
+        logger.error(error_msg)
+        return {"filename": s3_key, "subfolder": subfolder, "type": "output", "error": error_msg}
+
     def upload_images_to_s3(
-        self, images, filename_prefix="ComfyUI_", user_id="flowscale_user", identifier="default"
+        self,
+        images,
+        filename_prefix="ComfyUI_",
+        user_id="flowscale_user",
+        identifier="default",
+        save_local_copy=True,
+        background=False,
     ):
         full_output_folder, filename, counter, subfolder, filename_prefix = (
             folder_paths.get_save_image_path(
                 filename_prefix, self.output_dir, images[0].shape[1], images[0].shape[0]
             )
         )
-        results = list()
 
-        # Initialize variables to handle case where no uploads succeed
-        download_url = ""
-        s3_key = ""
+        # Move the whole batch off the device once; frames are then encoded in parallel
+        frames = images.cpu().numpy()
+        jobs = []
+        for batch_number, image in enumerate(frames):
+            local_file_path = None
+            if save_local_copy:
+                filename_with_batch_num = filename.replace("%batch_num%", str(batch_number))
+                local_file = f"{filename_with_batch_num}_{counter + batch_number:05}_.png"
+                local_file_path = os.path.join(full_output_folder, local_file)
 
-        for batch_number, image in enumerate(images):
-            i = 255.0 * image.cpu().numpy()
-            img = Image.fromarray(np.clip(i, 0, 255).astype(np.uint8))
-
-            # Save image locally
-            filename_with_batch_num = filename.replace("%batch_num%", str(batch_number))
-            local_file = f"{filename_with_batch_num}_{counter:05}_.png"
-            local_file_path = os.path.join(full_output_folder, local_file)
-            img.save(local_file_path, compress_level=4)
-
-            # Upload to S3
             rand_num = random.randint(1111, 9999)
             s3_key = f"flowscale/{user_id}/{user_id}_{identifier}_image_{rand_num}.png"
-            try:
-                self.s3_client.upload_file(
-                    local_file_path,
-                    self.bucket_name,
-                    s3_key,
-                    ExtraArgs={"Metadata": {"user_id": user_id, "identifier": identifier}},
-                )
-
-                download_url = self.s3_client.generate_presigned_url(
-                    ClientMethod="get_object",
-                    Params={"Bucket": self.bucket_name, "Key": s3_key},
-                    ExpiresIn=3600,
-                )
+            jobs.append(
+                (image, s3_key, local_file_path, subfolder, user_id, identifier, background)
+            )
 
-                results.append(
-                    {
-                        "key": s3_key,
-                        "url": download_url,
-                        "type": "output",
-                        "message": f"File {s3_key} uploaded successfully to S3 bucket {self.bucket_name}.",
-                    }
-                )
-                logger.info(f"File {s3_key} uploaded successfully to S3 bucket {self.bucket_name}.")
-            except NoCredentialsError:
-                logger.error("AWS credentials not found in environment variables.")
-                results.append(
-                    {
-                        "filename": s3_key,
-                        "subfolder": subfolder,
-                        "type": "output",
-                        "error": "AWS credentials not found in environment variables.",
-                    }
-                )
-            except PartialCredentialsError:
-                logger.error("Incomplete AWS credentials provided.")
-                results.append(
-                    {
-                        "filename": s3_key,
-                        "subfolder": subfolder,
-                        "type": "output",
-                        "error": "Incomplete AWS credentials provided.",
-                    }
-                )
-            except S3UploadFailedError as e:
-                logger.error(f"Failed to upload file to S3: {str(e)}")
-                results.append(
-                    {
-                        "filename": s3_key,
-                        "subfolder": subfolder,
-                        "type": "output",
-                        "error": f"Failed to upload file to S3: {str(e)}",
-                    }
-                )
-            except Exception as e:
-                logger.error(f"An unexpected error occurred: {str(e)}")
-                results.append(
-                    {
-                        "filename": s3_key,
-                        "subfolder": subfolder,
-                        "type": "output",
-                        "error": f"An unexpected error occurred: {str(e)}",
-                    }
-                )
+        workers = max(1, min(IMAGE_UPLOAD_CONCURRENCY, len(jobs)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda job: self._upload_image(*job), jobs))
 
-            counter += 1
+        # Outputs mirror the last frame in the batch, as before
+        download_url = ""
+        s3_key = jobs[-1][1] if jobs else ""
+        for result in results:
+            download_url = result.get("url", download_url)
 
         return {"ui": {"images": results}, "result": (download_url, s3_key)}
 
 
 class UploadMediaToS3FromLink:
     def __init__(self):
-        self.s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-            region_name=AWS_REGION,
-        )
+        self.s3_client = get_optimized_s3_client()
         self.region = AWS_REGION
         self.bucket_name = S3_BUCKET_NAME
 
@@ -590,6 +2008,10 @@ class UploadMediaToS3FromLink:
                     "STRING",
                     {"default": "default", "tooltip": "Identifier to add to metadata"},
                 ),
+                "background": (
+                    "BOOLEAN",
+                    {"default": False, "tooltip": BACKGROUND_TOOLTIP},
+                ),
             },
         }
 
@@ -600,14 +2022,13 @@ class UploadMediaToS3FromLink:
     OUTPUT_NODE = True
 
     def upload_media_to_s3(
-        self, link, filename_prefix="default", user_id="flowscale_user", identifier="default"
+        self,
+        link,
+        filename_prefix="default",
+        user_id="flowscale_user",
+        identifier="default",
+        background=False,
     ):
-        import os
-        import tempfile
-        from uuid import uuid4
-
-        import httpx
-
         results = []
 
         if not link:
@@ -616,72 +2037,73 @@ class UploadMediaToS3FromLink:
             results.append({"filename": None, "type": "output", "error": error_msg})
             return {"ui": {"images": results}, "result": ("",)}
 
-        unique_id = str(uuid4())
         extension = os.path.splitext(link)[1] if "." in os.path.basename(link) else ".png"
-        temp_filename = f"{filename_prefix}_{unique_id}{extension}"
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            local_file_path = os.path.join(temp_dir, temp_filename)
-            try:
-                logger.info(f"Downloading media from {link}...")
-                response = httpx.get(link)
-                response.raise_for_status()
-                with open(local_file_path, "wb") as f:
-                    f.write(response.content)
-                logger.info(f"Downloaded media from {link} to {local_file_path}.")
-            except httpx.HTTPError as e:
-                error_msg = f"Failed to download media from URL: {e}"
-                logger.error(error_msg)
-                results.append({"filename": temp_filename, "type": "output", "error": error_msg})
-                return {"ui": {"images": results}, "result": ("",)}
-
-            # Upload the downloaded file to S3
-            rand_num = random.randint(1111, 9999)
-            media_type = "video" if extension == ".mp4" else "image"
-            s3_key = (
-                f"flowscale/{user_id}/{user_id}_{identifier}_{media_type}_{rand_num}{extension}"
-            )
-            # Initialize download_url in case upload fails
-            download_url = ""
-            try:
-                self.s3_client.upload_file(
-                    local_file_path,
+        rand_num = random.randint(1111, 9999)
+        media_type = "video" if extension == ".mp4" else "image"
+        s3_key = f"flowscale/{user_id}/{user_id}_{identifier}_{media_type}_{rand_num}{extension}"
+        # Initialize download_url in case upload fails
+        download_url = ""
+        try:
+            metadata = {"user_id": user_id, "identifier": identifier}
+            if background:
+                download_url = get_presigned_url(self.bucket_name, s3_key, s3_client=self.s3_client)
+                job = get_upload_queue().submit(
+                    "link",
                     self.bucket_name,
                     s3_key,
-                    ExtraArgs={"Metadata": {"user_id": user_id, "identifier": identifier}},
-                )
-
-                download_url = self.s3_client.generate_presigned_url(
-                    ClientMethod="get_object",
-                    Params={"Bucket": self.bucket_name, "Key": s3_key},
-                    ExpiresIn=3600,
+                    params={"link": link, "metadata": metadata},
+                    url=download_url,
                 )
-
                 results.append(
                     {
                         "key": s3_key,
                         "url": download_url,
                         "type": "output",
-                        "message": f"File {s3_key} uploaded successfully to S3 bucket {self.bucket_name}.",
+                        "job_id": job["id"],
+                        "status": job["status"],
+                        "message": f"File {s3_key} queued for upload to S3 bucket {self.bucket_name}.",
                     }
                 )
-                logger.info(f"File {s3_key} uploaded successfully to S3 bucket {self.bucket_name}.")
-            except NoCredentialsError:
-                error_msg = "AWS credentials not found in environment variables."
-                logger.error(error_msg)
-                results.append({"filename": s3_key, "type": "output", "error": error_msg})
-            except PartialCredentialsError:
-                error_msg = "Incomplete AWS credentials provided."
-                logger.error(error_msg)
-                results.append({"filename": s3_key, "type": "output", "error": error_msg})
-            except S3UploadFailedError as e:
-                error_msg = f"Failed to upload file to S3: {str(e)}"
-                logger.error(error_msg)
-                results.append({"filename": s3_key, "type": "output", "error": error_msg})
-            except Exception as e:
-                error_msg = f"An unexpected error occurred: {str(e)}"
-                logger.error(error_msg)
-                results.append({"filename": s3_key, "type": "output", "error": error_msg})
+                return {"ui": {"images": results}, "result": (download_url, s3_key)}
+
+            logger.info(f"Relaying media from {link} to {s3_key}...")
+            relay_url_to_s3(
+                link, self.bucket_name, s3_key, s3_client=self.s3_client, metadata=metadata
+            )
+
+            download_url = get_presigned_url(self.bucket_name, s3_key, s3_client=self.s3_client)
+
+            results.append(
+                {
+                    "key": s3_key,
+                    "url": download_url,
+                    "type": "output",
+                    "message": f"File {s3_key} uploaded successfully to S3 bucket {self.bucket_name}.",
+                }
+            )
+            logger.info(f"File {s3_key} uploaded successfully to S3 bucket {self.bucket_name}.")
+        except httpx.HTTPError as e:
+            error_msg = f"Failed to download media from URL: {e}"
+            logger.error(error_msg)
+            results.append({"filename": s3_key, "type": "output", "error": error_msg})
+            return {"ui": {"images": results}, "result": ("",)}
+        except NoCredentialsError:
+            error_msg = "AWS credentials not found in environment variables."
+            logger.error(error_msg)
+            results.append({"filename": s3_key, "type": "output", "error": error_msg})
+        except PartialCredentialsError:
+            error_msg = "Incomplete AWS credentials provided."
+            logger.error(error_msg)
+            results.append({"filename": s3_key, "type": "output", "error": error_msg})
+        except S3UploadFailedError as e:
+            error_msg = f"Failed to upload file to S3: {str(e)}"
+            logger.error(error_msg)
+            results.append({"filename": s3_key, "type": "output", "error": error_msg})
+        except Exception as e:
+            error_msg = f"An unexpected error occurred: {str(e)}"
+            logger.error(error_msg)
+            results.append({"filename": s3_key, "type": "output", "error": error_msg})
 
         return {"ui": {"images": results}, "result": (download_url, s3_key)}
 
@@ -692,12 +2114,7 @@ class UploadTextToS3:
     """
 
     def __init__(self):
-        self.s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-            region_name=AWS_REGION,
-        )
+        self.s3_client = get_optimized_s3_client()
         self.region = AWS_REGION
         self.bucket_name = S3_BUCKET_NAME
 
@@ -723,6 +2140,10 @@ class UploadTextToS3:
                     "STRING",
                     {"default": "default", "tooltip": "Identifier to add to metadata"},
                 ),
+                "background": (
+                    "BOOLEAN",
+                    {"default": False, "tooltip": BACKGROUND_TOOLTIP},
+                ),
             },
         }
 
@@ -732,8 +2153,54 @@ class UploadTextToS3:
     CATEGORY = "FlowScale/Cloud/Text"
     OUTPUT_NODE = True
 
+    def _queue_text_upload(self, text, user_id, identifier):
+        """Hand the text to the background upload queue and return its key and URL"""
+        results = []
+        rand_num = random.randint(1111, 9999)
+        s3_key = f"flowscale/{user_id}/{user_id}_{identifier}_text_{rand_num}.txt"
+        download_url = ""
+        try:
+            download_url = get_presigned_url(self.bucket_name, s3_key, s3_client=self.s3_client)
+            job = get_upload_queue().submit(
+                "bytes",
+                self.bucket_name,
+                s3_key,
+                params={
+                    "extra_args": {
+                        "Metadata": {
+                            "user_id": user_id,
+                            "identifier": identifier,
+                            "content-type": "text/plain",
+                        }
+                    }
+                },
+                payload=text.encode("utf-8"),
+                url=download_url,
+            )
+            results.append(
+                {
+                    "key": s3_key,
+                    "url": download_url,
+                    "type": "output",
+                    "job_id": job["id"],
+                    "status": job["status"],
+                    "message": f"Text file {s3_key} queued for upload",
+                }
+            )
+        except Exception as e:
+            error_msg = f"Error queueing text file: {str(e)}"
+            logger.error(error_msg)
+            results.append({"filename": s3_key, "type": "output", "error": error_msg})
+
+        return {"ui": {"texts": results}, "result": (download_url, s3_key)}
+
     def upload_text_to_s3(
-        self, text, filename_prefix="ComfyUI_Text_", user_id="flowscale_user", identifier="default"
+        self,
+        text,
+        filename_prefix="ComfyUI_Text_",
+        user_id="flowscale_user",
+        identifier="default",
+        background=False,
     ):
         import os
         import tempfile
@@ -747,6 +2214,9 @@ class UploadTextToS3:
             results.append({"filename": None, "type": "output", "error": error_msg})
             return {"ui": {"texts": results}, "result": ("",)}
 
+        if background:
+            return self._queue_text_upload(text, user_id, identifier)
+
         # Create temporary text file
         unique_id = str(uuid4())
         txt_filename = f"{filename_prefix}_{unique_id}.txt"
@@ -767,24 +2237,25 @@ class UploadTextToS3:
                 rand_num = random.randint(1111, 9999)
                 s3_key = f"flowscale/{user_id}/{user_id}_{identifier}_text_{rand_num}.txt"
                 # Upload to S3
-                self.s3_client.upload_file(
-                    local_file_path,
-                    self.bucket_name,
-                    s3_key,
-                    ExtraArgs={
-                        "Metadata": {
-                            "user_id": user_id,
-                            "identifier": identifier,
-                            "content-type": "text/plain",
-                        }
-                    },
-                )
-
-                download_url = self.s3_client.generate_presigned_url(
-                    ClientMethod="get_object",
-                    Params={"Bucket": self.bucket_name, "Key": s3_key},
-                    ExpiresIn=3600,
-                )
+                with contextlib.ExitStack() as stack:
+                    tracker = stack.enter_context(track_transfer("upload", INTERACTIVE))
+                    stack.enter_context(transfer_scheduler.slot(INTERACTIVE))
+                    self.s3_client.upload_file(
+                        local_file_path,
+                        self.bucket_name,
+                        s3_key,
+                        Callback=throttled_callback(INTERACTIVE, tracker.callback()),
+                        ExtraArgs={
+                            **checksum_args(),
+                            "Metadata": {
+                                "user_id": user_id,
+                                "identifier": identifier,
+                                "content-type": "text/plain",
+                            },
+                        },
+                    )
+
+                download_url = get_presigned_url(self.bucket_name, s3_key, s3_client=self.s3_client)
 
                 results.append(
                     {
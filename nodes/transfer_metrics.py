@@ -0,0 +1,274 @@
+import bisect
+import contextlib
+import threading
+import time
+
+MB = 1024 * 1024
+
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+TTFB_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+THROUGHPUT_BUCKETS = tuple(n * MB for n in (1, 5, 10, 25, 50, 100, 250, 500, 1000))
+SIZE_BUCKETS = tuple(n * MB for n in (0.0625, 1, 8, 64, 256, 1024, 4096, 16384))
+
+_transfer_metrics = None
+_transfer_metrics_lock = threading.Lock()
+
+
+def _format_labels(labels):
+    labels = list(labels)
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in labels)
+    return f"{{{pairs}}}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                labels = _format_labels(zip(self.label_names, key))
+                lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label_names = label_names
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "counts": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            if index < len(self.buckets):
+                series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                base = list(zip(self.label_names, key))
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    labels = _format_labels(base + [("le", _format_value(float(bound)))])
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(base + [("le", "+Inf")])
+                lines.append(f"{self.name}_bucket{labels} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(base)} {series['sum']!r}")
+                lines.append(f"{self.name}_count{_format_labels(base)} {series['count']}")
+        return lines
+
+
+class TransferMetrics:
+    """Process-wide S3 transfer counters and histograms in Prometheus form"""
+
+    def __init__(self):
+        labels = ("direction", "priority")
+        self.transfers = Counter(
+            "flowscale_s3_transfers_total",
+            "S3 transfers by direction, priority class and outcome.",
+            labels + ("outcome",),
+        )
+        self.bytes = Counter(
+            "flowscale_s3_transfer_bytes_total",
+            "Bytes sent or received by S3 transfers, including retried ranges.",
+            labels,
+        )
+        self.retries = Counter(
+            "flowscale_s3_part_retries_total",
+            "Part or range retries by direction and reason.",
+            ("direction", "reason"),
+        )
+        self.duration = Histogram(
+            "flowscale_s3_transfer_duration_seconds",
+            "Wall time of whole S3 transfers.",
+            DURATION_BUCKETS,
+            labels,
+        )
+        self.ttfb = Histogram(
+            "flowscale_s3_transfer_ttfb_seconds",
+            "Time from the start of a transfer to its first byte moved.",
+            TTFB_BUCKETS,
+            labels,
+        )
+        self.throughput = Histogram(
+            "flowscale_s3_transfer_throughput_bytes_per_second",
+            "Average throughput of completed S3 transfers.",
+            THROUGHPUT_BUCKETS,
+            labels,
+        )
+        self.size = Histogram(
+            "flowscale_s3_transfer_size_bytes",
+            "Size of completed S3 transfers.",
+            SIZE_BUCKETS,
+            labels,
+        )
+        self.part_duration = Histogram(
+            "flowscale_s3_part_duration_seconds",
+            "Wall time of single multipart parts and download ranges.",
+            DURATION_BUCKETS,
+            ("direction",),
+        )
+
+    def render(self, extra_lines=()):
+        lines = []
+        for metric in (
+            self.transfers,
+            self.bytes,
+            self.retries,
+            self.duration,
+            self.ttfb,
+            self.throughput,
+            self.size,
+            self.part_duration,
+        ):
+            lines.extend(metric.render())
+        lines.extend(extra_lines)
+        return "\n".join(lines) + "\n"
+
+
+def scheduler_gauge_lines(stats):
+    """Render ``TransferScheduler.stats()`` as Prometheus gauges"""
+    gauges = (
+        ("flowscale_s3_transfer_slots_active", "active", "Transfer slots held per class."),
+        ("flowscale_s3_transfer_slots_waiting", "waiting", "Transfers waiting for a slot."),
+        ("flowscale_s3_transfer_slots_limit", "concurrency", "Concurrency cap per class."),
+    )
+    lines = []
+    for name, field, help_text in gauges:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for priority, values in stats.items():
+            lines.append(f'{name}{{priority="{priority}"}} {values[field]}')
+    return lines
+
+
+class TransferTracker:
+    """
+    Measures one transfer: bytes, duration, time to first byte and retries.
+
+    Safe to update from the worker threads of a concurrent transfer.
+    """
+
+    def __init__(self, metrics, direction, priority):
+        self.metrics = metrics
+        self.direction = direction
+        self.priority = priority
+        self.started = time.monotonic()
+        self.first_byte = None
+        self.bytes_transferred = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def add(self, amount):
+        if amount <= 0:
+            return
+        with self._lock:
+            if self.first_byte is None:
+                self.first_byte = time.monotonic() - self.started
+            self.bytes_transferred += amount
+
+    def retry(self, reason, count=1):
+        if count <= 0:
+            return
+        with self._lock:
+            self.retries += count
+        self.metrics.retries.inc(count, direction=self.direction, reason=reason)
+
+    @contextlib.contextmanager
+    def part(self):
+        """Time one part or range of this transfer"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.metrics.part_duration.observe(time.monotonic() - started, direction=self.direction)
+
+    def callback(self, callback=None):
+        """boto3 ``Callback`` recording increments here before calling ``callback``"""
+
+        def progress_callback(bytes_transferred):
+            self.add(bytes_transferred)
+            if callback:
+                callback(bytes_transferred)
+
+        return progress_callback
+
+    def finish(self, outcome):
+        duration = time.monotonic() - self.started
+        labels = {"direction": self.direction, "priority": self.priority}
+        metrics = self.metrics
+        metrics.transfers.inc(outcome=outcome, **labels)
+        metrics.bytes.inc(self.bytes_transferred, **labels)
+        metrics.duration.observe(duration, **labels)
+        if self.first_byte is not None:
+            metrics.ttfb.observe(self.first_byte, **labels)
+        # Server-side copies move no bytes and stay out of the size and throughput histograms
+        if outcome == "success" and self.bytes_transferred:
+            metrics.size.observe(self.bytes_transferred, **labels)
+            if duration > 0:
+                metrics.throughput.observe(self.bytes_transferred / duration, **labels)
+
+
+def get_transfer_metrics():
+    """Return the process-wide transfer metrics registry"""
+    global _transfer_metrics
+
+    with _transfer_metrics_lock:
+        if _transfer_metrics is None:
+            _transfer_metrics = TransferMetrics()
+    return _transfer_metrics
+
+
+@contextlib.contextmanager
+def track_transfer(direction, priority, tracker=None):
+    """
+    Yield a ``TransferTracker`` and record it when the block exits.
+
+    When ``tracker`` is given (the caller is already being tracked) it is
+    yielded as-is and recorded by its owner instead.
+    """
+    if tracker is not None:
+        yield tracker
+        return
+
+    tracker = TransferTracker(get_transfer_metrics(), direction, priority)
+    try:
+        yield tracker
+    except BaseException:
+        tracker.finish("error")
+        raise
+    tracker.finish("success")
@@ -0,0 +1,142 @@
+import contextlib
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+PRIORITY_ORDER = [INTERACTIVE, BULK]
+
+# Per-class limits; bandwidth is in bytes per second and 0 means unlimited
+TRANSFER_CLASS_LIMITS = {
+    INTERACTIVE: {
+        "concurrency": int(os.environ.get("FLOWSCALE_S3_INTERACTIVE_CONCURRENCY", "16")),
+        "bandwidth": int(os.environ.get("FLOWSCALE_S3_INTERACTIVE_BANDWIDTH", "0")),
+    },
+    BULK: {
+        "concurrency": int(os.environ.get("FLOWSCALE_S3_BULK_CONCURRENCY", "32")),
+        "bandwidth": int(os.environ.get("FLOWSCALE_S3_BULK_BANDWIDTH", "0")),
+    },
+}
+
+
+class _TokenBucket:
+    """Rate limiter that lets a caller overdraw and sleeps off the debt"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount):
+        if self.rate <= 0 or amount <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            # Allow at most one second of burst
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0
+        if delay:
+            time.sleep(delay)
+
+
+class _Ticket:
+    __slots__ = ("priority", "granted")
+
+    def __init__(self, priority):
+        self.priority = priority
+        self.granted = False
+
+
+class TransferScheduler:
+    """
+    Hands out S3 connection slots to transfers by priority class.
+
+    ``max_slots`` bounds all transfers together (the shared client's
+    connection pool) and each class has its own concurrency cap, so bulk model
+    transfers can never take every connection. Waiting interactive work is
+    always served before bulk work. Within a class, slots rotate round-robin
+    between jobs (e.g. one per file), so a model with thousands of parts cannot
+    starve another transfer that arrived later. Each class also has an optional
+    bandwidth cap enforced through ``throttle``.
+    """
+
+    def __init__(self, max_slots, class_limits=None):
+        class_limits = class_limits or TRANSFER_CLASS_LIMITS
+        self.max_slots = max_slots
+        self._limits = {name: limits["concurrency"] for name, limits in class_limits.items()}
+        self._buckets = {
+            name: _TokenBucket(limits["bandwidth"]) for name, limits in class_limits.items()
+        }
+        self._cond = threading.Condition()
+        self._active = dict.fromkeys(class_limits, 0)
+        self._waiting = {name: OrderedDict() for name in class_limits}
+        self._anonymous_jobs = itertools.count()
+
+    def _next_ticket(self):
+        for name in PRIORITY_ORDER:
+            jobs = self._waiting[name]
+            if not jobs or self._active[name] >= self._limits[name]:
+                continue
+            job, tickets = next(iter(jobs.items()))
+            ticket = tickets.popleft()
+            if tickets:
+                jobs.move_to_end(job)
+            else:
+                del jobs[job]
+            return ticket
+        return None
+
+    def _dispatch(self):
+        granted = False
+        while sum(self._active.values()) < self.max_slots:
+            ticket = self._next_ticket()
+            if ticket is None:
+                break
+            ticket.granted = True
+            self._active[ticket.priority] += 1
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def slot(self, priority=BULK, job=None):
+        """Block until a slot for ``priority`` is free and hold it for the block"""
+        if priority not in self._waiting:
+            raise ValueError(f"Unknown transfer priority: {priority}")
+        if job is None:
+            job = ("anonymous", next(self._anonymous_jobs))
+
+        ticket = _Ticket(priority)
+        with self._cond:
+            self._waiting[priority].setdefault(job, deque()).append(ticket)
+            self._dispatch()
+            while not ticket.granted:
+                self._cond.wait()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active[priority] -= 1
+                self._dispatch()
+
+    def throttle(self, priority, amount):
+        """Account ``amount`` bytes against the class bandwidth cap, sleeping if over it"""
+        self._buckets[priority].consume(amount)
+
+    def stats(self):
+        with self._cond:
+            return {
+                name: {
+                    "active": self._active[name],
+                    "waiting": sum(len(tickets) for tickets in self._waiting[name].values()),
+                    "concurrency": self._limits[name],
+                    "bandwidth": self._buckets[name].rate,
+                }
+                for name in PRIORITY_ORDER
+            }
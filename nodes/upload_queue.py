@@ -0,0 +1,181 @@
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+UPLOAD_QUEUE_DIR = os.environ.get(
+    "FLOWSCALE_UPLOAD_QUEUE_DIR", os.path.join(os.getcwd(), ".flowscale_cache", "upload_queue")
+)
+UPLOAD_QUEUE_WORKERS = int(os.environ.get("FLOWSCALE_UPLOAD_QUEUE_WORKERS", "4"))
+FINISHED_JOB_TTL = 24 * 60 * 60  # keep completed/failed jobs queryable for a day
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Transfer functions by job kind, registered by the modules that own them
+_handlers = {}
+
+_upload_queue = None
+_upload_queue_lock = threading.Lock()
+
+
+def register_upload_handler(kind, handler):
+    """Register ``handler(job, payload_path)`` to run background jobs of ``kind``"""
+    _handlers[kind] = handler
+
+
+class UploadQueue:
+    """
+    Persistent background queue for S3 transfers.
+
+    Every job is written to ``queue_dir`` as JSON (plus an optional payload
+    file for in-memory data) before it is scheduled, so jobs that were queued
+    or running when the process stopped are picked up again on restart.
+    """
+
+    def __init__(self, queue_dir=UPLOAD_QUEUE_DIR, workers=UPLOAD_QUEUE_WORKERS):
+        self.queue_dir = queue_dir
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="flowscale-upload"
+        )
+        os.makedirs(queue_dir, exist_ok=True)
+        self._restore()
+
+    def _job_path(self, job_id):
+        return os.path.join(self.queue_dir, f"{job_id}.json")
+
+    def payload_path(self, job_id):
+        return os.path.join(self.queue_dir, f"{job_id}.payload")
+
+    def _persist(self, job):
+        tmp_path = f"{self._job_path(job['id'])}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f)
+        os.replace(tmp_path, self._job_path(job["id"]))
+
+    def _restore(self):
+        for name in os.listdir(self.queue_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.queue_dir, name), encoding="utf-8") as f:
+                    job = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable upload job {name}: {e}")
+                continue
+
+            self._jobs[job["id"]] = job
+            if job["status"] in (QUEUED, RUNNING):
+                logger.info(f"Resuming background upload {job['id']} to {job['key']}")
+                job["status"] = QUEUED
+                self._schedule(job)
+
+    def _schedule(self, job):
+        self._executor.submit(self._run, job["id"])
+
+    def _run(self, job_id):
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"] = RUNNING
+            job["started_at"] = time.time()
+            self._persist(job)
+
+        payload_path = self.payload_path(job_id)
+        try:
+            handler = _handlers.get(job["kind"])
+            if handler is None:
+                raise ValueError(f"No upload handler registered for '{job['kind']}'")
+            handler(job, payload_path)
+            status, error = COMPLETED, None
+            logger.info(f"Background upload {job_id} to {job['key']} completed")
+        except Exception as e:
+            status, error = FAILED, str(e)
+            logger.error(f"Background upload {job_id} to {job['key']} failed: {e}")
+
+        with self._lock:
+            job["status"] = status
+            job["error"] = error
+            job["finished_at"] = time.time()
+            self._persist(job)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(payload_path)
+
+    def _prune(self):
+        cutoff = time.time() - FINISHED_JOB_TTL
+        for job_id, job in list(self._jobs.items()):
+            if job["status"] in (COMPLETED, FAILED) and job.get("finished_at", 0) < cutoff:
+                del self._jobs[job_id]
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self._job_path(job_id))
+
+    def submit(self, kind, bucket, key, params=None, payload=None, url=None):
+        """
+        Queue a transfer and return its job record immediately.
+
+        ``payload`` bytes are spooled to disk alongside the job so the caller
+        can drop its in-memory copy. ``url`` is the download URL handed back to
+        the caller, recorded for status queries.
+        """
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "bucket": bucket,
+            "key": key,
+            "url": url,
+            "params": params or {},
+            "status": QUEUED,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        if payload is not None:
+            with open(self.payload_path(job["id"]), "wb") as f:
+                f.write(payload)
+
+        with self._lock:
+            self._prune()
+            self._jobs[job["id"]] = job
+            self._persist(job)
+        self._schedule(job)
+        return dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self, status=None):
+        with self._lock:
+            jobs = [dict(job) for job in self._jobs.values()]
+        if status:
+            jobs = [job for job in jobs if job["status"] == status]
+        return sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+
+
+def has_pending_uploads(queue_dir=UPLOAD_QUEUE_DIR):
+    """Cheap check for spooled jobs, used to resume the queue at startup"""
+    return os.path.isdir(queue_dir) and any(
+        name.endswith(".json") for name in os.listdir(queue_dir)
+    )
+
+
+def get_upload_queue():
+    """Return the process-wide background upload queue"""
+    global _upload_queue
+
+    with _upload_queue_lock:
+        if _upload_queue is None:
+            _upload_queue = UploadQueue()
+    return _upload_queue
@@ -238,6 +238,18 @@ function createFileListPreview(node, fileList) {
 // Performance optimizations for flowscale.core.js
 const CACHE_DURATION = 5 * 60 * 1000; // 5 minutes
 let fileListCache = new Map();
+
+// Extensions the file widgets offer; also sent as the server-side `ext` filter of /flowscale/io/list
+const VIDEO_EXTENSIONS = ['mp4', 'webm', 'gif', 'mov', 'avi', 'mkv'];
+const AUDIO_EXTENSIONS = ['mp3', 'wav', 'ogg', 'flac', 'm4a', 'aac'];
+
+function directoryListUrl(directory, extensions) {
+    const params = new URLSearchParams({ directory });
+    if (extensions) {
+        params.set('ext', extensions.join(','));
+    }
+    return `/flowscale/io/list?${params}`;
+}
 let uploadQueue = [];
 let isUploading = false;
 
@@ -264,7 +276,11 @@ async function getCachedFileList(directory, fileType) {
     }
     
     try {
-        const res = await api.fetchApi(`/flowscale/io/list?directory=${directory}`);
+        const extensions = fileType === 'video' ? VIDEO_EXTENSIONS
+            : fileType === 'audio' ? AUDIO_EXTENSIONS
+            : null;
+        // The server filters and sends an ETag, so unchanged directories revalidate with a 304
+        const res = await api.fetchApi(directoryListUrl(directory, extensions));
         if (res.status === 200) {
             const data = await res.json();
             let filteredFiles;
@@ -445,7 +461,7 @@ async function uploadFiles(files) {
 
 async function getVideoList() {
     try {
-        const res = await api.fetchApi('/flowscale/io/list?directory=input');  // Changed from /fs/get_video_files
+        const res = await api.fetchApi(directoryListUrl('input', VIDEO_EXTENSIONS));  // Changed from /fs/get_video_files
         if (res.status === 200) {
             const data = await res.json();
             // Filter for video files
@@ -468,7 +484,7 @@ async function getVideoList() {
 
 async function getAudioList() {
     try {
-        const res = await api.fetchApi('/flowscale/io/list?directory=input');
+        const res = await api.fetchApi(directoryListUrl('input', AUDIO_EXTENSIONS));
         if (res.status === 200) {
             const data = await res.json();
             // Filter for audio files